@@ -120,6 +120,12 @@ app.register_blueprint(admin_requests_api)
 app.register_blueprint(admin_dashboard_api)
 app.register_blueprint(admin_transport_units)
 
+# -----------------------
+# Optional local RTDB mirror (set RTDB_MIRROR_PATH to enable)
+# -----------------------
+from rtdb_mirror import start_mirror
+start_mirror()
+
 # -----------------------
 # Inject CSRF token cookie for JS
 # -----------------------
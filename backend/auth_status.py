@@ -0,0 +1,100 @@
+# /OLStar/backend/auth_status.py
+"""
+Cached Firebase Auth `disabled` flags.
+
+GET /api/admin/users needs one flag per user, and Auth only hands them out
+100 uids per call. Lookups for uids we don't know yet run concurrently on a
+small shared pool; results are kept for AUTH_STATUS_TTL seconds. The admin
+handlers that change an account (toggle, edit, delete) write the new flag
+straight into the cache and bump the shared AUTH_STATUS_VERSION counter;
+every worker drops its flags when it sees that counter move. Only changes
+made elsewhere (e.g. the Firebase console) wait for the TTL.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_admin import auth, db
+
+AUTH_BATCH_SIZE = 100  # auth.get_users() limit
+AUTH_WORKERS = 4
+AUTH_STATUS_TTL = 300
+AUTH_STATUS_VERSION = "authStatusMeta/changes"
+
+_pool = ThreadPoolExecutor(max_workers=AUTH_WORKERS)
+
+
+class AuthStatusCache:
+    def __init__(self, ttl=AUTH_STATUS_TTL):
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._disabled = {}  # uid -> (expires_at, disabled)
+        self._version = None  # AUTH_STATUS_VERSION the cached flags were read at
+
+    def disabled_map(self, uids):
+        """{uid: disabled} for every uid, fetching unknown/expired ones from Auth."""
+        version = db.reference(AUTH_STATUS_VERSION).get()
+        now = time.monotonic()
+        result = {}
+        stale = []
+        with self._lock:
+            if version != self._version:
+                # An account was changed on some worker since we last looked
+                self._disabled.clear()
+                self._version = version
+            for uid in uids:
+                entry = self._disabled.get(uid)
+                if entry and entry[0] > now:
+                    result[uid] = entry[1]
+                else:
+                    stale.append(uid)
+
+        if stale:
+            batches = [stale[i:i + AUTH_BATCH_SIZE] for i in range(0, len(stale), AUTH_BATCH_SIZE)]
+            fetched = {}
+            for found in _pool.map(_fetch_batch, batches):
+                fetched.update(found)
+
+            expires = time.monotonic() + self._ttl
+            with self._lock:
+                for uid in stale:
+                    # uids without an Auth account count as enabled, as before
+                    disabled = fetched.get(uid, False)
+                    self._disabled[uid] = (expires, disabled)
+                    result[uid] = disabled
+
+        return result
+
+    def set(self, uid, disabled):
+        version = self._bump()
+        with self._lock:
+            self._disabled[uid] = (time.monotonic() + self._ttl, bool(disabled))
+            self._advance(version)
+
+    def discard(self, uid):
+        version = self._bump()
+        with self._lock:
+            self._disabled.pop(uid, None)
+            self._advance(version)
+
+    def _bump(self):
+        return db.reference(AUTH_STATUS_VERSION).transaction(lambda current: (current or 0) + 1)
+
+    def _advance(self, version):
+        # Caller holds self._lock. Keep our flags only if ours is the one
+        # change since we last looked; otherwise the next read drops them.
+        if (self._version or 0) + 1 == version:
+            self._version = version
+
+    def clear(self):
+        with self._lock:
+            self._disabled.clear()
+            self._version = None
+
+
+def _fetch_batch(uids):
+    result = auth.get_users([auth.UidIdentifier(uid) for uid in uids])
+    return {record.uid: record.disabled for record in result.users}
+
+
+auth_status = AuthStatusCache()
@@ -0,0 +1,341 @@
+# /OLStar/backend/aviation_edge.py
+"""
+Shared AviationEdge flight lookups: pooled HTTP, a TTL cache and a quota.
+
+    client = AviationEdgeClient(api_key)
+    flight = client.get_flight("PR510")   # raises FlightDataUnavailable
+
+Results are cached per flight IATA code. How long depends on how far the
+aircraft still is from its arrival point - a flight 3,000 km out won't move
+enough to change the ETA for a while, one on final approach will. Misses
+("not departed", "no live data") are cached too, more briefly.
+
+Every network call takes a token from a token bucket sized from the plan's
+quota (AVIATIONEDGE_CALLS_PER_MINUTE / AVIATIONEDGE_BURST). 429 and 5xx
+answers are retried with exponential backoff, and a 429 pauses all callers
+for its Retry-After. When a call can't be made or fails, a stale cached
+position is returned if there is one.
+"""
+import math
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BASE_URL = "https://aviation-edge.com/v2/public/flights"
+REQUEST_TIMEOUT = 10
+MAX_RETRIES = 3
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 30.0
+RATE_LIMIT_WAIT_SECONDS = 5.0  # longest a caller queues for a token
+
+DEFAULT_CALLS_PER_MINUTE = 30
+DEFAULT_BURST = 10
+
+# (distance to arrival in km, seconds to keep the position)
+DISTANCE_TTLS = [
+    (50, 60),
+    (200, 120),
+    (800, 300),
+    (2000, 600),
+]
+FAR_TTL = 900
+UNKNOWN_DISTANCE_TTL = 120  # no arrival coordinates in the record
+NOT_DEPARTED_TTL = 300
+LANDED_TTL = 30 * 60  # a landed flight's record doesn't change any more
+NO_DATA_TTL = 600
+STALE_GRACE_SECONDS = 15 * 60  # serve a stale position this long after expiry
+
+
+class FlightDataUnavailable(Exception):
+    """No usable live position. `reason` is a short category for metrics."""
+
+    def __init__(self, reason, message=None):
+        super().__init__(message or reason)
+        self.reason = reason
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    R = 6371  # km
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    delta_phi = math.radians(lat2 - lat1)
+    delta_lambda = math.radians(lon2 - lon1)
+    a = math.sin(delta_phi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(delta_lambda/2)**2
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return R * c
+
+
+def distance_to_arrival(flight):
+    """km from the aircraft to its arrival point, or None if unknown."""
+    try:
+        geography = flight["geography"]
+        arrival = flight["arrival"]
+        return haversine(
+            geography["latitude"], geography["longitude"],
+            arrival["latitude"], arrival["longitude"]
+        )
+    except (KeyError, TypeError):
+        return None
+
+
+def ttl_for_flight(flight):
+    if flight.get("status") == "landed":
+        return LANDED_TTL
+    distance = distance_to_arrival(flight)
+    if distance is None:
+        return UNKNOWN_DISTANCE_TTL
+    for max_km, ttl in DISTANCE_TTLS:
+        if distance <= max_km:
+            return ttl
+    return FAR_TTL
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause(self, seconds):
+        """Hold every caller back, e.g. after the API answered 429."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
+
+    def set_rate(self, rate_per_second, capacity):
+        with self._lock:
+            self._refill(self._clock())
+            self.rate = rate_per_second
+            self.capacity = capacity
+            self._tokens = min(self._tokens, capacity)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout=RATE_LIMIT_WAIT_SECONDS):
+        """Take one token, waiting up to `timeout` seconds. False if none came."""
+        deadline = self._clock() + timeout
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                refill_wait = (1 - self._tokens) / self.rate if self.rate > 0 else math.inf
+                wait = max(self._paused_until - now, refill_wait)
+            if now + wait > deadline:
+                return False
+            self._sleep(wait)
+
+    @property
+    def available(self):
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+
+class AviationEdgeClient:
+    def __init__(self, api_key, calls_per_minute=None, burst=None, session=None,
+                 pool_size=8, clock=time.monotonic, sleep=time.sleep, base_url=BASE_URL):
+        calls_per_minute = calls_per_minute or float(
+            os.getenv("AVIATIONEDGE_CALLS_PER_MINUTE", DEFAULT_CALLS_PER_MINUTE)
+        )
+        burst = burst or int(os.getenv("AVIATIONEDGE_BURST", DEFAULT_BURST))
+
+        self.api_key = api_key
+        self.base_url = base_url
+        self.calls_per_minute = calls_per_minute
+        self.burst = burst
+        self.bucket = TokenBucket(calls_per_minute / 60.0, burst, clock=clock, sleep=sleep)
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._cache = {}  # flight IATA -> (expires_at, flight or FlightDataUnavailable)
+        self._inflight = {}  # flight IATA -> Lock, so concurrent misses call once
+        self.counters = {"hits": 0, "calls": 0, "retries": 0, "rateLimited": 0, "stale": 0}
+        self.on_request = None  # optional fn(seconds, outcome) per HTTP call, for metrics
+
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.session = session
+
+    # ---------------- Public ----------------
+    def set_share(self, share):
+        """
+        Limit this client to `share` (0..1) of the configured quota, e.g. an
+        ETA worker's fraction of the trip shards, so workers on one API key
+        stay within the plan together.
+        """
+        share = min(1.0, max(0.0, share))
+        burst = max(1, round(self.burst * share)) if share else 0
+        self.bucket.set_rate(self.calls_per_minute * share / 60.0, burst)
+
+    def get_flight(self, flight_iata):
+        """The live flight record for `flight_iata` (cached), or FlightDataUnavailable."""
+        flight_iata = (flight_iata or "").strip().upper()
+        if not flight_iata:
+            raise FlightDataUnavailable("no_flight_number")
+
+        cached = self._fresh(flight_iata)
+        if cached is not None:
+            return self._unwrap(cached)
+
+        with self._lock:
+            lock = self._inflight.setdefault(flight_iata, threading.Lock())
+        with lock:
+            cached = self._fresh(flight_iata)  # filled while we waited
+            if cached is not None:
+                return self._unwrap(cached)
+
+            try:
+                result = self._fetch(flight_iata)
+            except FlightDataUnavailable as e:
+                if e.reason in ("not_departed", "no_data"):
+                    ttl = NOT_DEPARTED_TTL if e.reason == "not_departed" else NO_DATA_TTL
+                    self._store(flight_iata, e, ttl)
+                    raise
+                stale = self._stale(flight_iata)
+                if stale is not None:
+                    with self._lock:
+                        self.counters["stale"] += 1
+                    return stale
+                raise
+
+            self._store(flight_iata, result, ttl_for_flight(result))
+            return result
+
+    def invalidate(self, flight_iata=None):
+        with self._lock:
+            if flight_iata is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(flight_iata.strip().upper(), None)
+
+    # ---------------- Cache ----------------
+    def _fresh(self, flight_iata):
+        with self._lock:
+            entry = self._cache.get(flight_iata)
+            if entry and entry[0] > self._clock():
+                self.counters["hits"] += 1
+                return entry[1]
+        return None
+
+    def _stale(self, flight_iata):
+        with self._lock:
+            entry = self._cache.get(flight_iata)
+        if entry and isinstance(entry[1], dict) and entry[0] + STALE_GRACE_SECONDS > self._clock():
+            return entry[1]
+        return None
+
+    def _store(self, flight_iata, value, ttl):
+        with self._lock:
+            self._cache[flight_iata] = (self._clock() + ttl, value)
+
+    @staticmethod
+    def _unwrap(value):
+        if isinstance(value, FlightDataUnavailable):
+            raise value
+        return value
+
+    # ---------------- Network ----------------
+    def _fetch(self, flight_iata):
+        for attempt in range(MAX_RETRIES + 1):
+            if not self.bucket.acquire():
+                with self._lock:
+                    self.counters["rateLimited"] += 1
+                raise FlightDataUnavailable("rate_limited", "AviationEdge quota exhausted for now")
+
+            with self._lock:
+                self.counters["calls"] += 1
+                if attempt:
+                    self.counters["retries"] += 1
+
+            started = time.perf_counter()
+            try:
+                response = self.session.get(
+                    self.base_url,
+                    params={"key": self.api_key, "flightIata": flight_iata},
+                    timeout=REQUEST_TIMEOUT
+                )
+            except requests.Timeout:
+                reason, message = "timeout", "AviationEdge request timed out"
+                self._report(started, reason)
+            except requests.RequestException as e:
+                reason, message = "network_error", str(e)
+                self._report(started, reason)
+            else:
+                self._report(started, str(response.status_code))
+                message = f"API request failed with status code {response.status_code}"
+                if response.status_code == 429:
+                    self.bucket.pause(self._retry_after(response, attempt))
+                    reason = "http_429"
+                elif response.status_code >= 500:
+                    reason = "http_5xx"
+                elif response.status_code != 200:
+                    raise FlightDataUnavailable("http_error", message)
+                else:
+                    return self._parse(response)
+
+            if attempt == MAX_RETRIES:
+                raise FlightDataUnavailable(reason, message)
+            if reason != "http_429":  # the bucket pause already spaces 429 retries
+                self._backoff(attempt)
+
+    def _report(self, started, outcome):
+        if self.on_request is not None:
+            self.on_request(time.perf_counter() - started, outcome)
+
+    def _backoff(self, attempt):
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+        self._sleep(delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def _retry_after(response, attempt):
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt)
+
+    @staticmethod
+    def _parse(response):
+        try:
+            data = response.json()
+        except ValueError:
+            raise FlightDataUnavailable("bad_response", "AviationEdge returned invalid JSON")
+
+        # AviationEdge answers {"error": "..."} when it has nothing for a flight
+        if not data or not isinstance(data, list):
+            raise FlightDataUnavailable("no_data", "No live data available")
+
+        flight = data[0]
+        # Landed flights report speed 0 at the airport; that's an answer, not a miss
+        if flight.get("status") == "landed":
+            return flight
+        speed = flight.get("speed")
+        if not flight.get("geography") or not speed or speed.get("horizontal", 0) == 0:
+            raise FlightDataUnavailable("not_departed", "Flight not yet departed or speed unavailable")
+        return flight
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_client(api_key=None):
+    """The process-wide client for `api_key` (default AVIATIONEDGE_KEY)."""
+    api_key = api_key or os.getenv("AVIATIONEDGE_KEY")
+    with _clients_lock:
+        if api_key not in _clients:
+            _clients[api_key] = AviationEdgeClient(api_key)
+        return _clients[api_key]
@@ -0,0 +1,172 @@
+# /OLStar/backend/driver_index.py
+"""
+In-memory prefix index over driver names and phone numbers.
+
+Every driver contributes a handful of lowercase keys - the full name, each
+name part and the phone digits - to one sorted list. A lookup is a bisect to
+the first key >= the query plus a short walk while keys still start with it,
+so suggest() stays well under a millisecond for a few thousand drivers.
+
+The index is built from the cached users node (rtdb_cache) and rebuilt
+whenever that cache hands back a different object - after its short TTL or
+an invalidate() - so edits made on other workers or outside this backend
+show up as soon as the cache reloads. The admin user handlers also patch it
+in place so this worker's own edits show up immediately.
+"""
+import bisect
+import re
+import threading
+import time
+
+SUGGEST_LIMIT = 10
+SUGGEST_MAX_LIMIT = 50
+SCAN_FACTOR = 10  # keys inspected per requested result before stopping
+
+# Lower rank sorts first in suggestions
+RANK_FULL_NAME, RANK_NAME_PART, RANK_PHONE = 0, 1, 2
+INDEXED_FIELDS = ("firstName", "middleName", "lastName", "phone", "role")
+
+
+def full_name(user):
+    parts = (user.get("firstName"), user.get("middleName"), user.get("lastName"))
+    return re.sub(r"\s+", " ", " ".join(p for p in parts if p)).strip()
+
+
+def _record(user):
+    """The indexed fields plus the display name, computed once per write."""
+    record = {f: user.get(f) for f in INDEXED_FIELDS}
+    record["name"] = full_name(record)
+    record["sortName"] = record["name"].lower()
+    return record
+
+
+def _keys(user):
+    name = full_name(user).lower()
+    keys = set()
+    if name:
+        keys.add((name, RANK_FULL_NAME))
+        for part in name.split(" "):
+            keys.add((part, RANK_NAME_PART))
+
+    digits = re.sub(r"\D", "", str(user.get("phone") or ""))
+    if digits:
+        keys.add((digits, RANK_PHONE))
+        if digits.startswith("63"):
+            keys.add(("0" + digits[2:], RANK_PHONE))  # local 09xx form
+    return keys
+
+
+class DriverIndex:
+    def __init__(self, loader=None):
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._entries = []  # sorted (key, rank, uid)
+        self._records = {}  # uid -> indexed fields
+        self._built_at = None
+        self._source = None  # the users object the index was built from
+
+    # ---------------- Build / maintain ----------------
+    def rebuild(self, users):
+        records = {
+            uid: _record(u)
+            for uid, u in (users or {}).items()
+            if isinstance(u, dict) and u.get("role") == "driver"
+        }
+        entries = sorted(
+            (key, rank, uid)
+            for uid, record in records.items()
+            for key, rank in _keys(record)
+        )
+        with self._lock:
+            self._records = records
+            self._entries = entries
+            self._built_at = time.monotonic()
+            self._source = users
+
+    def _ensure_built(self):
+        if self._loader is None:
+            return
+        users = self._loader()
+        if self._built_at is not None and users is self._source:
+            return
+        self.rebuild(users)
+
+    def upsert(self, uid, changes):
+        """Merge `changes` into the driver's record and re-key it."""
+        with self._lock:
+            if self._built_at is None:
+                return  # not built yet; the first build will include it
+            record = _record({**self._records.get(uid, {}), **changes})
+            self._remove_entries(uid)
+            if record.get("role") != "driver":
+                self._records.pop(uid, None)
+                return
+            self._records[uid] = record
+            for key, rank in _keys(record):
+                bisect.insort(self._entries, (key, rank, uid))
+
+    def remove(self, uid):
+        with self._lock:
+            self._remove_entries(uid)
+            self._records.pop(uid, None)
+
+    def _remove_entries(self, uid):
+        record = self._records.get(uid)
+        if not record:
+            return
+        for key, rank in _keys(record):
+            i = bisect.bisect_left(self._entries, (key, rank, uid))
+            if i < len(self._entries) and self._entries[i] == (key, rank, uid):
+                del self._entries[i]
+
+    # ---------------- Lookup ----------------
+    def suggest(self, query, limit=SUGGEST_LIMIT):
+        """Top `limit` drivers whose name part, full name or phone starts with `query`."""
+        self._ensure_built()
+
+        query = re.sub(r"\s+", " ", (query or "").strip().lower())
+        if not query:
+            return []
+        digits = re.sub(r"\D", "", query)
+        prefixes = {query}
+        if digits and digits != query and not re.search(r"[a-z]", query):
+            prefixes.add(digits)  # "0917-123" matches phone digits
+
+        best = {}
+        with self._lock:
+            for prefix in prefixes:
+                i = bisect.bisect_left(self._entries, (prefix,))
+                budget = limit * SCAN_FACTOR
+                while i < len(self._entries) and budget:
+                    key, rank, uid = self._entries[i]
+                    if not key.startswith(prefix):
+                        break
+                    if rank < best.get(uid, RANK_PHONE + 1):
+                        best[uid] = rank
+                    i += 1
+                    budget -= 1
+
+            records = self._records
+            matches = sorted(
+                best.items(),
+                key=lambda item: (item[1], records[item[0]]["sortName"])
+            )[:limit]
+            return [
+                {
+                    "uid": uid,
+                    "name": records[uid]["name"],
+                    "phone": records[uid].get("phone") or ""
+                }
+                for uid, _ in matches
+            ]
+
+    def __len__(self):
+        return len(self._records)
+
+
+def _load_users():
+    from rtdb_cache import cached_get
+    return cached_get("users")
+
+
+driver_index = DriverIndex(loader=_load_users)
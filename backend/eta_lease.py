@@ -0,0 +1,233 @@
+# /OLStar/backend/eta_lease.py
+"""
+Leases that let several ETA workers run without doing the same work twice.
+
+Trips are split into ETA_SHARDS shards by a stable hash of the tripId. Each
+shard has a lease; only the worker holding it refreshes those trips. With
+one shard (the default) this is plain leader election.
+
+    etaLeases/<shard>    {"owner": workerId, "expiresAt": ms}  ("" owner = free)
+    etaWorkers/<id>      heartbeat, ms until which the worker counts as alive
+
+Every tick a worker renews its leases, heartbeats, and then evens out the
+load: it takes free or expired shards until it holds its fair share
+(shards / live workers, rounded up) and hands back any above it. A worker
+that dies stops renewing, so its shards are picked up at most one tick after
+the lease runs out. A worker that can't renew stops treating a shard as its
+own RENEW_MARGIN before the lease ends, so two workers never both act on it.
+
+Expiry is compared against each worker's own clock; keep hosts NTP-synced
+(skew well under RENEW_MARGIN).
+
+FileLeaseStore keeps the same state in a local JSON file under an flock, for
+running several workers on one machine or in tests without Firebase.
+"""
+import fcntl
+import json
+import math
+import os
+import socket
+import zlib
+
+from firebase_admin import db
+
+LEASES = "etaLeases"
+WORKERS = "etaWorkers"
+DEFAULT_LEASE_SECONDS = 30
+RENEW_MARGIN = 0.2  # fraction of the lease kept as safety margin
+
+
+def shard_of(trip_id, shards):
+    # crc32, not hash(): it has to agree across processes
+    return zlib.crc32(str(trip_id).encode("utf-8")) % shards
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _take(lease, owner, now_ms, expires_at):
+    """Lease value after `owner` tries to take/renew it, or None if it may not."""
+    lease = lease if isinstance(lease, dict) else {}
+    if lease.get("owner") in (None, "", owner) or (lease.get("expiresAt") or 0) <= now_ms:
+        return {"owner": owner, "expiresAt": expires_at}
+    return None
+
+
+# ---------------- Stores ----------------
+class RtdbLeaseStore:
+    def try_acquire(self, name, owner, now_ms, expires_at):
+        won = []
+
+        def update(current):
+            taken = _take(current, owner, now_ms, expires_at)
+            won[:] = [taken is not None]  # last attempt wins on retry
+            return taken if taken is not None else current
+
+        db.reference(f"{LEASES}/{name}").transaction(update)
+        return bool(won and won[0])
+
+    def release(self, name, owner):
+        def update(current):
+            if isinstance(current, dict) and current.get("owner") == owner:
+                # Transactions can't delete, so a free lease has owner ""
+                return {"owner": "", "expiresAt": 0}
+            return current
+
+        db.reference(f"{LEASES}/{name}").transaction(update)
+
+    def heartbeat(self, owner, expires_at):
+        db.reference(f"{WORKERS}/{owner}").set(expires_at)
+
+    def leave(self, owner):
+        db.reference(f"{WORKERS}/{owner}").delete()
+
+    def live_workers(self, now_ms):
+        workers = db.reference(WORKERS).get() or {}
+        return sorted(w for w, expires_at in workers.items() if (expires_at or 0) > now_ms)
+
+
+class FileLeaseStore:
+    def __init__(self, path):
+        self.path = path
+
+    def _locked(self, change):
+        """Run change(state) under an exclusive lock and save the state it leaves."""
+        with open(self.path, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                raw = f.read()
+                state = json.loads(raw) if raw.strip() else {}
+                state.setdefault(LEASES, {})
+                state.setdefault(WORKERS, {})
+                result = change(state)
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+                f.flush()
+                return result
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def try_acquire(self, name, owner, now_ms, expires_at):
+        def change(state):
+            taken = _take(state[LEASES].get(name), owner, now_ms, expires_at)
+            if taken is not None:
+                state[LEASES][name] = taken
+            return taken is not None
+        return self._locked(change)
+
+    def release(self, name, owner):
+        def change(state):
+            if (state[LEASES].get(name) or {}).get("owner") == owner:
+                state[LEASES][name] = {"owner": "", "expiresAt": 0}
+        self._locked(change)
+
+    def heartbeat(self, owner, expires_at):
+        def change(state):
+            state[WORKERS][owner] = expires_at
+        self._locked(change)
+
+    def leave(self, owner):
+        def change(state):
+            state[WORKERS].pop(owner, None)
+        self._locked(change)
+
+    def live_workers(self, now_ms):
+        def change(state):
+            return sorted(w for w, expires_at in state[WORKERS].items() if expires_at > now_ms)
+        return self._locked(change)
+
+
+# ---------------- Manager ----------------
+class ShardLeases:
+    def __init__(self, store, clock, worker_id=None, shards=1,
+                 lease_seconds=DEFAULT_LEASE_SECONDS):
+        self.store = store
+        self.clock = clock
+        self.worker_id = worker_id or default_worker_id()
+        self.shards = shards
+        self.lease_seconds = lease_seconds
+        self.renew_interval = lease_seconds * RENEW_MARGIN
+        self._held = {}  # shard -> local time (s) until which we may act on it
+
+    @property
+    def held(self):
+        now = self.clock.time()
+        return frozenset(s for s, until in self._held.items() if until > now)
+
+    def owns(self, trip_id):
+        return shard_of(trip_id, self.shards) in self.held
+
+    def tick(self):
+        """Renew, heartbeat, rebalance. Returns the shards held afterwards."""
+        now = self.clock.time()
+        now_ms = int(now * 1000)
+        expires_at = int((now + self.lease_seconds) * 1000)
+        safe_until = now + self.lease_seconds * (1 - RENEW_MARGIN)
+
+        for shard in list(self._held):
+            if self._try(shard, now_ms, expires_at):
+                self._held[shard] = safe_until
+            else:
+                del self._held[shard]  # lapsed and taken over
+
+        self._try_call(self.store.heartbeat, self.worker_id, expires_at)
+        live = self._try_call(self.store.live_workers, now_ms) or [self.worker_id]
+        if self.worker_id not in live:
+            live = sorted(live + [self.worker_id])
+        fair_share = math.ceil(self.shards / len(live))
+
+        # Hand back the highest shards above our share so newcomers get some
+        for shard in sorted(self._held, reverse=True)[:max(0, len(self._held) - fair_share)]:
+            self._try_call(self.store.release, self._name(shard), self.worker_id)
+            del self._held[shard]
+
+        # Start looking at a different shard per worker to avoid contention
+        offset = live.index(self.worker_id) * fair_share
+        for i in range(self.shards):
+            if len(self._held) >= fair_share:
+                break
+            shard = (offset + i) % self.shards
+            if shard not in self._held and self._try(shard, now_ms, expires_at):
+                self._held[shard] = safe_until
+
+        return self.held
+
+    def release_all(self):
+        for shard in list(self._held):
+            self._try_call(self.store.release, self._name(shard), self.worker_id)
+        self._held.clear()
+        self._try_call(self.store.leave, self.worker_id)
+
+    @staticmethod
+    def _name(shard):
+        return f"shard-{shard}"
+
+    def _try(self, shard, now_ms, expires_at):
+        return bool(self._try_call(
+            self.store.try_acquire, self._name(shard), self.worker_id, now_ms, expires_at
+        ))
+
+    @staticmethod
+    def _try_call(fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            # Lease store unreachable: held shards lapse on their own
+            print(f"Lease store error ({fn.__name__}): {e}")
+            return None
+
+
+def leases_from_env(clock):
+    """ShardLeases configured by ETA_SHARDS / ETA_LEASE_SECONDS / ETA_LEASE_FILE / ETA_WORKER_ID."""
+    lease_file = os.getenv("ETA_LEASE_FILE")
+    store = FileLeaseStore(lease_file) if lease_file else RtdbLeaseStore()
+    return ShardLeases(
+        store,
+        clock,
+        worker_id=os.getenv("ETA_WORKER_ID") or None,
+        shards=int(os.getenv("ETA_SHARDS", 1)),
+        lease_seconds=float(os.getenv("ETA_LEASE_SECONDS", DEFAULT_LEASE_SECONDS)),
+    )
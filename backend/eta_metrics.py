@@ -0,0 +1,165 @@
+# /OLStar/backend/eta_metrics.py
+"""
+In-process counters, gauges and histograms for the ETA worker.
+
+    metrics.inc("eta_fallbacks_total", reason="no_data")
+    with metrics.timer("eta_rtdb_seconds", op="eta_write"):
+        ...
+
+serve_metrics(port) exposes them in Prometheus text format on /metrics
+(a daemon thread, stdlib http.server); write_json(path) dumps a snapshot
+for setups without a scraper.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Seconds; covers cache hits (~µs) up to retried AviationEdge calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._meta = {}  # name -> (type, help, buckets)
+        self._values = {}  # name -> {label tuple: value | histogram state}
+        self._callbacks = []  # fns run before rendering, to refresh gauges
+
+    def describe(self, name, kind, help_text, buckets=DEFAULT_BUCKETS):
+        with self._lock:
+            self._meta[name] = (kind, help_text, tuple(buckets) if kind == "histogram" else None)
+            self._values.setdefault(name, {})
+
+    def on_collect(self, fn):
+        self._callbacks.append(fn)
+
+    # ---------------- Recording ----------------
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self._values.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            buckets = self._meta.get(name, (None, None, DEFAULT_BUCKETS))[2] or DEFAULT_BUCKETS
+            series = self._values.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    state["buckets"][i] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    @contextmanager
+    def timer(self, name, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    # ---------------- Export ----------------
+    def _collect(self):
+        for fn in self._callbacks:
+            try:
+                fn(self)
+            except Exception as e:
+                print(f"Metrics collector failed: {e}")
+
+    def snapshot(self):
+        """{name: [{"labels": {...}, "value": v} or histogram fields]}"""
+        self._collect()
+        with self._lock:
+            out = {}
+            for name, series in self._values.items():
+                rows = []
+                for key, value in sorted(series.items()):
+                    row = {"labels": dict(key)}
+                    if isinstance(value, dict):
+                        buckets = self._meta[name][2] if name in self._meta else DEFAULT_BUCKETS
+                        row.update(
+                            buckets=dict(zip(map(str, buckets), value["buckets"])),
+                            sum=value["sum"],
+                            count=value["count"],
+                        )
+                    else:
+                        row["value"] = value
+                    rows.append(row)
+                out[name] = rows
+            return out
+
+    def render_prometheus(self):
+        self._collect()
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._values.items()):
+                kind, help_text, buckets = self._meta.get(name, ("untyped", None, None))
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in sorted(series.items()):
+                    if isinstance(value, dict):
+                        buckets = buckets or DEFAULT_BUCKETS
+                        for bound, count in zip(buckets, value["buckets"]):
+                            lines.append(f"{name}_bucket{_labels(key, le=bound)} {count}")
+                        lines.append(f"{name}_bucket{_labels(key, le='+Inf')} {value['count']}")
+                        lines.append(f"{name}_sum{_labels(key)} {value['sum']}")
+                        lines.append(f"{name}_count{_labels(key)} {value['count']}")
+                    else:
+                        lines.append(f"{name}{_labels(key)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"generatedAt": int(time.time() * 1000), "metrics": self.snapshot()}, f)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _labels(key, **extra):
+    pairs = list(key) + [(k, str(v)) for k, v in extra.items()]
+    if not pairs:
+        return ""
+    body = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in pairs
+    )
+    return "{" + body + "}"
+
+
+def serve_metrics(metrics, port, host="0.0.0.0"):
+    """Serve GET /metrics on a daemon thread. Returns the server."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass  # scrapes every few seconds would drown the worker's own output
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
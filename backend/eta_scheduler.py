@@ -0,0 +1,61 @@
+# /OLStar/backend/eta_scheduler.py
+"""
+Per-trip refresh timers for the ETA worker.
+
+Each trip has at most one pending refresh time. Times live in a heap; a
+reschedule or removal just replaces the trip's entry in `_due`, and the
+stale heap entry is skipped when it surfaces. Time comes from a clock
+object (time() in epoch seconds, sleep(seconds)) so the worker can be
+driven by a virtual clock.
+"""
+import heapq
+import itertools
+import time
+
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+
+class TripScheduler:
+    def __init__(self):
+        self._heap = []  # (due_at, seq, trip_id)
+        self._due = {}  # trip_id -> due_at of its live heap entry
+        self._seq = itertools.count()
+
+    def schedule(self, trip_id, due_at):
+        """Set (or move) the trip's next refresh."""
+        self._due[trip_id] = due_at
+        heapq.heappush(self._heap, (due_at, next(self._seq), trip_id))
+
+    def remove(self, trip_id):
+        self._due.pop(trip_id, None)
+
+    def pop_due(self, now):
+        """Trip ids whose refresh time is <= now, earliest first. They are unscheduled."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            due_at, _, trip_id = heapq.heappop(self._heap)
+            if self._due.get(trip_id) == due_at:
+                del self._due[trip_id]
+                due.append(trip_id)
+        return due
+
+    def next_due(self):
+        """Earliest pending refresh time, or None."""
+        while self._heap and self._due.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def due_at(self, trip_id):
+        return self._due.get(trip_id)
+
+    def __contains__(self, trip_id):
+        return trip_id in self._due
+
+    def __len__(self):
+        return len(self._due)
@@ -1,43 +1,104 @@
 import os
-import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-import requests
+import numpy as np
 import firebase_admin
 from firebase_admin import credentials, db
 from dotenv import load_dotenv
 
+from aviation_edge import FlightDataUnavailable, get_client
+from eta_lease import leases_from_env
+from eta_metrics import Metrics, serve_metrics
+from eta_scheduler import SystemClock, TripScheduler
+
 load_dotenv()
 
 # ----------------------------
 # Config / Environment
 # ----------------------------
 PH_TZ = timezone(timedelta(hours=8))  # Philippine time
-CHECK_INTERVAL_SECONDS = 60  # how often to check schedules
-
-# Firebase setup
-db_url = os.getenv("FIREBASE_DATABASE_URL")
-firebase_json_env = os.getenv("FIREBASE_ADMIN_JSON")  # prod
-firebase_file_env = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")  # local dev
-
-if not db_url:
-    raise RuntimeError("FIREBASE_DATABASE_URL must be set")
-
-if not firebase_admin._apps:
-    if firebase_json_env:
-        cred_dict = json.loads(firebase_json_env)
-        cred = credentials.Certificate(cred_dict)
-    elif firebase_file_env and os.path.isfile(firebase_file_env):
-        cred = credentials.Certificate(firebase_file_env)
-    else:
-        raise RuntimeError("Firebase credentials not found")
-    firebase_admin.initialize_app(cred, {"databaseURL": db_url})
+SCHEDULES_SYNC_SECONDS = 60  # how often to pick up added/changed/removed trips
+
+# Per-trip refresh planning (see plan_next_refresh)
+REFRESH_LEAD = timedelta(hours=1)  # ETAs are kept fresh from pickup - 1h to pickup
+MIN_REFRESH_SECONDS = 2 * 60
+MAX_REFRESH_SECONDS = 15 * 60
+FAR_HORIZON_SECONDS = 90 * 60  # flights further out wait until they're this close
+NO_DATA_RETRY_SECONDS = 10 * 60  # fallback ETA is fixed; matches the no-data cache TTL
+
+# All "now" reads go through this, so the worker can run on a virtual clock
+clock = SystemClock()
+
+def now_ph():
+    return datetime.fromtimestamp(clock.time(), PH_TZ)
+
+# Firebase setup (called from main, so the module can be imported against a
+# stand-in database - see sim/eta_sim.py)
+def init_firebase():
+    db_url = os.getenv("FIREBASE_DATABASE_URL")
+    firebase_json_env = os.getenv("FIREBASE_ADMIN_JSON")  # prod
+    firebase_file_env = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")  # local dev
+
+    if not db_url:
+        raise RuntimeError("FIREBASE_DATABASE_URL must be set")
+
+    if not firebase_admin._apps:
+        if firebase_json_env:
+            cred_dict = json.loads(firebase_json_env)
+            cred = credentials.Certificate(cred_dict)
+        elif firebase_file_env and os.path.isfile(firebase_file_env):
+            cred = credentials.Certificate(firebase_file_env)
+        else:
+            raise RuntimeError("Firebase credentials not found")
+        firebase_admin.initialize_app(cred, {"databaseURL": db_url})
 
 # ----------------------------
 # AviationEdge API Config
 # ----------------------------
 API_KEY = os.getenv("AVIATIONEDGE_KEY")  # Your API key
-BASE_URL = "https://aviation-edge.com/v2/public/flights"
+FLIGHT_LOOKUP_WORKERS = 8  # concurrent AviationEdge requests per cycle
+
+# Cached, rate-limited client (aviation_edge.py); its session pools the
+# keep-alive connections for all lookup threads
+aviation_edge = get_client(API_KEY)
+lookup_pool = ThreadPoolExecutor(max_workers=FLIGHT_LOOKUP_WORKERS)
+
+# ----------------------------
+# Metrics (GET :ETA_METRICS_PORT/metrics and/or ETA_METRICS_FILE)
+# ----------------------------
+METRICS_PORT = os.getenv("ETA_METRICS_PORT")
+METRICS_FILE = os.getenv("ETA_METRICS_FILE")
+
+metrics = Metrics()
+metrics.describe("eta_cycle_seconds", "histogram", "Duration of a worker stage (sync = schedule scan, refresh = ETA update)")
+metrics.describe("eta_trips_scanned_total", "counter", "Active trips seen by schedule syncs")
+metrics.describe("eta_trips_tracked", "gauge", "Trips with a pending ETA refresh")
+metrics.describe("eta_trips_refreshed_total", "counter", "ETAs written")
+metrics.describe("eta_fallbacks_total", "counter", "ETAs written from the trip time instead of a live position, by reason")
+metrics.describe("eta_trips_landed_total", "counter", "Refreshes that found the flight landed; the trip's last ETA is kept")
+metrics.describe("eta_rtdb_seconds", "histogram", "Realtime Database call duration by operation")
+metrics.describe("aviationedge_request_seconds", "histogram", "AviationEdge HTTP call duration by status")
+metrics.describe("aviationedge_client_total", "counter", "AviationEdge client events (cache hits, calls, retries, rate limited, stale served)")
+metrics.describe("aviationedge_tokens_available", "gauge", "Calls the rate limiter would allow right now")
+metrics.describe("eta_shards_held", "gauge", "Trip shards this worker holds a lease for")
+
+def use_aviation_edge(client):
+    """Route flight lookups through `client` (an aviation_edge.AviationEdgeClient)."""
+    global aviation_edge
+    aviation_edge = client
+    client.on_request = lambda seconds, status: metrics.observe(
+        "aviationedge_request_seconds", seconds, status=status
+    )
+
+use_aviation_edge(aviation_edge)
+
+def collect_client_stats(m):
+    for event, value in aviation_edge.counters.items():
+        m.set("aviationedge_client_total", value, event=event)
+    m.set("aviationedge_tokens_available", round(aviation_edge.bucket.available, 2))
+
+metrics.on_collect(collect_client_stats)
 
 # ----------------------------
 # NAIA / Clark default coordinates
@@ -48,16 +109,15 @@ AIRPORT_COORDS = {
 }
 
 # ----------------------------
-# Haversine formula
+# Haversine formula (element-wise over NumPy arrays)
 # ----------------------------
-import math
 def haversine(lat1, lon1, lat2, lon2):
     R = 6371  # km
-    phi1, phi2 = math.radians(lat1), math.radians(lat2)
-    delta_phi = math.radians(lat2 - lat1)
-    delta_lambda = math.radians(lon2 - lon1)
-    a = math.sin(delta_phi/2)**2 + math.cos(phi1)*math.cos(phi2)*math.sin(delta_lambda/2)**2
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    phi1, phi2 = np.radians(lat1), np.radians(lat2)
+    delta_phi = np.radians(lat2 - lat1)
+    delta_lambda = np.radians(lon2 - lon1)
+    a = np.sin(delta_phi/2)**2 + np.cos(phi1)*np.cos(phi2)*np.sin(delta_lambda/2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
     return R * c
 
 # ----------------------------
@@ -65,63 +125,127 @@ def haversine(lat1, lon1, lat2, lon2):
 # ----------------------------
 def get_flight_data(flight_number, airport_icao):
     try:
-        params = {"key": API_KEY, "flightIata": flight_number}
-        response = requests.get(BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        if not data:
-            raise Exception("No live data available")
-        flight = data[0]
-
-        geography = flight.get("geography")
-        speed = flight.get("speed")
-        arrival = flight.get("arrival")
-
-        if not geography or not speed or speed.get("horizontal", 0) == 0:
-            raise Exception("Flight not yet departed or speed unavailable")
-
-        if arrival is None or arrival.get("latitude") is None or arrival.get("longitude") is None:
-            arrival = {"latitude": AIRPORT_COORDS.get(airport_icao, (0, 0))[0],
-                       "longitude": AIRPORT_COORDS.get(airport_icao, (0, 0))[1]}
-            flight["arrival"] = arrival
-
-        return flight
-    except Exception as e:
+        flight = aviation_edge.get_flight(flight_number)
+    except FlightDataUnavailable as e:
         # Return None if flight data is not usable
-        print(f"Flight data fallback triggered: {e}")
+        print(f"Flight data fallback triggered ({e.reason}): {e}")
+        metrics.inc("eta_fallbacks_total", reason=e.reason)
+        return None
+
+    arrival = flight.get("arrival")
+    if arrival is None or arrival.get("latitude") is None or arrival.get("longitude") is None:
+        # The record is shared through the cache; patch a copy
+        arrival = {"latitude": AIRPORT_COORDS.get(airport_icao, (0, 0))[0],
+                   "longitude": AIRPORT_COORDS.get(airport_icao, (0, 0))[1]}
+        flight = dict(flight, arrival=arrival)
+
+    return flight
+
+def fetch_flights(keys):
+    """
+    Look up each unique (flightNumber, airport) once, concurrently.
+    Returns {key: flight or None}.
+    """
+    futures = {key: lookup_pool.submit(get_flight_data, *key) for key in keys}
+    return {key: future.result() for key, future in futures.items()}
+
+def flight_vector(flight):
+    """(lat, lon, speed_kmh, arrival lat, arrival lon) as floats, or None if unusable."""
+    try:
+        row = tuple(float(v) for v in (
+            flight["geography"]["latitude"],
+            flight["geography"]["longitude"],
+            flight["speed"]["horizontal"],
+            flight["arrival"]["latitude"],
+            flight["arrival"]["longitude"],
+        ))
+    except (KeyError, TypeError, ValueError):
         return None
+    return row if row[2] > 0 else None
 
-def calculate_eta(flight):
-    lat1 = flight["geography"]["latitude"]
-    lon1 = flight["geography"]["longitude"]
-    speed_kmh = flight["speed"]["horizontal"]
-    lat2 = flight["arrival"]["latitude"]
-    lon2 = flight["arrival"]["longitude"]
+def calculate_etas(flights):
+    """
+    ETAs for every usable flight in one vectorized pass.
+    flights: {key: flight}. Returns {key: (distance_km, eta_hours, eta_local)}.
+    """
+    keys, rows = [], []
+    for key, flight in flights.items():
+        if flight and flight.get("status") == "landed":
+            continue  # nothing left to estimate; see refresh_etas
+        row = flight_vector(flight) if flight else None
+        if row is None:
+            if flight:
+                print(f"Error calculating ETA: unusable position for {key[0]}")
+                metrics.inc("eta_fallbacks_total", reason="unusable_position")
+            continue
+        keys.append(key)
+        rows.append(row)
+    if not rows:
+        return {}
 
+    lat1, lon1, speed_kmh, lat2, lon2 = np.array(rows).T
     distance_km = haversine(lat1, lon1, lat2, lon2)
     eta_hours = distance_km / speed_kmh
-    current_utc = datetime.now(timezone.utc)
-    eta_utc = current_utc + timedelta(hours=eta_hours)
-    eta_local = eta_utc.astimezone(PH_TZ)
-    eta_local += timedelta(minutes=5)  # buffer
-    return distance_km, eta_hours, eta_local
+
+    current_utc = datetime.fromtimestamp(clock.time(), timezone.utc)
+    return {
+        key: (
+            float(distance),
+            float(hours),
+            # + 5 minutes buffer
+            (current_utc + timedelta(hours=float(hours), minutes=5)).astimezone(PH_TZ)
+        )
+        for key, distance, hours in zip(keys, distance_km, eta_hours)
+    }
 
 # ----------------------------
 # Helper functions
 # ----------------------------
+# Today's schedules, kept between cycles. Backend writes bump
+# schedulesMeta/changes, so one tiny read per cycle tells us whether to
+# re-run the date query; writes that skip the stamp (driver app) are picked
+# up by the periodic refresh.
+SCHEDULES_REFRESH_SECONDS = 10 * 60
+_todays_schedules = {"date": None, "changes": None, "loadedAt": None, "trips": {}}
+
+def get_todays_schedules(today_str):
+    cached = _todays_schedules
+    with metrics.timer("eta_rtdb_seconds", op="schedules_meta"):
+        changes = db.reference("schedulesMeta/changes").get()
+
+    if (
+        cached["date"] != today_str
+        or changes is None
+        or cached["changes"] != changes
+        or clock.time() - cached["loadedAt"] > SCHEDULES_REFRESH_SECONDS
+    ):
+        # Indexed on date (database.indexes.json): only today's trips download
+        with metrics.timer("eta_rtdb_seconds", op="schedules_query"):
+            trips = db.reference("schedules").order_by_child("date").equal_to(today_str).get() or {}
+        cached.update(date=today_str, changes=changes, loadedAt=clock.time(), trips=trips)
+
+    return cached["trips"]
+
+# Filtered once per download of today's schedules; the same list object
+# comes back until then, which lets the loop skip re-syncing
+_active_schedules = {"source": None, "trips": []}
+
 def get_active_schedules():
-    ref = db.reference("/schedules")
-    all_schedules = ref.get() or {}
+    today_str = now_ph().strftime("%Y-%m-%d")
+    source = get_todays_schedules(today_str)
+    if _active_schedules["source"] is source:
+        return _active_schedules["trips"]
+
     active = []
-    today_str = datetime.now(PH_TZ).strftime("%Y-%m-%d")
-    for tripId, trip in all_schedules.items():
+    for tripId, trip in source.items():
         if (
             trip.get("tripType") == "Arrival" and
             trip.get("status") not in ("Completed", "Cancelled") and
             trip.get("date") == today_str
         ):
-            trip["tripId"] = tripId
+            trip = dict(trip, tripId=tripId)
             active.append(trip)
+    _active_schedules.update(source=source, trips=active)
     return active
 
 def get_airport_from_pickup(pickup):
@@ -132,61 +256,218 @@ def get_airport_from_pickup(pickup):
     return None
 
 def parse_trip_time(time_str):
-    now = datetime.now(PH_TZ)
+    now = now_ph()
     trip_time = datetime.strptime(time_str, "%I:%M%p")
     return now.replace(hour=trip_time.hour, minute=trip_time.minute, second=0, microsecond=0)
 
-def should_run_eta(trip):
-    trip_time = parse_trip_time(trip["time"])
-    now = datetime.now(PH_TZ)
-    return trip_time - timedelta(hours=1) <= now <= trip_time
+def store_etas(etas):
+    """Write {trip_id: eta_datetime} in one multi-path update."""
+    if not etas:
+        return
+    timestamp = int(clock.time() * 1000)  # milliseconds
+    updates = {}
+    for trip_id, eta_datetime in etas.items():
+        updates[f"schedules/{trip_id}/ETA"] = {
+            "est": eta_datetime.strftime("%Y-%m-%d %H:%M:%S"),
+            "timestamp": timestamp
+        }
+        updates[f"schedules/{trip_id}/updatedAt"] = {".sv": "timestamp"}
 
-def store_eta(trip_id, eta_datetime):
-    ref = db.reference(f"/schedules/{trip_id}/ETA")
-    ref.set({
-        "est": eta_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-        "timestamp": int(datetime.utcnow().timestamp() * 1000)  # milliseconds
-    })
+    # Stamp the schedules and schedulesMeta like routes/schedules.py does,
+    # so dashboards polling with ?since= / ETags pick the new ETAs up.
+    updates["schedulesMeta/version"] = {".sv": "timestamp"}
+    updates["schedulesMeta/changes"] = {".sv": {"increment": 1}}
+    with metrics.timer("eta_rtdb_seconds", op="eta_write"):
+        db.reference().update(updates)
+    metrics.inc("eta_trips_refreshed_total", len(etas))
+    # Our own stamp shouldn't force a refetch of today's schedules
+    if _todays_schedules["changes"] is not None:
+        _todays_schedules["changes"] += 1
 
 # ----------------------------
-# Scheduler loop
+# Refresh planning
 # ----------------------------
-def eta_worker_loop():
-    print("ETA Worker started")
-    while True:
-        now = datetime.now(PH_TZ)
-        schedules = get_active_schedules()
+def trip_signature(trip):
+    """Fields the refresh plan depends on; a change re-plans the trip."""
+    return (trip.get("time"), trip.get("flightNumber"), trip.get("pickup"))
 
-        for trip in schedules:
-            if not should_run_eta(trip):
-                continue
-            if now.minute % 15 != 0:
-                continue
+def first_refresh(trip, now):
+    """Epoch seconds of the trip's first ETA refresh, or None if it needs none."""
+    if not get_airport_from_pickup(trip.get("pickup") or ""):
+        return None
+    try:
+        pickup = parse_trip_time(trip["time"])
+    except (KeyError, TypeError, ValueError):
+        print(f"Skipping trip {trip['tripId']}: bad time {trip.get('time')!r}")
+        return None
+    if now > pickup:
+        return None
+    return max(now, pickup - REFRESH_LEAD).timestamp()
 
-            airport = get_airport_from_pickup(trip["pickup"])
-            if not airport:
-                continue
+def plan_next_refresh(trip, now, flight, eta_hours):
+    """
+    Epoch seconds of the next refresh after one at `now`, or None when done.
+
+    With a live position the interval shrinks as the flight closes in: a
+    third of the time left, between MIN and MAX_REFRESH_SECONDS. A flight
+    more than FAR_HORIZON_SECONDS out isn't looked at again until it's that
+    close. Landed flights and trips past pickup time are dropped.
+    """
+    pickup = parse_trip_time(trip["time"])
+    if now >= pickup or (flight and flight.get("status") == "landed"):
+        return None
+
+    if eta_hours is None:
+        interval = NO_DATA_RETRY_SECONDS
+    else:
+        seconds_left = eta_hours * 3600
+        if seconds_left > FAR_HORIZON_SECONDS:
+            interval = seconds_left - FAR_HORIZON_SECONDS
+        else:
+            interval = min(MAX_REFRESH_SECONDS, max(MIN_REFRESH_SECONDS, seconds_left / 3))
+
+    # One last refresh at pickup time, as the old 15-minute window did
+    return min(now + timedelta(seconds=interval), pickup).timestamp()
+
+def sync_trips(scheduler, trips, active, now):
+    """Bring `trips` (tripId -> trip) and the scheduler in line with today's active trips."""
+    active = {trip["tripId"]: trip for trip in active}
+
+    for trip_id in list(trips):
+        if trip_id not in active:  # completed, cancelled, deleted or yesterday's
+            scheduler.remove(trip_id)
+            del trips[trip_id]
+
+    for trip_id, trip in active.items():
+        previous = trips.get(trip_id)
+        trips[trip_id] = trip
+        if previous is not None and trip_signature(previous) == trip_signature(trip):
+            continue
+        due_at = first_refresh(trip, now)
+        if due_at is None:
+            scheduler.remove(trip_id)
+        else:
+            scheduler.schedule(trip_id, due_at)
 
-            eta_local = None
-            flight = None
-            try:
-                flight = get_flight_data(trip["flightNumber"], airport)
-                if flight:
-                    _, _, eta_local = calculate_eta(flight)
-            except Exception as e:
-                print(f"Error calculating ETA: {e}")
+def refresh_etas(scheduler, due):
+    now = now_ph()
+    keyed = [
+        (trip, (trip.get("flightNumber"), get_airport_from_pickup(trip["pickup"])))
+        for trip in due
+    ]
 
+    # Group bookings share a flight: fetch each flight once, all at once
+    flights = fetch_flights({key for _, key in keyed if key[0]})
+
+    etas = calculate_etas(flights)
+
+    trip_etas = {}
+    for trip, key in keyed:
+        flight = flights.get(key)
+        _, eta_hours, eta_local = etas.get(key, (None, None, None))
+
+        if flight and flight.get("status") == "landed":
+            # The last live ETA stands and the trip needs no more refreshes.
+            # Only a trip first looked at after landing gets one now.
+            metrics.inc("eta_trips_landed_total")
+            if trip.get("ETA"):
+                continue
+            eta_local = now + timedelta(minutes=5)
+        elif not eta_local:
             # fallback if flight data missing
-            if not eta_local:
-                eta_local = parse_trip_time(trip["time"]) + timedelta(minutes=5)
+            eta_local = parse_trip_time(trip["time"]) + timedelta(minutes=5)
+            if not key[0]:
+                metrics.inc("eta_fallbacks_total", reason="no_flight_number")
+        trip_etas[trip["tripId"]] = eta_local
+        # Our copy of the trip isn't re-read after our own writes; keep it in
+        # step so a landing seen later knows there is an ETA to keep
+        trip["ETA"] = {"est": eta_local.strftime("%Y-%m-%d %H:%M:%S")}
 
-            store_eta(trip["tripId"], eta_local)
-            print(f"[{now.strftime('%H:%M')}] ETA updated for trip {trip['tripId']}")
+        next_at = plan_next_refresh(trip, now, flight, eta_hours)
+        if next_at is not None:
+            scheduler.schedule(trip["tripId"], next_at)
 
-        time.sleep(CHECK_INTERVAL_SECONDS)
+    store_etas(trip_etas)
+    print(f"[{now.strftime('%H:%M')}] ETA updated for {len(trip_etas)} trip(s)")
+
+# ----------------------------
+# Scheduler loop
+# ----------------------------
+def eta_worker_loop(leases=None, until=None):
+    """
+    Refresh ETAs until clock time `until` (forever if None). With `leases`
+    (eta_lease.ShardLeases) only trips in shards this worker holds are
+    refreshed; without, every trip is.
+    """
+    print("ETA Worker started")
+    scheduler = TripScheduler()
+    trips = {}  # tripId -> trip as of the last sync
+    next_sync = next_tick = clock.time()
+    held = None
+    synced = None  # active-trip list the scheduler was last synced with
+
+    while until is None or clock.time() < until:
+        if leases is not None and clock.time() >= next_tick:
+            with metrics.timer("eta_rtdb_seconds", op="lease_tick"):
+                now_held = leases.tick()
+            metrics.set("eta_shards_held", len(now_held))
+            if now_held != held:
+                print(f"Worker {leases.worker_id} holds shards {sorted(now_held)} of {leases.shards}")
+                held = now_held
+                # Workers share one API quota in proportion to their shards
+                aviation_edge.set_share(len(held) / leases.shards)
+                next_sync = clock.time()  # re-plan for the new set of trips
+                synced = None
+            next_tick = clock.time() + leases.renew_interval
+
+        worked = False
+        if clock.time() >= next_sync:
+            with metrics.timer("eta_cycle_seconds", stage="sync"):
+                active = get_active_schedules()
+                if active is not synced:  # unchanged since the last sync otherwise
+                    synced = active
+                    if leases is not None:
+                        active = [trip for trip in active if leases.owns(trip["tripId"])]
+                    sync_trips(scheduler, trips, active, now_ph())
+                    metrics.inc("eta_trips_scanned_total", len(active))
+                    metrics.set("eta_trips_tracked", len(scheduler))
+                    worked = True
+            next_sync = clock.time() + SCHEDULES_SYNC_SECONDS
+
+        due = [trips[trip_id] for trip_id in scheduler.pop_due(clock.time())]
+        if leases is not None:
+            # A lease may have lapsed since the last tick. Forget those trips;
+            # the next sync plans them again if the shard is still ours.
+            for trip in due:
+                if not leases.owns(trip["tripId"]):
+                    del trips[trip["tripId"]]
+                    synced = None
+            due = [trip for trip in due if trip["tripId"] in trips]
+        if due:
+            with metrics.timer("eta_cycle_seconds", stage="refresh"):
+                refresh_etas(scheduler, due)
+            metrics.set("eta_trips_tracked", len(scheduler))
+            worked = True
+
+        if worked and METRICS_FILE:
+            metrics.write_json(METRICS_FILE)
+
+        # Sleep until the next trip is due, lease renewal, or schedule sync
+        wake_at = min(
+            t for t in (scheduler.next_due(), next_sync, next_tick if leases else None, until)
+            if t is not None
+        )
+        clock.sleep(max(0, wake_at - clock.time()))
 
 # ----------------------------
 # Main entry
 # ----------------------------
 if __name__ == "__main__":
-    eta_worker_loop()
+    init_firebase()
+    if METRICS_PORT:
+        serve_metrics(metrics, int(METRICS_PORT))
+    leases = leases_from_env(clock)
+    try:
+        eta_worker_loop(leases)
+    finally:
+        leases.release_all()
@@ -0,0 +1,203 @@
+# /OLStar/backend/indexes.py
+"""
+Small denormalized lookup nodes kept next to the trees they summarize.
+
+    userNames/<uid>          "First Last" for every user record
+    unitAssignments/<unit>   uid holding the transport unit ("" = free)
+
+Admin write handlers merge the *_updates() entries below into their own
+multi-path update so an index never drifts from its source. Records written
+elsewhere (driver app, console edits) are picked up lazily on lookup, and
+maintenance.py can rebuild an index from scratch.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from firebase_admin import db
+
+from rtdb_cache import cache
+
+USER_NAMES = "userNames"
+UNIT_ASSIGNMENTS = "unitAssignments"
+HEAL_WORKERS = 8
+UNKNOWN_UID_TTL = 300  # don't re-read deleted requesters on every page
+
+_unknown_uids = {}  # uid -> monotonic expiry
+
+
+# ---------------- userNames ----------------
+def display_name(user):
+    user = user or {}
+    return f"{user.get('firstName') or ''} {user.get('lastName') or ''}".strip()
+
+
+def user_name_updates(uid, user):
+    """Multi-path entry for a user's name; pass user=None when deleting."""
+    return {f"{USER_NAMES}/{uid}": display_name(user) or None}
+
+
+def resolve_user_names(uids):
+    """
+    {uid: name} for `uids` from the cached name index. Uids missing from it
+    (written outside this backend, or before the backfill) are read from
+    users/<uid>/firstName and lastName and written back to the index.
+    """
+    names = cache.get(USER_NAMES) or {}
+    if not isinstance(names, dict):
+        names = {}
+    wanted = {uid for uid in uids if uid}
+    now = time.monotonic()
+    missing = [
+        uid for uid in wanted
+        if uid not in names and _unknown_uids.get(uid, 0) < now
+    ]
+
+    resolved = {uid: names[uid] for uid in wanted if uid in names}
+    if not missing:
+        return resolved
+
+    def read_name(uid):
+        return uid, display_name({
+            field: db.reference(f"users/{uid}/{field}").get()
+            for field in ("firstName", "lastName")
+        })
+
+    with ThreadPoolExecutor(max_workers=min(HEAL_WORKERS, len(missing))) as pool:
+        healed = dict(pool.map(read_name, missing))
+
+    for uid, name in healed.items():
+        if not name:
+            _unknown_uids[uid] = now + UNKNOWN_UID_TTL
+
+    updates = {f"{USER_NAMES}/{uid}": name for uid, name in healed.items() if name}
+    if updates:
+        db.reference().update(updates)
+        cache.invalidate(USER_NAMES)
+
+    resolved.update({uid: name for uid, name in healed.items() if name})
+    return resolved
+
+
+def rebuild_user_names():
+    """Overwrite userNames from the full users tree. Returns the entry count."""
+    users = db.reference("users").get() or {}
+    names = {
+        uid: display_name(user)
+        for uid, user in users.items()
+        if isinstance(user, dict) and display_name(user)
+    }
+    db.reference(USER_NAMES).set(names)
+    cache.invalidate(USER_NAMES)
+    return len(names)
+
+
+# ---------------- unitAssignments ----------------
+def claim_unit(uid, unit_id):
+    """
+    Make `uid` the holder of `unit_id` ("" to just release its current unit).
+
+    unitAssignments/<unit> is claimed with a transaction, so concurrent
+    claims serialize and each one learns who it displaced. Returns the
+    multi-path entries the caller writes together with its own update:
+    the uid's new unit and the previous holder's cleared one. Call
+    settle_unit_claim() after that write, or rollback_unit_claim() if it
+    failed.
+    """
+    updates = {f"users/{uid}/defaultTransportUnit": unit_id or ""}
+
+    old_unit = db.reference(f"users/{uid}/defaultTransportUnit").get()
+    if old_unit and old_unit != unit_id:
+        release_unit(uid, old_unit)
+
+    if unit_id:
+        displaced = []
+
+        def take(current):
+            displaced[:] = [current]  # last attempt wins on retry
+            return uid
+
+        db.reference(f"{UNIT_ASSIGNMENTS}/{unit_id}").transaction(take)
+        holder = displaced[0] if displaced else None
+        if holder and holder != uid:
+            updates[f"users/{holder}/defaultTransportUnit"] = ""
+
+    return updates
+
+
+def settle_unit_claim(uid, unit_id):
+    """
+    Run after writing claim_unit()'s updates. If a later claim took the unit
+    in the meantime, its write may have landed before ours; drop our copy so
+    the unit never ends up with two holders.
+    """
+    if not unit_id:
+        return
+    if db.reference(f"{UNIT_ASSIGNMENTS}/{unit_id}").get() != uid:
+        db.reference(f"users/{uid}/defaultTransportUnit").transaction(
+            lambda current: "" if current == unit_id else current
+        )
+
+
+def rollback_unit_claim(uid, unit_id, updates):
+    """
+    Undo claim_unit(uid, unit_id) whose `updates` never got written: hand
+    the unit back to the holder it displaced and re-take the uid's old unit,
+    so later assignments don't see a false conflict.
+    """
+    if unit_id:
+        suffix = "/defaultTransportUnit"
+        displaced = [
+            path[len("users/"):-len(suffix)] for path in updates
+            if path.endswith(suffix) and path != f"users/{uid}{suffix}"
+        ]
+        holder = displaced[0] if displaced else ""
+        db.reference(f"{UNIT_ASSIGNMENTS}/{unit_id}").transaction(
+            lambda current: holder if current == uid else (current or "")
+        )
+
+    # claim_unit() released the unit the user record still names
+    old_unit = db.reference(f"users/{uid}/defaultTransportUnit").get()
+    if old_unit and old_unit != unit_id:
+        db.reference(f"{UNIT_ASSIGNMENTS}/{old_unit}").transaction(
+            lambda current: current or uid
+        )
+
+
+def release_unit(uid, unit_id):
+    """Free unitAssignments/<unit_id> if `uid` still holds it."""
+    ref = db.reference(f"{UNIT_ASSIGNMENTS}/{unit_id}")
+    if ref.get() != uid:
+        return
+    # Transactions can't delete, so a free unit is stored as ""
+    ref.transaction(lambda current: "" if current == uid else (current or ""))
+
+
+def rebuild_unit_assignments(dry_run=False):
+    """
+    Rebuild unitAssignments from users/*/defaultTransportUnit. A unit held by
+    several users stays with the one the old index named (or the first uid)
+    and is cleared from the others. Returns {"units": n, "cleared": [...]}.
+    """
+    users = db.reference("users").get() or {}
+    current = db.reference(UNIT_ASSIGNMENTS).get() or {}
+
+    holders = {}
+    for uid in sorted(users):
+        user = users[uid]
+        unit_id = user.get("defaultTransportUnit") if isinstance(user, dict) else None
+        if unit_id:
+            holders.setdefault(unit_id, []).append(uid)
+
+    index = {}
+    cleared = []
+    for unit_id, uids in holders.items():
+        keep = current.get(unit_id) if current.get(unit_id) in uids else uids[0]
+        index[unit_id] = keep
+        cleared.extend((uid, unit_id) for uid in uids if uid != keep)
+
+    if not dry_run:
+        updates = {f"users/{uid}/defaultTransportUnit": "" for uid, _ in cleared}
+        updates[UNIT_ASSIGNMENTS] = index or None
+        db.reference().update(updates)
+
+    return {"units": len(index), "cleared": cleared}
@@ -0,0 +1,85 @@
+# /OLStar/backend/maintenance.py
+"""
+One-off maintenance commands against the Realtime Database.
+
+    python backend/maintenance.py rebuild-stats
+    python backend/maintenance.py rebuild-user-names
+    python backend/maintenance.py repair-unit-assignments [--dry-run]
+"""
+import os
+import json
+import argparse
+
+import firebase_admin
+from firebase_admin import credentials
+from dotenv import load_dotenv
+
+
+def init_firebase():
+    load_dotenv()
+    db_url = os.getenv("FIREBASE_DATABASE_URL")
+    firebase_json_env = os.getenv("FIREBASE_ADMIN_JSON")  # prod
+    firebase_file_env = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")  # local dev
+
+    if not db_url:
+        raise RuntimeError("FIREBASE_DATABASE_URL must be set")
+
+    if not firebase_admin._apps:
+        if firebase_json_env:
+            cred = credentials.Certificate(json.loads(firebase_json_env))
+        elif firebase_file_env and os.path.isfile(firebase_file_env):
+            cred = credentials.Certificate(firebase_file_env)
+        else:
+            raise RuntimeError("Firebase credentials not found")
+        firebase_admin.initialize_app(cred, {"databaseURL": db_url})
+
+
+def cmd_rebuild_stats(args):
+    from stats import rebuild_stats
+    stats = rebuild_stats()
+    if stats is None:
+        print("Counters kept changing during the scan; nothing written. Try again.")
+        return
+    print(json.dumps(stats["live"], indent=2))
+    print(f"Rebuilt daily booking counts for {len(stats['daily'])} dates")
+
+
+def cmd_rebuild_user_names(args):
+    from indexes import rebuild_user_names
+    print(f"Indexed {rebuild_user_names()} user names")
+
+
+def cmd_repair_unit_assignments(args):
+    from indexes import rebuild_unit_assignments
+    report = rebuild_unit_assignments(dry_run=args.dry_run)
+    for uid, unit_id in report["cleared"]:
+        print(f"{'Would clear' if args.dry_run else 'Cleared'} unit {unit_id} from user {uid}")
+    print(f"Indexed {report['units']} assigned units")
+
+
+COMMANDS = {
+    "rebuild-stats": (cmd_rebuild_stats, "Recompute /stats counters from the raw trees"),
+    "rebuild-user-names": (cmd_rebuild_user_names, "Rebuild the /userNames index from /users"),
+    "repair-unit-assignments": (
+        cmd_repair_unit_assignments,
+        "Rebuild /unitAssignments and clear units held by more than one user"
+    ),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OLStar RTDB maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text)
+    sub.choices["repair-unit-assignments"].add_argument(
+        "--dry-run", action="store_true", help="Report conflicts without writing"
+    )
+
+    args = parser.parse_args(argv)
+    init_firebase()
+    COMMANDS[args.command][0](args)
+
+
+if __name__ == "__main__":
+    main()
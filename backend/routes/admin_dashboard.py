@@ -1,11 +1,32 @@
 # backend/routes/admin_dashboard.py
-from flask import Blueprint, jsonify
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, jsonify, request
 from firebase_admin import db
 from decorators import admin_required
+from rtdb_cache import CALENDAR_PREFIX, cached_get, cache
+from rtdb_mirror import get_mirror, mirror_status
+from routes.admin_requests import list_requests
+from stats import (
+    DATE_RE, STATS_ROOT, daily_bookings_path, metrics_from_stats, read_dashboard_metrics,
+    rebuild_stats, rebuild_stats_async
+)
 from datetime import datetime, timedelta
 
 admin_dashboard_api = Blueprint("admin_dashboard_api", __name__)
 
+# Shared by all bootstrap requests so concurrent page loads can't fan out
+# into an unbounded number of RTDB connections.
+BOOTSTRAP_WORKERS = 8
+RECENT_REQUESTS_LIMIT = 50
+CALENDAR_WINDOW_MARGIN_DAYS = 7
+CALENDAR_MAX_MONTHS = 3
+CALENDAR_CACHE_TTL = 300
+MONTH_RE = re.compile(r"^\d{4}-\d{2}$")
+_bootstrap_pool = ThreadPoolExecutor(max_workers=BOOTSTRAP_WORKERS)
+_calendar_version = {"changes": None}  # schedulesMeta/changes the cached months were read at
+
 # ----------------------
 # DASHBOARD METRICS
 # ----------------------
@@ -13,80 +34,67 @@ admin_dashboard_api = Blueprint("admin_dashboard_api", __name__)
 @admin_required
 def dashboard_metrics():
     try:
-        users_ref = db.reference("users")
-        users = users_ref.get() or {}
+        mirror = get_mirror("users", "requests", "schedules")
+        if mirror:
+            return jsonify(_mirror_metrics(mirror))
 
-        requests_ref = db.reference("requests")
-        requests = requests_ref.get() or {}
+        # One small read of the materialized counters (see stats.py)
+        metrics = read_dashboard_metrics()
+        if metrics is not None:
+            return jsonify(metrics)
 
-        bookings_ref = db.reference("schedules")
-        all_bookings = bookings_ref.get() or {}
+        # Counters never built: answer from a full scan and build them
+        rebuild_stats_async()
+        return jsonify(_scan_metrics(
+            cached_get("users") or {},
+            db.reference("requests").get() or {},
+            db.reference("schedules").get() or {}
+        ))
+    except Exception as e:
+        print("Error fetching dashboard metrics:", e)
+        return jsonify({"error": str(e)}), 500
 
-        # Current date in server timezone
-        today = datetime.now().date()
+def _scan_metrics(users, requests, all_bookings):
+    """Dashboard numbers counted from the raw trees."""
+    # Current date in server timezone
+    today = datetime.now().date()
 
-        # Count bookings where date matches today
-        bookings_today = [
-            b for b in all_bookings.values()
-            if "date" in b and datetime.strptime(b["date"], "%Y-%m-%d").date() == today
-        ]
+    # Count bookings where date matches today
+    bookings_today = [
+        b for b in all_bookings.values()
+        if "date" in b and datetime.strptime(b["date"], "%Y-%m-%d").date() == today
+    ]
 
-        drivers_online = sum(
-            1 for u in users.values() if u.get("role") == "driver" and u.get("currentLocation")
-        )
+    drivers_online = sum(
+        1 for u in users.values() if u.get("role") == "driver" and u.get("currentLocation")
+    )
 
-        pending_requests = sum(
-            1 for r in requests.values() if r.get("status") == "pending"
-        )
+    pending_requests = sum(
+        1 for r in requests.values() if r.get("status") == "pending"
+    )
 
-        active_sessions = sum(1 for u in users.values() if u.get("active"))
+    active_sessions = sum(1 for u in users.values() if u.get("active"))
 
-        return jsonify({
-            "totalUsers": len(users),
-            "activeSessions": active_sessions,
-            "bookingsToday": len(bookings_today),
-            "driversOnline": drivers_online,
-            "pendingRequests": pending_requests
-        })
-    except Exception as e:
-        print("Error fetching dashboard metrics:", e)
-        return jsonify({"error": str(e)}), 500
+    return {
+        "totalUsers": len(users),
+        "activeSessions": active_sessions,
+        "bookingsToday": len(bookings_today),
+        "driversOnline": drivers_online,
+        "pendingRequests": pending_requests
+    }
 
-# ----------------------
-# GET TRANSACTION REQUESTS
-# ----------------------
-@admin_dashboard_api.route("/api/admin/requests", methods=["GET"])
-@admin_required
-def get_requests():
-    try:
-        requests_ref = db.reference("requests")
-        requests = requests_ref.get() or {}
-
-        users_ref = db.reference("users")
-        users = users_ref.get() or {}
-
-        requests_list = []
-        for rid, r in requests.items():
-            uid = r.get("requestedBy")
-            user = users.get(uid, {})
-            name = f"{user.get('firstName','')} {user.get('lastName','')}".strip()
-            requests_list.append({
-                "id": rid,
-                "amount": r.get("amount"),
-                "gcashUrl": r.get("gcashUrl"),
-                "mileageURL": r.get("mileageURL"),
-                "receiptUrl": r.get("receiptUrl"),
-                "requestedBy": uid,
-                "requestedByName": name or "Unknown",
-                "status": r.get("status"),
-                "timestamp": r.get("timestamp")
-            })
-
-        requests_list.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
-        return jsonify({"requests": requests_list})
-    except Exception as e:
-        print("Error fetching requests:", e)
-        return jsonify({"error": str(e)}), 500
+def _mirror_metrics(mirror):
+    """Same numbers as dashboard_metrics, answered from the local mirror."""
+    today = datetime.now().date().isoformat()
+    return {
+        "totalUsers": mirror.scalar("SELECT COUNT(*) FROM users"),
+        "activeSessions": mirror.scalar("SELECT COUNT(*) FROM users WHERE active"),
+        "bookingsToday": mirror.scalar("SELECT COUNT(*) FROM schedules WHERE date = ?", (today,)),
+        "driversOnline": mirror.scalar(
+            "SELECT COUNT(*) FROM users WHERE role = 'driver' AND hasLocation"
+        ),
+        "pendingRequests": mirror.scalar("SELECT COUNT(*) FROM requests WHERE status = 'pending'")
+    }
 
 # ----------------------
 # DRIVERS ONLINE (for mini map)
@@ -95,96 +103,263 @@ def get_requests():
 @admin_required
 def drivers_online():
     try:
-        users_ref = db.reference("users")
-        users = users_ref.get() or {}
-
-        drivers = []
-        for uid, u in users.items():
-            if u.get("role") != "driver":
-                continue
-            loc = u.get("currentLocation")
-            if loc:
-                drivers.append({
-                    "uid": uid,
-                    "name": f"{u.get('firstName','')} {u.get('lastName','')}".strip(),
-                    "latitude": loc.get("latitude"),
-                    "longitude": loc.get("longitude"),
-                    "status": u.get("status", "Offline")
-                })
+        users = cached_get("users") or {}
 
+        drivers = _driver_rows(users)
         return jsonify({"drivers": drivers})
     except Exception as e:
         print("Error fetching drivers:", e)
         return jsonify({"error": str(e)}), 500
 
+def _driver_rows(users):
+    drivers = []
+    for uid, u in users.items():
+        if u.get("role") != "driver":
+            continue
+        loc = u.get("currentLocation")
+        if loc:
+            drivers.append({
+                "uid": uid,
+                "name": f"{u.get('firstName','')} {u.get('lastName','')}".strip(),
+                "latitude": loc.get("latitude"),
+                "longitude": loc.get("longitude"),
+                "status": u.get("status", "Offline")
+            })
+    return drivers
+
 # ----------------------
 # CALENDAR SCHEDULES - WITH CLIENTNAME
 # ----------------------
 @admin_dashboard_api.route("/api/admin/calendar/schedules", methods=["GET"])
 @admin_required
 def get_calendar_schedules():
+    """
+    Compact schedules for one calendar window.
+    Query: from=YYYY-MM-DD&to=YYYY-MM-DD, or month=YYYY-MM (default: this month).
+    """
     try:
-        # Get all schedules
-        schedules_ref = db.reference("schedules")
-        schedules = schedules_ref.get() or {}
-        
-        print(f"Found {len(schedules)} schedules in database")
-        
-        # Optional: Get users for additional info if needed
-        users_ref = db.reference("users")
-        users = users_ref.get() or {}
-
-        schedules_list = []
-        for sid, schedule in schedules.items():
-            # Debug: print first few schedules to see structure
-            if len(schedules_list) < 3:
-                print(f"Schedule {sid} data:", schedule)
-            
-            # Create schedule object with all fields including clientName
-            schedule_data = {
-                "id": sid,
-                "date": schedule.get("date"),
-                "time": schedule.get("time"),
-                "flightNumber": schedule.get("flightNumber"),
-                "luggage": schedule.get("luggage", "0"),
-                "note": schedule.get("note", schedule.get("notes", "")),
-                "pax": schedule.get("pax", "1"),
-                "pickup": schedule.get("pickup", schedule.get("pickupLocation")),
-                "plateNumber": schedule.get("plateNumber"),
-                "status": schedule.get("status", "Pending"),
-                "transactionID": schedule.get("transactionID"),
-                "transportUnit": schedule.get("transportUnit"),
-                "tripType": schedule.get("tripType"),
-                "unitType": schedule.get("unitType"),
-                "amount": schedule.get("amount"),
-                "driverId": schedule.get("driverId"),
-                "passengerId": schedule.get("passengerId"),
-                "dropoffLocation": schedule.get("dropoffLocation"),
-                "endTime": schedule.get("endTime"),
-                # Add clientName explicitly
-                "clientName": schedule.get("clientName", schedule.get("passengerName", "")),
-                "passengerName": schedule.get("passengerName", schedule.get("clientName", ""))
-            }
-            
-            # If clientName is in a nested object or different path, handle it
-            if not schedule_data["clientName"] and schedule.get("client"):
-                if isinstance(schedule.get("client"), dict):
-                    schedule_data["clientName"] = schedule["client"].get("name", "")
-                else:
-                    schedule_data["clientName"] = schedule.get("client", "")
-            
-            schedules_list.append(schedule_data)
-
-        # Sort by date and time
-        schedules_list.sort(key=lambda x: (x.get("date", ""), x.get("time", "")))
-
-        print(f"Returning {len(schedules_list)} schedules with clientName")
-        
+        month = request.args.get("month")
+        if month:
+            if not MONTH_RE.match(month):
+                return jsonify({"error": "month must be YYYY-MM"}), 400
+            start, end = f"{month}-01", _month_end(month)
+        else:
+            start, end = request.args.get("from"), request.args.get("to")
+            if bool(start) != bool(end):
+                return jsonify({"error": "from and to must be given together"}), 400
+            if not start:
+                start, end = _calendar_window(margin_days=0)
+
+        if not (DATE_RE.match(start) and DATE_RE.match(end)) or start > end:
+            return jsonify({"error": "from/to must be YYYY-MM-DD with from <= to"}), 400
+        if len(_months_between(start, end)) > CALENDAR_MAX_MONTHS:
+            return jsonify({"error": f"At most {CALENDAR_MAX_MONTHS} months per request"}), 400
+
+        schedules_list = _calendar_schedules(start, end, get_mirror("schedules"))
+
         return jsonify({
+            "from": start,
+            "to": end,
             "schedules": schedules_list,
             "count": len(schedules_list)
         })
-        
+
     except Exception as e:
         print("Error fetching calendar schedules:", e)
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+def _calendar_row(sid, schedule):
+    """Only the fields the calendar renders; empty values are left out."""
+    client = schedule.get("client")
+    client_name = (
+        schedule.get("clientName")
+        or schedule.get("passengerName")
+        or (client.get("name") if isinstance(client, dict) else client)
+    )
+    row = {
+        "id": sid,
+        "date": schedule.get("date"),
+        "time": schedule.get("time"),
+        "clientName": client_name,
+        "flightNumber": schedule.get("flightNumber"),
+        "pax": schedule.get("pax"),
+        "luggage": schedule.get("luggage"),
+        "pickup": schedule.get("pickup", schedule.get("pickupLocation")),
+        "note": schedule.get("note", schedule.get("notes")),
+        "status": schedule.get("status"),
+        "transactionID": schedule.get("transactionID"),
+        "transportUnit": schedule.get("transportUnit"),
+        "unitType": schedule.get("unitType"),
+        "plateNumber": schedule.get("plateNumber"),
+        "tripType": schedule.get("tripType"),
+    }
+    return {k: v for k, v in row.items() if v not in (None, "")}
+
+def _calendar_window(start=None, end=None, today=None, margin_days=CALENDAR_WINDOW_MARGIN_DAYS):
+    """
+    Default window: the current month plus `margin_days` either side, so
+    the initial week and month views render without another request.
+    """
+    today = today or datetime.now().date()
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    start = start or (month_start - timedelta(days=margin_days)).isoformat()
+    end = end or (next_month + timedelta(days=margin_days - 1)).isoformat()
+    return start, end
+
+def _month_end(month):
+    month_start = datetime.strptime(month, "%Y-%m").date()
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return (next_month - timedelta(days=1)).isoformat()
+
+def _months_between(start, end):
+    months = []
+    year, month = int(start[:4]), int(start[5:7])
+    while f"{year:04d}-{month:02d}" <= end[:7]:
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+def _schedules_between(start, end, mirror=None):
+    """Schedules dated start..end (inclusive) via the date index (or the mirror)."""
+    if mirror:
+        return mirror.node("schedules", "date BETWEEN ? AND ?", (start, end))
+    return db.reference("schedules").order_by_child("date").start_at(start).end_at(end).get() or {}
+
+def _calendar_rows(start, end, mirror=None):
+    """Calendar rows dated start..end, bucketed by month ("YYYY-MM")."""
+    buckets = {}
+    for sid, schedule in _schedules_between(start, end, mirror).items():
+        if isinstance(schedule, dict):
+            month = str(schedule.get("date") or "")[:7]
+            buckets.setdefault(month, []).append(_calendar_row(sid, schedule))
+    return buckets
+
+def _calendar_schedules(start, end, mirror=None):
+    """
+    Calendar rows dated start..end. Rows are cached per month under
+    "calendar:YYYY-MM", and all uncached months are fetched with one indexed
+    range query. Cached months are dropped whenever schedulesMeta/changes
+    moves, so writes from other workers and processes show up too.
+    The mirror is read directly: it can lag that counter.
+    """
+    months = _months_between(start, end)
+    if mirror:
+        buckets = _calendar_rows(start, end, mirror)
+    else:
+        changes = db.reference("schedulesMeta/changes").get()
+        if changes != _calendar_version["changes"]:
+            _calendar_version["changes"] = changes
+            cache.invalidate_prefix(CALENDAR_PREFIX)
+
+        def load(keys):
+            missing = [key[len(CALENDAR_PREFIX):] for key in keys]
+            rows = _calendar_rows(f"{missing[0]}-01", _month_end(missing[-1]))
+            return {CALENDAR_PREFIX + month: rows.get(month, []) for month in missing}
+
+        cached = cache.get_many([CALENDAR_PREFIX + month for month in months], load, ttl=CALENDAR_CACHE_TTL)
+        buckets = {month: cached[CALENDAR_PREFIX + month] for month in months}
+
+    schedules_list = [
+        row for month in months for row in buckets.get(month, [])
+        if start <= row.get("date", "") <= end
+    ]
+    # Sort by date and time
+    schedules_list.sort(key=lambda x: (x.get("date") or "", x.get("time") or ""))
+    return schedules_list
+
+# ----------------------
+# DASHBOARD BOOTSTRAP (first paint in one response)
+# ----------------------
+@admin_dashboard_api.route("/api/admin/dashboard/bootstrap", methods=["GET"])
+@admin_required
+def dashboard_bootstrap():
+    """
+    Metrics, recent requests, online drivers and the calendar window.
+    Every node is read once and all reads run concurrently, so first paint
+    costs about one RTDB round trip instead of one per section.
+    """
+    try:
+        started = time.monotonic()
+        start, end = _calendar_window(request.args.get("from"), request.args.get("to"))
+        if not (DATE_RE.match(start) and DATE_RE.match(end)):
+            return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+        today = datetime.now().date().isoformat()
+        mirror = get_mirror("users", "requests", "schedules")
+
+        submit = _bootstrap_pool.submit
+        pending = {
+            "users": submit(cached_get, "users"),
+            "requests": submit(list_requests, limit=RECENT_REQUESTS_LIMIT),
+            "schedules": submit(_calendar_schedules, start, end, mirror),
+        }
+        if mirror:
+            pending["metrics"] = submit(_mirror_metrics, mirror)
+        else:
+            pending["live"] = submit(lambda: db.reference(f"{STATS_ROOT}/live").get())
+            pending["bookingsToday"] = submit(lambda: db.reference(daily_bookings_path(today)).get())
+
+        results = {name: future.result() for name, future in pending.items()}
+        users = results["users"] or {}
+
+        metrics = results.get("metrics")
+        if metrics is None:
+            metrics = metrics_from_stats(results.get("live"), results.get("bookingsToday"))
+        if metrics is None:
+            # Counters never built: answer from a full scan and build them
+            rebuild_stats_async()
+            all_requests = submit(lambda: db.reference("requests").get() or {})
+            all_schedules = submit(lambda: db.reference("schedules").get() or {})
+            metrics = _scan_metrics(users, all_requests.result(), all_schedules.result())
+
+        schedules_list = results["schedules"]
+
+        return jsonify({
+            "metrics": metrics,
+            "requests": results["requests"][0],
+            "drivers": _driver_rows(users),
+            "calendar": {
+                "from": start,
+                "to": end,
+                "schedules": schedules_list,
+                "count": len(schedules_list)
+            },
+            "elapsedMs": round((time.monotonic() - started) * 1000, 1)
+        })
+    except Exception as e:
+        print("Error fetching dashboard bootstrap:", e)
+        return jsonify({"error": str(e)}), 500
+
+
+# ----------------------
+# CACHE STATS
+# ----------------------
+@admin_dashboard_api.route("/api/admin/cache/stats", methods=["GET"])
+@admin_required
+def cache_stats():
+    return jsonify(cache.stats())
+
+
+# ----------------------
+# MIRROR STATUS
+# ----------------------
+@admin_dashboard_api.route("/api/admin/mirror/status", methods=["GET"])
+@admin_required
+def mirror_status_view():
+    return jsonify(mirror_status())
+
+
+# ----------------------
+# REBUILD DASHBOARD COUNTERS
+# ----------------------
+@admin_dashboard_api.route("/api/admin/stats/rebuild", methods=["POST"])
+@admin_required
+def rebuild_dashboard_stats():
+    try:
+        stats = rebuild_stats()
+        if stats is None:
+            return jsonify({"message": "Rebuild already in progress, or counters kept changing; try again"}), 409
+        return jsonify({"live": stats["live"], "dates": len(stats["daily"])}), 200
+    except Exception as e:
+        print("Error rebuilding stats:", e)
+        return jsonify({"error": str(e)}), 500
@@ -1,42 +1,183 @@
+import json
+from datetime import datetime, timedelta
 from flask import Blueprint, jsonify, request
 from firebase_admin import db
 from decorators import admin_required
+from indexes import resolve_user_names
+from rtdb_mirror import get_mirror
+from stats import live_delta
 
 admin_requests_api = Blueprint("admin_requests_api", __name__)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+SCAN_BATCH_SIZE = 200
+MAX_SCAN_BATCHES = 5
+MAX_TIMESTAMP = 2 ** 53  # bounds the index query to numeric timestamps
+
 # ---------------- GET all requests ----------------
 @admin_requests_api.route("/api/admin/requests", methods=["GET"])
 @admin_required
 def get_all_requests():
+    """
+    Newest first, one page at a time.
+    Query: status, from/to (YYYY-MM-DD, server time), limit (max 200) and
+    cursor (the nextCursor of the previous page).
+    """
     try:
-        requests_ref = db.reference("requests")
-        users_ref = db.reference("users")
+        status = request.args.get("status") or None
+        limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+        if not limit or limit < 1 or limit > MAX_PAGE_SIZE:
+            return jsonify({"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+
+        try:
+            start_ms = _day_start_ms(request.args.get("from"))
+            end_ms = _day_start_ms(request.args.get("to"), next_day=True)
+            cursor = _parse_cursor(request.args.get("cursor"))
+        except ValueError:
+            return jsonify({"error": "Invalid from/to (YYYY-MM-DD) or cursor"}), 400
+        if end_ms is not None:
+            end_ms -= 1
+
+        requests_list, next_cursor = list_requests(status, start_ms, end_ms, cursor, limit)
+        return jsonify({
+            "requests": requests_list,
+            "count": len(requests_list),
+            "nextCursor": next_cursor
+        }), 200
 
-        requests_data = requests_ref.get() or {}
-        users_data = users_ref.get() or {}
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        requests_list = []
 
-        for key, req in requests_data.items():
-            req_obj = req.copy()
-            req_obj["id"] = key
+def list_requests(status=None, start_ms=None, end_ms=None, cursor=None, limit=DEFAULT_PAGE_SIZE):
+    """
+    One page of requests ordered by timestamp (newest first), each with a
+    requestedByName from the userNames index. Requests without a numeric
+    timestamp can't be placed in the timeline and are not returned.
+    Returns (requests, nextCursor or None).
+    """
+    mirror = get_mirror("requests")
+    if mirror:
+        rows, next_cursor = _mirror_page(mirror, status, start_ms, end_ms, cursor, limit)
+    else:
+        rows, next_cursor = _rtdb_page(status, start_ms, end_ms, cursor, limit)
 
-            # Replace requestedBy UID with full name if possible
-            uid = req.get("requestedBy")
-            if uid and uid in users_data:
-                user = users_data[uid]
-                first = user.get("firstName", "")
-                last = user.get("lastName", "")
-                req_obj["requestedByName"] = f"{first} {last}".strip()
-            else:
-                req_obj["requestedByName"] = uid or "Unknown"
+    names = resolve_user_names(req.get("requestedBy") for _, req in rows)
 
-            requests_list.append(req_obj)
+    requests_list = []
+    for key, req in rows:
+        req_obj = dict(req)
+        req_obj["id"] = key
 
-        return jsonify({"requests": requests_list}), 200
+        # Replace requestedBy UID with full name if possible
+        uid = req.get("requestedBy")
+        req_obj["requestedByName"] = names.get(uid) or uid or "Unknown"
+        requests_list.append(req_obj)
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return requests_list, next_cursor
+
+
+def _day_start_ms(value, next_day=False):
+    if not value:
+        return None
+    day = datetime.strptime(value, "%Y-%m-%d")
+    if next_day:
+        day += timedelta(days=1)
+    return int(day.timestamp() * 1000)
+
+
+def _parse_cursor(value):
+    """"<timestamp>:<id>" -> (timestamp, id)"""
+    if not value:
+        return None
+    timestamp, _, key = value.partition(":")
+    if not key:
+        raise ValueError("cursor")
+    return float(timestamp) if "." in timestamp else int(timestamp), key
+
+
+def _make_cursor(timestamp, key):
+    return f"{timestamp}:{key}"
+
+
+def _is_timestamp(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _rtdb_page(status, start_ms, end_ms, cursor, limit):
+    """
+    Walk the timestamp index backwards in batches. Without a status filter
+    one batch of limit + 1 fills the page; with one, batches are larger and
+    at most MAX_SCAN_BATCHES are read before handing back a cursor.
+    """
+    batch_size = limit + 1 if not status else max(limit * 4, SCAN_BATCH_SIZE)
+    upper = end_ms
+    if cursor and (upper is None or cursor[0] < upper):
+        upper = cursor[0]
+
+    page = []
+    last_seen = cursor
+    for _ in range(MAX_SCAN_BATCHES):
+        query = db.reference("requests").order_by_child("timestamp")
+        query = query.start_at(start_ms if start_ms is not None else -MAX_TIMESTAMP)
+        query = query.end_at(upper if upper is not None else MAX_TIMESTAMP)
+        batch = query.limit_to_last(batch_size).get() or {}
+
+        rows = sorted(
+            ((req.get("timestamp"), key, req) for key, req in batch.items()
+             if isinstance(req, dict) and _is_timestamp(req.get("timestamp"))),
+            key=lambda row: (row[0], row[1]),
+            reverse=True
+        )
+        for timestamp, key, req in rows:
+            if last_seen and (timestamp, key) >= last_seen:
+                continue  # already served (ties on the boundary timestamp)
+            last_seen = (timestamp, key)
+            if status and req.get("status") != status:
+                continue
+            page.append((key, req))
+            if len(page) > limit:
+                return page[:limit], _make_cursor(*_row_position(page[limit - 1]))
+
+        if len(batch) < batch_size:
+            return page, None  # reached the oldest request in range
+        upper = last_seen[0]
+
+    # Scan budget spent: return what matched and let the client continue
+    return page, _make_cursor(*last_seen) if last_seen else None
+
+
+def _row_position(row):
+    key, req = row
+    return req.get("timestamp"), key
+
+
+def _mirror_page(mirror, status, start_ms, end_ms, cursor, limit):
+    where = ["typeof(timestamp) IN ('integer', 'real')"]
+    params = []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if start_ms is not None:
+        where.append("timestamp >= ?")
+        params.append(start_ms)
+    if end_ms is not None:
+        where.append("timestamp <= ?")
+        params.append(end_ms)
+    if cursor:
+        where.append("(timestamp < ? OR (timestamp = ? AND id < ?))")
+        params.extend([cursor[0], cursor[0], cursor[1]])
+
+    found = mirror.query(
+        f"SELECT id, data FROM requests WHERE {' AND '.join(where)} "
+        "ORDER BY timestamp DESC, id DESC LIMIT ?",
+        (*params, limit + 1)
+    )
+    rows = [(row["id"], json.loads(row["data"])) for row in found]
+    if len(rows) > limit:
+        return rows[:limit], _make_cursor(*_row_position(rows[limit - 1]))
+    return rows, None
 
 
 # ---------------- PATCH request status ----------------
@@ -71,7 +212,11 @@ def update_request(request_id):
         if image_reply:
             updates["imageReply"] = image_reply
 
-        request_ref.update(updates)
+        root_updates = {f"requests/{request_id}/{k}": v for k, v in updates.items()}
+        if current_data.get("status") == "pending":
+            root_updates.update(live_delta("pendingRequests", -1))
+
+        db.reference().update(root_updates)
 
         return jsonify({"message": "Request updated successfully", "updatedFields": updates}), 200
 
@@ -1,25 +1,81 @@
 from flask import Blueprint, jsonify, request
 from firebase_admin import db
 from decorators import admin_required
+from rtdb_cache import cached_get, invalidate
 import random
 import string
+import threading
 
 admin_transport_units = Blueprint("admin_transport_units", __name__)
 
 # -------------------------------
-# Helper: Generate XXXYYY unit_id
+# Helper: Allocate XXXYYY unit_id
 # -------------------------------
-def generate_unit_id():
-    ref = db.reference("transportUnits")
+def random_unit_id():
+    numbers = f"{random.randint(0, 999):03d}"     # XXX
+    letters = ''.join(random.choices(string.ascii_uppercase, k=3))  # YYY
+    return f"{numbers}{letters}"
 
-    while True:
-        numbers = f"{random.randint(0, 999):03d}"     # XXX
-        letters = ''.join(random.choices(string.ascii_uppercase, k=3))  # YYY
-        unit_id = f"{numbers}{letters}"
 
-        # ensure uniqueness
-        if not ref.child(unit_id).get():
-            return unit_id
+class UnitIdAllocator:
+    """
+    Creates transport units under fresh random IDs.
+
+    Candidates are drawn against a per-process set of used IDs (one shallow
+    read to fill it) and written with set_if_unchanged() against the ETag
+    of an empty location, so the database only accepts the write if nobody
+    holds that ID yet. The common case is a single conditional write; on a
+    conflict (another worker or process took the ID) the used set is
+    refreshed and the next candidate is tried.
+    """
+    MAX_ATTEMPTS = 20
+
+    def __init__(self, path="transportUnits"):
+        self._path = path
+        self._lock = threading.Lock()
+        self._used = None
+        self._empty_etag = None
+
+    def _refresh(self):
+        used = set((db.reference(self._path).get(shallow=True) or {}).keys())
+        with self._lock:
+            self._used = used | (self._used or set())
+
+    def _candidate(self):
+        with self._lock:
+            while True:
+                unit_id = random_unit_id()
+                if unit_id not in self._used:
+                    self._used.add(unit_id)  # no other thread here picks it
+                    return unit_id
+
+    def create(self, unit):
+        """Write `unit` under a new ID and return the ID."""
+        if self._used is None:
+            self._refresh()
+
+        for _ in range(self.MAX_ATTEMPTS):
+            unit_id = self._candidate()
+            ref = db.reference(f"{self._path}/{unit_id}")
+
+            if self._empty_etag is None:
+                # Learn the ETag RTDB reports for an empty location (once)
+                current, etag = ref.get(etag=True)
+                if current is not None:
+                    continue
+                self._empty_etag = etag
+
+            written, _, _ = ref.set_if_unchanged(self._empty_etag, unit)
+            if written:
+                return unit_id
+
+            # Taken elsewhere since our last refresh
+            self._refresh()
+
+        raise RuntimeError("Could not allocate a transport unit ID")
+
+
+unit_ids = UnitIdAllocator()
 
 
 # -------------------------------
@@ -28,7 +84,7 @@ def generate_unit_id():
 @admin_transport_units.route("/api/admin/transport-units", methods=["GET"])
 @admin_required
 def get_transport_units():
-    return jsonify(db.reference("transportUnits").get() or {})
+    return jsonify(cached_get("transportUnits") or {})
 
 
 # -------------------------------
@@ -39,8 +95,6 @@ def get_transport_units():
 def create_transport_unit():
     data = request.json or {}
 
-    unit_id = generate_unit_id()
-
     unit = {
         "unitType": data.get("unitType"),
         "transportUnit": data.get("transportUnit"),
@@ -48,7 +102,8 @@ def create_transport_unit():
         "plateNumber": data.get("plateNumber")
     }
 
-    db.reference(f"transportUnits/{unit_id}").set(unit)
+    unit_id = unit_ids.create(unit)
+    invalidate("transportUnits")
 
     return jsonify({"unit_id": unit_id}), 201
 
@@ -67,6 +122,7 @@ def update_transport_unit(unit_id):
         "color": data.get("color"),
         "plateNumber": data.get("plateNumber")
     })
+    invalidate("transportUnits")
 
     return jsonify(success=True)
 
@@ -78,4 +134,5 @@ def update_transport_unit(unit_id):
 @admin_required
 def delete_transport_unit(unit_id):
     db.reference(f"transportUnits/{unit_id}").delete()
+    invalidate("transportUnits")
     return jsonify(success=True)
@@ -1,6 +1,12 @@
+import time
 from flask import Blueprint, request, jsonify
 from firebase_admin import auth, db
 from decorators import admin_required
+from auth_status import auth_status
+from driver_index import driver_index, SUGGEST_LIMIT, SUGGEST_MAX_LIMIT
+from rtdb_cache import cached_get, invalidate
+from stats import user_deltas, live_delta
+from indexes import user_name_updates, claim_unit, settle_unit_claim, rollback_unit_claim, release_unit
 
 admin_users_api = Blueprint("admin_users_api", __name__)
 
@@ -32,6 +38,7 @@ def create_user():
             email_verified=True
         )
         uid = user.uid
+        auth_status.set(uid, False)
 
         # Save additional user info to Firebase DB
         user_data = {
@@ -45,7 +52,28 @@ def create_user():
             "active": False,
             "createdAt": {".sv": "timestamp"}
         }
-        db.reference(f"users/{uid}").set(user_data)
+        root_updates = {
+            f"users/{uid}": user_data,
+            **user_deltas(user_data, 1),
+            **user_name_updates(uid, user_data)
+        }
+        unit_updates = None
+        if user_data["defaultTransportUnit"]:
+            unit_updates = claim_unit(uid, user_data["defaultTransportUnit"])
+            root_updates.update(unit_updates)
+            root_updates.pop(f"users/{uid}/defaultTransportUnit")  # part of users/<uid>
+
+        try:
+            db.reference().update(root_updates)
+        except Exception:
+            if unit_updates is not None:
+                rollback_unit_claim(uid, user_data["defaultTransportUnit"], unit_updates)
+            raise
+        if user_data["defaultTransportUnit"]:
+            settle_unit_claim(uid, user_data["defaultTransportUnit"])
+        invalidate("users")
+        invalidate("userNames")
+        driver_index.upsert(uid, user_data)
 
         return jsonify({"message": "User created successfully", "uid": uid}), 201
 
@@ -61,20 +89,17 @@ def create_user():
 @admin_required
 def get_users():
     try:
-        users_ref = db.reference("users")
-        users_snapshot = users_ref.get() or {}
+        users_snapshot = cached_get("users") or {}
         role_filter = request.args.get("role")
 
+        # ?auth=false skips Firebase Auth (and the "disabled" field)
+        include_auth = request.args.get("auth", "true").lower() not in ("0", "false", "no")
+
         uids = list(users_snapshot.keys())
         users_list = []
 
-        # Batch fetch Auth users in chunks of 100
-        batches = [uids[i:i + 100] for i in range(0, len(uids), 100)]
-        disabled_map = {}
-        for batch in batches:
-            auth_users = auth.get_users([auth.UidIdentifier(uid) for uid in batch])
-            for user_record in auth_users.users:
-                disabled_map[user_record.uid] = user_record.disabled
+        # Auth batches run concurrently; flags are cached (see auth_status.py)
+        disabled_map = auth_status.disabled_map(uids) if include_auth else {}
 
         # Build user objects
         for uid, info in users_snapshot.items():
@@ -91,9 +116,10 @@ def get_users():
                 "phone": info.get("phone", ""),
                 "role": info.get("role", "user"),
                 "defaultTransportUnit": info.get("defaultTransportUnit", ""),
-                "active": info.get("active", False),
-                "disabled": disabled_map.get(uid, False)
+                "active": info.get("active", False)
             }
+            if include_auth:
+                user_obj["disabled"] = disabled_map.get(uid, False)
             users_list.append(user_obj)
 
         return jsonify({"users": users_list}), 200
@@ -102,6 +128,27 @@ def get_users():
         print("Error fetching users:", e)
         return jsonify({"error": str(e)}), 500
 
+# -----------------------
+# DRIVER SUGGESTIONS (autocomplete)
+# -----------------------
+@admin_users_api.route("/api/admin/drivers/suggest", methods=["GET"])
+@admin_required
+def suggest_drivers():
+    try:
+        limit = request.args.get("limit", SUGGEST_LIMIT, type=int) or SUGGEST_LIMIT
+        limit = max(1, min(limit, SUGGEST_MAX_LIMIT))
+
+        started = time.perf_counter()
+        suggestions = driver_index.suggest(request.args.get("q", ""), limit)
+
+        return jsonify({
+            "suggestions": suggestions,
+            "elapsedMs": round((time.perf_counter() - started) * 1000, 3)
+        }), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 # -----------------------
 # EDIT USER PROFILE WITH TRANSPORT UNIT REASSIGNMENT
 # -----------------------
@@ -116,23 +163,46 @@ def edit_user(uid):
         return jsonify({"error": "No valid fields to update"}), 400
 
     try:
+        # Update current user (and the activeSessions counter)
+        root_updates = {f"users/{uid}/{k}": v for k, v in updates.items()}
+
+        if "active" in updates:
+            was_active = bool(db.reference(f"users/{uid}/active").get())
+            if was_active != bool(updates["active"]):
+                root_updates.update(live_delta("activeSessions", 1 if updates["active"] else -1))
+
+        # Keep the userNames index in step with a rename
+        if "firstName" in updates or "lastName" in updates:
+            names = {k: db.reference(f"users/{uid}/{k}").get() for k in ("firstName", "lastName")}
+            names.update({k: updates[k] for k in ("firstName", "lastName") if k in updates})
+            root_updates.update(user_name_updates(uid, names))
+
         # ---------------- Handle transport unit reassignment ----------------
+        # The unitAssignments index names the current holder, who is
+        # cleared in the same multi-path write (see indexes.claim_unit).
+        # Claimed last, so nothing but the write itself can fail after it.
         new_unit = updates.get("defaultTransportUnit")
+        unit_updates = None
+        if "defaultTransportUnit" in updates:
+            unit_updates = claim_unit(uid, new_unit)
+            root_updates.update(unit_updates)
+
+        try:
+            db.reference().update(root_updates)
+        except Exception:
+            if unit_updates is not None:
+                rollback_unit_claim(uid, new_unit, unit_updates)
+            raise
         if new_unit:
-            # Find any user who currently has this transport unit
-            users_ref = db.reference("users")
-            users_snapshot = users_ref.get() or {}
-            for other_uid, info in users_snapshot.items():
-                if other_uid != uid and info.get("defaultTransportUnit") == new_unit:
-                    # Remove the transport unit from the old user
-                    users_ref.child(other_uid).update({"defaultTransportUnit": ""})
-
-        # Update current user
-        db.reference(f"users/{uid}").update(updates)
+            settle_unit_claim(uid, new_unit)
+        invalidate("users")
+        invalidate("userNames")
+        driver_index.upsert(uid, updates)
 
         # If active changed, also update Firebase Auth
         if "active" in updates:
             auth.update_user(uid, disabled=not updates["active"])
+            auth_status.set(uid, not updates["active"])
 
         return jsonify({"message": "User updated successfully"}), 200
 
@@ -147,7 +217,19 @@ def edit_user(uid):
 def delete_user(uid):
     try:
         auth.delete_user(uid)
-        db.reference(f"users/{uid}").delete()
+        auth_status.discard(uid)
+        user = db.reference(f"users/{uid}").get()
+        if user and user.get("defaultTransportUnit"):
+            release_unit(uid, user["defaultTransportUnit"])
+        if user is not None:
+            db.reference().update({
+                f"users/{uid}": None,
+                **user_deltas(user, -1),
+                **user_name_updates(uid, None)
+            })
+        invalidate("users")
+        invalidate("userNames")
+        driver_index.remove(uid)
         return jsonify({"message": "User deleted successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -166,6 +248,7 @@ def toggle_user_status(uid):
 
     try:
         auth.update_user(uid, disabled=not enable)
+        auth_status.set(uid, not enable)
         return jsonify({"message": f"User account {'enabled' if enable else 'disabled'} successfully"}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -199,8 +282,7 @@ def edit_password(uid):
 def get_transport_units():
     try:
         # Fetch all transport units from Firebase
-        units_ref = db.reference("transportUnits")
-        units_snapshot = units_ref.get() or {}
+        units_snapshot = cached_get("transportUnits") or {}
 
         # Transform data into an array for frontend
         units_list = []
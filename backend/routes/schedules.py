@@ -1,6 +1,14 @@
-from flask import Blueprint, request, jsonify
+import re
+import time
+import hashlib
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from flask import Blueprint, request, jsonify, make_response, Response, stream_with_context
 from message_template import build_message
 from decorators import admin_required
+from schedule_stream import StreamFull, hub as schedule_stream_hub
+from rtdb_cache import CALENDAR_PREFIX, cache, cached_get
+from stats import booking_deltas
 
 schedules_api = Blueprint("schedules_api", __name__)
 
@@ -12,6 +20,31 @@ EDITABLE_FIELDS = {
     "plateNumber", "luggage", "tripType"
 }
 
+# Query param -> indexed child used by GET /api/schedules.
+# Keep in sync with the .indexOn list in database.indexes.json.
+SCHEDULE_INDEXES = {
+    "driver": "current/driverName",
+    "status": "status",
+    "tripType": "tripType"
+}
+
+MAX_PAGE_SIZE = 500
+IMPORT_CHUNK_SIZE = 100  # rows per multi-path update on bulk import
+INVALID_KEY_CHARS = set(".$#[]/")
+EXISTENCE_CHECK_WORKERS = 8
+DELETE_CLAIM_ATTEMPTS = 3  # unconditional deletes re-read when an edit claims first
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+# Change tracking: every schedule write stamps the schedule's updatedAt and
+# bumps schedulesMeta; deletes leave a tombstone so ?since= clients can drop them.
+SCHEDULES_META = "schedulesMeta"
+SCHEDULES_DELETED = "schedulesDeleted"
+SERVER_TIMESTAMP = {".sv": "timestamp"}
+TOMBSTONE_TTL_MS = 7 * 24 * 60 * 60 * 1000
+TOMBSTONE_PRUNE_INTERVAL = 60 * 60  # seconds, per process
+
+_last_tombstone_prune = 0.0
+
 def normalize_phone(number: str) -> str:
     """
     Convert "63-9171234567" → "+639171234567"
@@ -31,12 +64,73 @@ def normalize_phone(number: str) -> str:
     return f"+{number}"
 
 
+def change_stamp():
+    """
+    Multi-path entries that mark the schedules tree as changed.
+    Merge into the same root update() as the schedule write itself.
+    """
+    return {
+        f"{SCHEDULES_META}/version": SERVER_TIMESTAMP,
+        f"{SCHEDULES_META}/changes": {".sv": {"increment": 1}}
+    }
+
+
+def _prune_tombstones():
+    """Drop tombstones older than TOMBSTONE_TTL_MS (at most once an hour)."""
+    from firebase_admin import db
+    global _last_tombstone_prune
+
+    if time.time() - _last_tombstone_prune < TOMBSTONE_PRUNE_INTERVAL:
+        return
+    _last_tombstone_prune = time.time()
+
+    cutoff = int(time.time() * 1000) - TOMBSTONE_TTL_MS
+    expired = db.reference(SCHEDULES_DELETED).order_by_value().end_at(cutoff).get() or {}
+    if expired:
+        db.reference(SCHEDULES_DELETED).update({key: None for key in expired})
+
+
 # ---------------- CREATE ----------------
+def _validate_schedule_rows(rows):
+    """
+    Check every row before anything is written.
+    Returns one error message per row (None for valid rows).
+    """
+    errors = []
+    seen = set()
+
+    for item in rows:
+        if not isinstance(item, dict):
+            errors.append("Row must be an object")
+            continue
+
+        transaction_id = item.get("transactionID")
+        if transaction_id in (None, ""):
+            errors.append("transactionID is required")
+        elif not isinstance(transaction_id, (str, int)) or \
+                any(c in INVALID_KEY_CHARS for c in str(transaction_id)):
+            errors.append("transactionID contains invalid characters")
+        elif str(transaction_id) in seen:
+            errors.append("Duplicate transactionID in request")
+        else:
+            errors.append(None)
+            seen.add(str(transaction_id))
+
+    return errors
+
+
 @admin_required
 @schedules_api.route("/api/schedules", methods=["POST"])
 def create_schedule():
+    """
+    Accepts one schedule or a list (Excel import). All rows are validated
+    first; valid rows are then written in IMPORT_CHUNK_SIZE multi-path
+    updates, so each chunk lands all-or-nothing.
+    """
     from firebase_admin import db
 
+    started = time.perf_counter()
+
     data = request.get_json()
     if not data:
         return jsonify({"error": "No data provided"}), 400
@@ -44,87 +138,585 @@ def create_schedule():
     if isinstance(data, dict):
         data = [data]
 
+    errors = _validate_schedule_rows(data)
+    if any(errors):
+        # Nothing is written if any row is invalid
+        results = []
+        for i, (item, error) in enumerate(zip(data, errors)):
+            result = {
+                "index": i,
+                "transactionID": item.get("transactionID") if isinstance(item, dict) else None,
+                "status": "invalid" if error else "valid"
+            }
+            if error:
+                result["error"] = error
+            results.append(result)
+
+        return jsonify({
+            "error": next(e for e in errors if e),
+            "results": results
+        }), 400
+
+    results = []
     saved_ids = []
 
-    try:
-        for item in data:
-            transaction_id = item.get("transactionID")
-            if not transaction_id:
-                return jsonify({"error": "transactionID is required"}), 400
+    # Re-imported rows overwrite an existing schedule: its booking moves
+    # from the stored date instead of being counted again
+    stored_dates = _schedule_dates(list({str(item["transactionID"]) for item in data}))
 
+    for start in range(0, len(data), IMPORT_CHUNK_SIZE):
+        chunk = data[start:start + IMPORT_CHUNK_SIZE]
+        updates = change_stamp()
+
+        date_counts = Counter()
+        for item in chunk:
+            # IDs are unique within a request (see _validate_schedule_rows)
+            date_counts[stored_dates.get(str(item["transactionID"]))] -= 1
+            date_counts[item.get("date")] += 1
+        updates.update(booking_deltas(date_counts))
+
+        for item in chunk:
+            transaction_id = str(item["transactionID"])
+            item["transactionID"] = transaction_id
             item["status"] = item.get("status", "Pending")
+            item["updatedAt"] = SERVER_TIMESTAMP
+            item["revision"] = 1
+
+            updates[f"schedules/{transaction_id}"] = item
+            updates[f"{SCHEDULES_DELETED}/{transaction_id}"] = None
+
+        try:
+            db.reference().update(updates)
+            status, error = "saved", None
+        except Exception as e:
+            status, error = "failed", str(e)
+
+        for offset, item in enumerate(chunk):
+            result = {
+                "index": start + offset,
+                "transactionID": item["transactionID"],
+                "status": status
+            }
+            if error:
+                result["error"] = error
+            else:
+                saved_ids.append(item["transactionID"])
+            results.append(result)
+
+    if saved_ids:
+        cache.invalidate_prefix(CALENDAR_PREFIX)
+
+    failed = len(data) - len(saved_ids)
+    body = {
+        "success": failed == 0,
+        "transactionIDs": saved_ids,
+        "results": results,
+        "saved": len(saved_ids),
+        "failed": failed,
+        "elapsedMs": round((time.perf_counter() - started) * 1000, 1)
+    }
 
-            ref = db.reference(f"schedules/{transaction_id}")
-            ref.set(item)
+    if failed == 0:
+        return jsonify(body), 200
+    if saved_ids:
+        return jsonify(body), 207
+    body["error"] = results[0].get("error")
+    return jsonify(body), 500
 
-            saved_ids.append(transaction_id)
+# ---------------- READ ----------------
+def _serialize_schedule(transaction_id, schedule):
+    schedule["transactionID"] = transaction_id
+    current = schedule.get("current") or {}
+    schedule["current"] = {
+        "driverName": current.get("driverName", ""),
+        "cellPhone": current.get("cellPhone", "")
+    }
+    return schedule
 
-        return jsonify({
-            "success": True,
-            "transactionIDs": saved_ids
-        }), 200
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+def _parse_schedule_filters(args):
+    """
+    Validate the GET /api/schedules query string.
+    Returns (filters, error_message).
+    """
+    filters = {
+        "from": args.get("date") or args.get("from"),
+        "to": args.get("date") or args.get("to"),
+        "driver": args.get("driver"),
+        "status": args.get("status"),
+        "tripType": args.get("tripType"),
+        "cursor": args.get("cursor"),
+        "limit": None,
+        "since": None
+    }
+
+    for key in ("from", "to"):
+        if filters[key] and not DATE_RE.match(filters[key]):
+            return None, f"Invalid {key} date, expected YYYY-MM-DD"
+
+    if args.get("limit"):
+        try:
+            limit = int(args["limit"])
+        except ValueError:
+            return None, "limit must be an integer"
+        if limit < 1:
+            return None, "limit must be positive"
+        filters["limit"] = min(limit, MAX_PAGE_SIZE)
+
+    if args.get("since"):
+        try:
+            filters["since"] = int(args["since"])
+        except ValueError:
+            return None, "since must be a version number"
+
+    return filters, None
+
+
+def _query_schedules(filters):
+    """
+    Run the most selective indexed query for the given filters and return
+    an ordered list of (transactionID, schedule) pairs. Only the date range
+    or the first equality filter is pushed down to the database; the rest
+    are applied to the (already small) slice here.
+    """
+    from firebase_admin import db
+
+    ref = db.reference("schedules")
+    limit = filters["limit"]
+    cursor = filters["cursor"]
+
+    if filters["from"] or filters["to"]:
+        query = ref.order_by_child("date")
+        if filters["from"]:
+            query = query.start_at(filters["from"])
+        if filters["to"]:
+            query = query.end_at(filters["to"])
+        pushed_down = None
+    else:
+        pushed_down = next(
+            (param for param in SCHEDULE_INDEXES if filters[param]), None
+        )
+        if pushed_down:
+            query = ref.order_by_child(SCHEDULE_INDEXES[pushed_down]) \
+                .equal_to(filters[pushed_down])
+        elif limit:
+            # Unfiltered listing: page straight off the key index.
+            query = ref.order_by_key()
+            if cursor:
+                query = query.start_at(cursor)
+            query = query.limit_to_first(limit + 2)
+        else:
+            query = ref
+
+    data = query.get() or {}
+
+    items = []
+    for transaction_id in sorted(data):
+        schedule = data[transaction_id]
+        if not isinstance(schedule, dict):
+            continue
+        if cursor and transaction_id <= cursor:
+            continue
+        if not _matches_filters(schedule, filters, skip=pushed_down):
+            continue
+        items.append((transaction_id, schedule))
+
+    return items
+
+
+def _query_schedule_changes(filters):
+    """
+    Return (changed, deleted_ids) since filters["since"]. Changed schedules
+    that no longer match the filters are reported as deleted, since they
+    have left the client's view.
+    """
+    from firebase_admin import db
+
+    since = filters["since"]
+    changed = db.reference("schedules").order_by_child("updatedAt") \
+        .start_at(since).get() or {}
+    tombstones = db.reference(SCHEDULES_DELETED).order_by_value() \
+        .start_at(since).get() or {}
+
+    items = []
+    deleted = sorted(tombstones)
+    for transaction_id in sorted(changed):
+        schedule = changed[transaction_id]
+        if not isinstance(schedule, dict):
+            continue
+        date = schedule.get("date") or ""
+        in_range = (
+            (not filters["from"] or date >= filters["from"]) and
+            (not filters["to"] or date <= filters["to"])
+        )
+        if in_range and _matches_filters(schedule, filters):
+            items.append((transaction_id, schedule))
+        else:
+            deleted.append(transaction_id)
+
+    return items, deleted
+
+
+def _schedules_etag(meta):
+    """
+    Weak ETag for a schedules listing: the global change counter plus the
+    query string. "since" is left out - if nothing changed, no delta exists.
+    """
+    query = "&".join(
+        f"{k}={v}" for k, v in sorted(request.args.items(multi=True))
+        if k != "since"
+    )
+    digest = hashlib.sha1(query.encode()).hexdigest()[:12]
+    return f"c{meta.get('changes', 0)}-{digest}"
+
+
+def _matches_filters(schedule, filters, skip=None):
+    for param, child in SCHEDULE_INDEXES.items():
+        if param == skip or not filters[param]:
+            continue
+        value = schedule
+        for segment in child.split("/"):
+            value = value.get(segment) if isinstance(value, dict) else None
+        if value != filters[param]:
+            return False
+    return True
+
 
-# ---------------- READ ----------------
 @admin_required
 @schedules_api.route("/api/schedules", methods=["GET"])
 def get_schedules():
+    """
+    Optional query params:
+      date=YYYY-MM-DD | from=YYYY-MM-DD&to=YYYY-MM-DD
+      driver, status, tripType  (exact match)
+      limit, cursor             (cursor = last transactionID of previous page)
+      since                     (version from a previous response; returns
+                                 only schedules changed or deleted after it)
+    Without any params the whole tree is returned, as before.
+    Honours If-None-Match with a 304 when nothing has changed.
+    """
     from firebase_admin import db
-    try:
-        ref = db.reference("schedules")
-        data = ref.get() or {}
-
-        schedules = []
-        for transaction_id, schedule in data.items():
-            schedule["transactionID"] = transaction_id
-            current = schedule.get("current") or {}
-            schedule["current"] = {
-                "driverName": current.get("driverName", ""),
-                "cellPhone": current.get("cellPhone", "")
-            }
-            schedules.append(schedule)
 
-        return jsonify({"success": True, "schedules": schedules}), 200
+    filters, error = _parse_schedule_filters(request.args)
+    if error:
+        return jsonify({"error": error}), 400
+
+    try:
+        meta = db.reference(SCHEDULES_META).get() or {}
+        etag = _schedules_etag(meta)
+
+        if request.if_none_match.contains_weak(etag):
+            response = make_response("", 304)
+            response.set_etag(etag, weak=True)
+            return response
+
+        since = filters["since"]
+        if since is not None and since < int(time.time() * 1000) - TOMBSTONE_TTL_MS:
+            since = None  # tombstones may be pruned; client must resync
+
+        if since is not None:
+            items, deleted = _query_schedule_changes(filters)
+            body = {"success": True, "full": False, "deleted": deleted}
+        else:
+            items = _query_schedules(filters)
+            body = {"success": True, "full": True, "nextCursor": None}
+
+            limit = filters["limit"]
+            if limit and len(items) > limit:
+                items = items[:limit]
+                body["nextCursor"] = items[-1][0]
+
+        body["schedules"] = [
+            _serialize_schedule(transaction_id, schedule)
+            for transaction_id, schedule in items
+        ]
+        body["version"] = meta.get("version", 0)
+
+        response = make_response(jsonify(body), 200)
+        response.set_etag(etag, weak=True)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# ---------------- STREAM ----------------
+@schedules_api.route("/api/schedules/stream", methods=["GET"])
+@admin_required
+def stream_schedules():
+    """
+    Server-Sent Events feed of schedule changes.
+    Events: "change" ({type, path, data} relative to /schedules) and
+    "resync" (client should refetch). Resumes from Last-Event-ID.
+    """
+    last_event_id = request.headers.get("Last-Event-ID") or request.args.get("lastEventId")
+
+    try:
+        subscription = schedule_stream_hub.subscribe(last_event_id)
+    except StreamFull as e:
+        # The page keeps polling and retries the stream later
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "60"}
+    except Exception as e:
+        return jsonify({"error": str(e)}), 503
+
+    def generate():
+        try:
+            for message in subscription.messages():
+                yield message
+        finally:
+            subscription.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # ---------------- UPDATE ----------------
+def _schedule_field_updates(transaction_id, data):
+    """
+    Multi-path entries (relative to the root) for an edit of one schedule:
+    allow-listed fields plus the `current` driver assignment.
+    """
+    # Allow-list update only
+    updates = {
+        f"schedules/{transaction_id}/{k}": v for k, v in data.items()
+        if k in EDITABLE_FIELDS
+    }
+
+    # Handle driver assignment ONLY here
+    if "current" in data:
+        current = data.get("current") or {}
+        updates[f"schedules/{transaction_id}/current/driverName"] = current.get("driverName", "")
+        updates[f"schedules/{transaction_id}/current/cellPhone"] = current.get("cellPhone", "")
+
+    if updates:
+        updates[f"schedules/{transaction_id}/updatedAt"] = SERVER_TIMESTAMP
+
+    return updates
+
+
+def _parallel_reads(read, transaction_ids):
+    """Run one small read per schedule on a bounded pool: {id: result}."""
+    if not transaction_ids:
+        return {}
+    with ThreadPoolExecutor(max_workers=EXISTENCE_CHECK_WORKERS) as pool:
+        return dict(zip(transaction_ids, pool.map(read, transaction_ids)))
+
+
+def _existing_schedule_ids(transaction_ids):
+    """
+    Shallow-read each schedule (keys only, no child data) in parallel
+    and return the set of IDs that exist.
+    """
+    from firebase_admin import db
+
+    found = _parallel_reads(
+        lambda tid: db.reference(f"schedules/{tid}").get(shallow=True) is not None,
+        transaction_ids
+    )
+    return {tid for tid, ok in found.items() if ok}
+
+
+def _schedule_dates(transaction_ids):
+    """Current `date` of each schedule, for moving its stats/daily count."""
+    from firebase_admin import db
+
+    return _parallel_reads(
+        lambda tid: db.reference(f"schedules/{tid}/date").get(),
+        transaction_ids
+    )
+
+
+def _read_revision(transaction_id):
+    """
+    Read only the schedule's revision counter (with its ETag).
+    Returns (revision, etag), or (None, None) if the schedule doesn't exist.
+    Schedules written before revisions existed count as revision 0.
+    """
+    from firebase_admin import db
+
+    revision, etag = db.reference(f"schedules/{transaction_id}/revision").get(etag=True)
+    if revision is None:
+        if db.reference(f"schedules/{transaction_id}").get(shallow=True) is None:
+            return None, None
+        revision = 0
+    return revision, etag
+
+
+def _expected_revision():
+    """Revision the client based its edit on, from If-Match: "<revision>"."""
+    for tag in request.if_match.as_set():
+        if tag.isdigit():
+            return int(tag)
+    return None
+
+
+def _claim_revision(transaction_id, revision, etag):
+    """
+    Conditionally bump the revision from `revision` to `revision + 1`.
+    Fails (returns False) if anyone else wrote it since we read it.
+    """
+    from firebase_admin import db
+
+    success, _, _ = db.reference(f"schedules/{transaction_id}/revision") \
+        .set_if_unchanged(etag, revision + 1)
+    return success
+
+
+def _deleted_meanwhile(transaction_id):
+    """
+    After writing an edit, check no DELETE landed between our revision claim
+    and the write. If one did, the write recreated the schedule as a partial
+    node (just the edited fields) next to the delete's tombstone. Legacy
+    schedules get here too: the ETag of their empty revision node also
+    matches once the schedule is gone, so the claim itself succeeds.
+    """
+    from firebase_admin import db
+
+    if db.reference(f"{SCHEDULES_DELETED}/{transaction_id}").get() is None:
+        return False
+    return db.reference(f"schedules/{transaction_id}").get(shallow=True) is not None
+
+
+def _conflict(transaction_id):
+    revision, _ = _read_revision(transaction_id)
+    response = jsonify({
+        "error": "Schedule was modified by someone else",
+        "transactionID": transaction_id,
+        "revision": revision
+    })
+    if revision is not None:
+        response.set_etag(str(revision))
+    return response, 409
+
+
 @admin_required
 @schedules_api.route("/api/schedules/<transaction_id>", methods=["PATCH", "PUT"])
 def update_schedule(transaction_id):
+    """
+    Send If-Match: "<revision>" (the ETag from a previous response, or the
+    schedule's `revision` field) to get a 409 instead of overwriting a
+    concurrent edit.
+    """
     from firebase_admin import db
 
     data = request.get_json() or {}
 
-    ref = db.reference(f"schedules/{transaction_id}")
-    existing = ref.get()
-    if not existing:
+    revision, etag = _read_revision(transaction_id)
+    if revision is None:
         return jsonify({"error": "Schedule not found"}), 404
 
-    # Handle driver assignment ONLY here
-    if "current" in data:
-        current = data.get("current") or {}
-        ref.child("current").update({
-            "driverName": current.get("driverName", ""),
-            "cellPhone": current.get("cellPhone", "")
-        })
-
-    # Allow-list update only
-    updates = {
-        k: v for k, v in data.items()
-        if k in EDITABLE_FIELDS
-    }
+    expected = _expected_revision()
+    if expected is not None and expected != revision:
+        return _conflict(transaction_id)
 
+    updates = _schedule_field_updates(transaction_id, data)
     if updates:
-        ref.update(updates)
+        if not _claim_revision(transaction_id, revision, etag):
+            return _conflict(transaction_id)
+        revision += 1
+
+        date_counts = {}
+        if "date" in data:
+            old_date = db.reference(f"schedules/{transaction_id}/date").get()
+            if old_date != data["date"]:
+                date_counts = {old_date: -1, data["date"]: 1}
+                updates.update(booking_deltas(date_counts))
+
+        updates.update(change_stamp())
+        db.reference().update(updates)
+        cache.invalidate_prefix(CALENDAR_PREFIX)
+
+        if _deleted_meanwhile(transaction_id):
+            # The delete already counted the booking off its stored date
+            db.reference().update({
+                f"schedules/{transaction_id}": None,
+                **booking_deltas({date: -n for date, n in date_counts.items()}),
+                **change_stamp()
+            })
+            return jsonify({"error": "Schedule not found"}), 404
 
-    return jsonify({
+    response = jsonify({
         "success": True,
-        "transactionID": transaction_id
-    }), 200
+        "transactionID": transaction_id,
+        "revision": revision
+    })
+    response.set_etag(str(revision))
+    return response, 200
+
+
+@schedules_api.route("/api/schedules/bulk", methods=["PATCH"])
+@admin_required
+def bulk_update_schedules():
+    """
+    Apply many edits in one multi-path write.
+    Body: [{"transactionID": "...", "changes": {...}}, ...]
+          (or {"updates": [...]})
+    Changes go through the same EDITABLE_FIELDS / `current` rules as
+    PATCH /api/schedules/<id>. Unknown IDs are reported, not created.
+    """
+    from firebase_admin import db
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get("updates")
+    if not isinstance(data, list) or not data:
+        return jsonify({"error": "A list of {transactionID, changes} is required"}), 400
+    if len(data) > MAX_PAGE_SIZE:
+        return jsonify({"error": f"At most {MAX_PAGE_SIZE} schedules per request"}), 400
+
+    edits = {}
+    invalid = []
+    for entry in data:
+        transaction_id = entry.get("transactionID") if isinstance(entry, dict) else None
+        changes = entry.get("changes") if isinstance(entry, dict) else None
+        if not transaction_id or not isinstance(changes, dict) or \
+                any(c in INVALID_KEY_CHARS for c in str(transaction_id)):
+            invalid.append(transaction_id)
+            continue
+        # Later entries for the same ID win, like sequential PATCHes would
+        edits.setdefault(str(transaction_id), {}).update(changes)
+
+    try:
+        existing = _existing_schedule_ids(list(edits))
+        missing = [tid for tid in edits if tid not in existing]
+
+        old_dates = _schedule_dates([
+            tid for tid in edits if tid in existing and "date" in edits[tid]
+        ])
+        date_counts = Counter()
+
+        updates = {}
+        updated = []
+        for transaction_id in edits:
+            if transaction_id not in existing:
+                continue
+            field_updates = _schedule_field_updates(transaction_id, edits[transaction_id])
+            if field_updates:
+                field_updates[f"schedules/{transaction_id}/revision"] = {".sv": {"increment": 1}}
+                updates.update(field_updates)
+                updated.append(transaction_id)
+
+                if transaction_id in old_dates:
+                    date_counts[old_dates[transaction_id]] -= 1
+                    date_counts[edits[transaction_id]["date"]] += 1
+
+        if updates:
+            updates.update(booking_deltas(date_counts))
+            updates.update(change_stamp())
+            db.reference().update(updates)
+            cache.invalidate_prefix(CALENDAR_PREFIX)
+
+        return jsonify({
+            "success": not missing and not invalid,
+            "updated": updated,
+            "missing": missing,
+            "invalid": invalid
+        }), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 # ---------------- DELETE ----------------
 @admin_required
@@ -133,11 +725,33 @@ def delete_schedule(transaction_id):
     from firebase_admin import db
 
     try:
-        ref = db.reference(f"schedules/{transaction_id}")
-        if not ref.get():
-            return jsonify({"error": "Schedule not found"}), 404
-
-        ref.delete()
+        # Claim the revision first, even without If-Match: an edit that
+        # claimed before us sees the tombstone after its write (see
+        # _deleted_meanwhile), one that claims after us gets a 409
+        expected = _expected_revision()
+        for _ in range(DELETE_CLAIM_ATTEMPTS):
+            revision, etag = _read_revision(transaction_id)
+            if revision is None:
+                return jsonify({"error": "Schedule not found"}), 404
+            if expected is not None and expected != revision:
+                return _conflict(transaction_id)
+            if _claim_revision(transaction_id, revision, etag):
+                break
+            if expected is not None:
+                return _conflict(transaction_id)
+        else:
+            return _conflict(transaction_id)
+
+        old_date = db.reference(f"schedules/{transaction_id}/date").get()
+
+        db.reference().update({
+            f"schedules/{transaction_id}": None,
+            f"{SCHEDULES_DELETED}/{transaction_id}": SERVER_TIMESTAMP,
+            **booking_deltas({old_date: -1}),
+            **change_stamp()
+        })
+        cache.invalidate_prefix(CALENDAR_PREFIX)
+        _prune_tombstones()
         return jsonify({"success": True, "transactionID": transaction_id}), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -149,11 +763,8 @@ def get_transport_units():
     """
     Fetch all transport units from Firebase Realtime Database
     """
-    from firebase_admin import db
-
     try:
-        ref = db.reference("transportUnits")
-        data = ref.get() or {}
+        data = cached_get("transportUnits") or {}
 
         # Convert to list
         transport_units = []
@@ -0,0 +1,194 @@
+# /OLStar/backend/rtdb_cache.py
+"""
+Read-through cache for hot Realtime Database nodes.
+
+Wraps db.reference(path).get() with a per-path TTL and a size-bounded LRU.
+Write handlers call invalidate(path) after changing a node so this process
+never serves its own stale writes; other workers converge within the TTL,
+so TTLs of nodes the admin pages edit stay at a few seconds.
+
+Cached values are shared between requests - treat them as read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+# Longest matching prefix wins. users holds driver locations, so keep it short;
+# userNames and transportUnits are edited from the admin pages on any worker.
+DEFAULT_TTLS = {
+    "users": 10,
+    "userNames": 10,
+    "transportUnits": 10,
+}
+DEFAULT_TTL = 30
+MAX_ENTRIES = 64
+
+# Synthetic keys for derived views. Schedule writes drop them all with
+# cache.invalidate_prefix(CALENDAR_PREFIX).
+CALENDAR_PREFIX = "calendar:"
+
+
+def _normalize(path):
+    return "/".join(p for p in path.split("/") if p)
+
+
+class RTDBCache:
+    def __init__(self, ttls=None, default_ttl=DEFAULT_TTL, max_entries=MAX_ENTRIES):
+        self._ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self._default_ttl = default_ttl
+        self._max_entries = max_entries
+        self._entries = OrderedDict()  # path -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._loading = {}  # path -> Lock, so concurrent misses load once
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._per_path = {}
+        self._generation = 0  # bumped by every invalidation
+
+    def ttl_for(self, path):
+        path = _normalize(path)
+        best, best_len = self._default_ttl, -1
+        for prefix, ttl in self._ttls.items():
+            if (path == prefix or path.startswith(prefix + "/")) and len(prefix) > best_len:
+                best, best_len = ttl, len(prefix)
+        return best
+
+    def get(self, path, loader=None, ttl=None):
+        """
+        Return the cached value for `path`, loading it on a miss.
+        `loader` defaults to db.reference(path).get(); pass one to cache a
+        derived value (e.g. a query result) under a synthetic key.
+        """
+        path = _normalize(path)
+
+        value, hit = self._lookup(path)
+        if hit:
+            return value
+
+        with self._lock:
+            path_lock = self._loading.setdefault(path, threading.Lock())
+
+        with path_lock:
+            # Another thread may have loaded it while we waited
+            value, hit = self._lookup(path, count=False)
+            if hit:
+                return value
+
+            with self._lock:
+                self._count(path, "misses")
+                generation = self._generation
+            if loader is None:
+                from firebase_admin import db
+                value = db.reference(path).get()
+            else:
+                value = loader()
+
+            self._store(path, value, self.ttl_for(path) if ttl is None else ttl, generation)
+            return value
+
+    def get_many(self, paths, loader, ttl=None):
+        """
+        get() for several keys whose misses load together: loader(missing)
+        returns {path: value} for the paths not cached. Returns {path: value}.
+        """
+        paths = [_normalize(path) for path in paths]
+        values, missing = {}, []
+        for path in paths:
+            value, hit = self._lookup(path)
+            if hit:
+                values[path] = value
+            else:
+                missing.append(path)
+        if not missing:
+            return values
+
+        with self._lock:
+            for path in missing:
+                self._count(path, "misses")
+            generation = self._generation
+        loaded = loader(missing)
+
+        for path in missing:
+            values[path] = loaded.get(path)
+            self._store(path, values[path], self.ttl_for(path) if ttl is None else ttl, generation)
+        return values
+
+    def peek(self, path):
+        """(value, True) if `path` is cached and fresh, else (None, False). Never loads."""
+        return self._lookup(_normalize(path))
+
+    def _lookup(self, path, count=True):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(path)
+                if count:
+                    self._count(path, "hits")
+                return entry[1], True
+            return None, False
+
+    def _store(self, path, value, ttl, generation):
+        with self._lock:
+            if generation != self._generation:
+                return  # invalidated while loading; don't cache a stale read
+            self._entries[path] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def _count(self, path, counter):
+        # Caller holds self._lock
+        self._counters[counter] += 1
+        per_path = self._per_path.setdefault(path.split("/")[0], {"hits": 0, "misses": 0})
+        per_path[counter] += 1
+
+    def invalidate(self, path):
+        """Drop `path`, everything cached beneath it and any ancestor copy."""
+        path = _normalize(path)
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if key == path
+                or key.startswith(path + "/")
+                or path.startswith(key + "/")
+                or not key
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            self._counters["invalidations"] += 1
+
+    def invalidate_prefix(self, prefix):
+        """Drop every synthetic key starting with `prefix` (e.g. "calendar:")."""
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                del self._entries[key]
+            self._generation += 1
+            self._counters["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hitRate": round(self._counters["hits"] / lookups, 3) if lookups else None,
+                "entries": len(self._entries),
+                "maxEntries": self._max_entries,
+                "paths": {k: dict(v) for k, v in self._per_path.items()},
+            }
+
+
+cache = RTDBCache()
+
+
+def cached_get(path):
+    return cache.get(path)
+
+
+def invalidate(path):
+    cache.invalidate(path)
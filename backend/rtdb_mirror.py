@@ -0,0 +1,281 @@
+# /OLStar/backend/rtdb_mirror.py
+"""
+Optional local SQLite mirror of the Realtime Database.
+
+When RTDB_MIRROR_PATH is set, each process opens one listen() stream per
+mirrored node. The initial snapshot bootstraps a table per node and every
+later put/patch event is applied to it, so reporting handlers can answer
+with local SQL instead of downloading whole trees.
+
+Handlers ask get_mirror(*nodes) for a ready, fresh mirror and fall back to
+direct RTDB reads when it returns None (disabled, still bootstrapping, or
+the listener has gone quiet for too long).
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# node -> {column: child path}; every table also has id and data (full JSON)
+MIRROR_NODES = {
+    "schedules": {
+        "columns": {
+            "date": "date",
+            "time": "time",
+            "driverName": "current/driverName",
+            "status": "status",
+            "tripType": "tripType",
+            "updatedAt": "updatedAt",
+        },
+        "indexes": ["date", "driverName", "status"],
+    },
+    "users": {
+        "columns": {
+            "role": "role",
+            "firstName": "firstName",
+            "lastName": "lastName",
+            "active": "active",
+            "hasLocation": "currentLocation",
+        },
+        "indexes": ["role"],
+    },
+    "requests": {
+        "columns": {
+            "status": "status",
+            "requestedBy": "requestedBy",
+            "timestamp": "timestamp",
+        },
+        "indexes": ["status", "requestedBy", "timestamp"],
+    },
+    "transportUnits": {
+        "columns": {
+            "transportUnit": "transportUnit",
+            "plateNumber": "plateNumber",
+        },
+        "indexes": [],
+    },
+}
+
+# The SDK re-sends a full snapshot at least hourly (token refresh), so a
+# node with no event for longer than this has most likely lost its stream.
+MAX_SILENCE_SECONDS = 65 * 60
+
+
+def _child(data, path):
+    for segment in path.split("/"):
+        if not isinstance(data, dict):
+            return None
+        data = data.get(segment)
+    return data
+
+
+def _column_value(value):
+    if isinstance(value, dict):
+        return 1  # presence marker, e.g. currentLocation
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _set_child(data, segments, value):
+    """Set/delete a nested child in a plain dict, pruning empty parents."""
+    if not segments:
+        return value
+    data = dict(data) if isinstance(data, dict) else {}
+    head, rest = segments[0], segments[1:]
+    child = _set_child(data.get(head), rest, value)
+    if child is None or child == {}:
+        data.pop(head, None)
+    else:
+        data[head] = child
+    return data
+
+
+class RTDBMirror:
+    def __init__(self, path, nodes=None):
+        self.path = path
+        self.nodes = nodes or MIRROR_NODES
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._registrations = {}
+        self._loaded_at = {}
+        self._last_event_at = {}
+        self._create_schema()
+
+    # ---------------- Schema ----------------
+    def _create_schema(self):
+        with self._lock, self._conn:
+            for node, spec in self.nodes.items():
+                columns = ", ".join(f'"{c}"' for c in spec["columns"])
+                self._conn.execute(
+                    f'CREATE TABLE IF NOT EXISTS "{node}" '
+                    f'(id TEXT PRIMARY KEY, {columns}, data TEXT NOT NULL)'
+                )
+                for column in spec["indexes"]:
+                    self._conn.execute(
+                        f'CREATE INDEX IF NOT EXISTS "idx_{node}_{column}" '
+                        f'ON "{node}" ("{column}")'
+                    )
+
+    # ---------------- Listener ----------------
+    def start(self):
+        from firebase_admin import db
+
+        for node in self.nodes:
+            if node in self._registrations:
+                continue
+            self._registrations[node] = db.reference(node).listen(
+                lambda event, node=node: self._on_event(node, event)
+            )
+
+    def stop(self):
+        for registration in self._registrations.values():
+            registration.close()
+        self._registrations = {}
+
+    def _on_event(self, node, event):
+        segments = [s for s in (event.path or "").split("/") if s]
+
+        try:
+            with self._lock, self._conn:
+                if event.event_type == "patch":
+                    for key, value in (event.data or {}).items():
+                        self._apply(node, segments + [s for s in key.split("/") if s], value)
+                else:
+                    self._apply(node, segments, event.data)
+
+                now = time.time()
+                self._last_event_at[node] = now
+                if not segments and event.event_type == "put":
+                    self._loaded_at[node] = now
+        except Exception as e:
+            print(f"Mirror failed to apply {node} event at {event.path}:", e)
+            # Force a direct-read fallback until the next full snapshot
+            self._loaded_at.pop(node, None)
+
+    def _apply(self, node, segments, value):
+        if not segments:
+            # Full snapshot of the node
+            self._conn.execute(f'DELETE FROM "{node}"')
+            rows = [
+                self._row(node, key, child)
+                for key, child in (value or {}).items() if isinstance(child, dict)
+            ]
+            if rows:
+                self._conn.executemany(self._upsert_sql(node), rows)
+            return
+
+        key, rest = segments[0], segments[1:]
+        if rest:
+            current = self._conn.execute(
+                f'SELECT data FROM "{node}" WHERE id = ?', (key,)
+            ).fetchone()
+            value = _set_child(json.loads(current["data"]) if current else {}, rest, value)
+
+        if not isinstance(value, dict) or not value:
+            self._conn.execute(f'DELETE FROM "{node}" WHERE id = ?', (key,))
+        else:
+            self._conn.execute(self._upsert_sql(node), self._row(node, key, value))
+
+    def _upsert_sql(self, node):
+        columns = ["id", *self.nodes[node]["columns"], "data"]
+        names = ", ".join(f'"{c}"' for c in columns)
+        marks = ", ".join("?" for _ in columns)
+        return f'INSERT OR REPLACE INTO "{node}" ({names}) VALUES ({marks})'
+
+    def _row(self, node, key, value):
+        columns = self.nodes[node]["columns"]
+        return (
+            key,
+            *(_column_value(_child(value, path)) for path in columns.values()),
+            json.dumps(value),
+        )
+
+    # ---------------- Reads ----------------
+    def is_fresh(self, *nodes):
+        now = time.time()
+        for node in nodes:
+            if node not in self._loaded_at:
+                return False
+            if now - self._last_event_at.get(node, 0) > MAX_SILENCE_SECONDS:
+                return False
+        return True
+
+    def query(self, sql, params=()):
+        """Run a read-only SQL query; rows come back as dicts."""
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def scalar(self, sql, params=()):
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+            return row[0] if row else None
+
+    def node(self, node, where="", params=(), order_by="id"):
+        """
+        Rows of a mirrored node as {id: data}, shaped like a
+        db.reference(node).get() result so existing handlers can reuse it.
+        """
+        sql = f'SELECT id, data FROM "{node}"'
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {row["id"]: json.loads(row["data"]) for row in rows}
+
+    def status(self):
+        now = time.time()
+        nodes = {}
+        for node in self.nodes:
+            loaded = self._loaded_at.get(node)
+            last = self._last_event_at.get(node)
+            nodes[node] = {
+                "ready": loaded is not None,
+                "fresh": self.is_fresh(node),
+                "rows": self.scalar(f'SELECT COUNT(*) FROM "{node}"'),
+                "loadedSecondsAgo": round(now - loaded, 1) if loaded else None,
+                "lastEventSecondsAgo": round(now - last, 1) if last else None,
+            }
+        return {"enabled": True, "path": self.path, "nodes": nodes}
+
+
+mirror = None
+
+
+def start_mirror(path=None):
+    """
+    Start this process's mirror if RTDB_MIRROR_PATH (or `path`) is set.
+    Each process gets its own file: "<path>.<pid>".
+    """
+    global mirror
+
+    base = path or os.getenv("RTDB_MIRROR_PATH")
+    if not base or mirror is not None:
+        return mirror
+
+    file_path = base if base == ":memory:" else f"{base}.{os.getpid()}"
+    if file_path != ":memory:" and os.path.exists(file_path):
+        os.remove(file_path)  # always bootstrap from a fresh snapshot
+
+    mirror = RTDBMirror(file_path)
+    mirror.start()
+    return mirror
+
+
+def get_mirror(*nodes):
+    """The mirror if it is enabled and fresh for all `nodes`, else None."""
+    if mirror is not None and mirror.is_fresh(*nodes):
+        return mirror
+    return None
+
+
+def mirror_status():
+    if mirror is None:
+        return {"enabled": False}
+    return mirror.status()
@@ -0,0 +1,180 @@
+# /OLStar/backend/schedule_stream.py
+"""
+Fan-out of Realtime Database schedule changes to Server-Sent Events clients.
+
+Each process holds at most one db.reference("schedules").listen() stream,
+opened lazily by the first subscriber. Every patch/put event after the
+initial snapshot is numbered and pushed to all connected subscribers; a
+short backlog lets reconnecting clients resume from Last-Event-ID.
+
+Every open stream holds a server thread, so each process accepts at most
+MAX_SUBSCRIBERS of them; past that subscribe() raises StreamFull and the
+page falls back to polling.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+HEARTBEAT_SECONDS = 15
+MAX_STREAM_SECONDS = 300  # clients reconnect (and resume) after this
+BACKLOG_SIZE = 500
+SUBSCRIBER_QUEUE_SIZE = 1000
+# Per process; keep well below the gunicorn thread count (Procfile)
+MAX_SUBSCRIBERS = int(os.getenv("SSE_MAX_SUBSCRIBERS", 8))
+
+
+class StreamFull(Exception):
+    pass
+
+
+def _sse(event, data, event_id=None):
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {data}")
+    return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One connected client. Iterate messages() to get SSE-formatted text."""
+
+    def __init__(self, hub, replay):
+        self._hub = hub
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+        # None means the requested Last-Event-ID can't be replayed
+        self._replay = replay
+
+    def push(self, message):
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            self.overflowed = True
+
+    def messages(self, heartbeat=HEARTBEAT_SECONDS, max_duration=MAX_STREAM_SECONDS):
+        yield "retry: 3000\n\n"
+
+        if self._replay is None:
+            yield _sse("resync", "{}")
+        else:
+            for event_id, payload in self._replay:
+                yield _sse("change", payload, event_id)
+
+        deadline = time.monotonic() + max_duration
+        while time.monotonic() < deadline:
+            if self.overflowed:
+                # Slow client: drop what's queued and tell it to refetch
+                self.overflowed = False
+                with self._queue.mutex:
+                    self._queue.queue.clear()
+                yield _sse("resync", "{}")
+                continue
+
+            try:
+                event, payload, event_id = self._queue.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ": ping\n\n"
+                continue
+            yield _sse(event, payload, event_id)
+
+    def close(self):
+        self._hub.unsubscribe(self)
+
+
+class ScheduleStreamHub:
+    def __init__(self, path="schedules"):
+        self._path = path
+        self._lock = threading.RLock()
+        self._subscribers = set()
+        self._backlog = deque(maxlen=BACKLOG_SIZE)
+        self._seq = 0
+        self._boot = uuid.uuid4().hex[:8]
+        self._registration = None
+        self._snapshot_seen = False
+
+    # ---------------- Subscribers ----------------
+    def subscribe(self, last_event_id=None):
+        self._ensure_listening()
+
+        with self._lock:
+            if len(self._subscribers) >= MAX_SUBSCRIBERS:
+                raise StreamFull(f"At most {MAX_SUBSCRIBERS} live streams per server process")
+            replay = [] if not last_event_id else self._replay_after(last_event_id)
+            subscription = Subscription(self, replay)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _replay_after(self, last_event_id):
+        """Backlog entries after last_event_id, or None if it's unknown/too old."""
+        boot, _, seq = last_event_id.partition("-")
+        if boot != self._boot or not seq.isdigit():
+            return None
+
+        seq = int(seq)
+        oldest = self._backlog[0][0] if self._backlog else self._seq + 1
+        if seq < oldest - 1:
+            return None
+
+        return [
+            (f"{self._boot}-{s}", payload)
+            for s, payload in self._backlog if s > seq
+        ]
+
+    @property
+    def subscriber_count(self):
+        return len(self._subscribers)
+
+    # ---------------- RTDB listener ----------------
+    def _ensure_listening(self):
+        with self._lock:
+            if self._registration is not None:
+                return
+            from firebase_admin import db
+            self._registration = db.reference(self._path).listen(self._on_event)
+
+    def _on_event(self, event):
+        if event.path == "/" and event.event_type == "put":
+            # Full snapshot: sent on connect and again on every SDK
+            # reconnect/token refresh. Clients can't diff it, so resync.
+            if not self._snapshot_seen:
+                self._snapshot_seen = True
+                return
+            self._broadcast("resync", "{}")
+            return
+
+        payload = json.dumps({
+            "type": event.event_type,
+            "path": event.path,
+            "data": event.data
+        })
+
+        with self._lock:
+            self._seq += 1
+            self._backlog.append((self._seq, payload))
+            event_id = f"{self._boot}-{self._seq}"
+        self._broadcast("change", payload, event_id)
+
+    def _broadcast(self, event, payload, event_id=None):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.push((event, payload, event_id))
+
+    def close(self):
+        with self._lock:
+            registration, self._registration = self._registration, None
+            self._snapshot_seen = False
+        if registration is not None:
+            registration.close()
+
+
+hub = ScheduleStreamHub()
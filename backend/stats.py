@@ -0,0 +1,213 @@
+# /OLStar/backend/stats.py
+"""
+Materialized dashboard counters.
+
+    stats/daily/<YYYY-MM-DD>/bookings   schedules on that date
+    stats/live/totalUsers
+    stats/live/activeSessions
+    stats/live/driversOnline
+    stats/live/pendingRequests
+    stats/live/reconciledAt             last full rebuild (ms)
+
+Write handlers merge the *_delta() entries below into their own multi-path
+update; the server applies {".sv": {"increment": n}} atomically, so
+concurrent writers never lose counts. Writes made outside this backend
+(driver app sessions, locations, new requests) only move the live counters;
+reconcile_live() recounts those from /users and the pending requests, and
+the dashboard triggers it in the background once they are older than
+RECONCILE_INTERVAL_SECONDS. rebuild_stats() rescans all history and is a
+manual repair (maintenance.py rebuild-stats, POST /api/admin/stats/rebuild).
+
+Both write with set_if_unchanged() against the ETag read before counting,
+so an increment that lands mid-scan makes them count again instead of being
+overwritten.
+"""
+import re
+import threading
+import time
+from datetime import datetime
+
+from firebase_admin import db
+
+STATS_ROOT = "stats"
+LIVE_FIELDS = ("totalUsers", "activeSessions", "driversOnline", "pendingRequests")
+RECONCILE_INTERVAL_SECONDS = 10 * 60
+RECOUNT_ATTEMPTS = 3  # recounts when increments keep landing mid-scan
+DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+
+_rebuild_lock = threading.Lock()
+_last_async_rebuild = 0.0
+
+
+def increment(n):
+    return {".sv": {"increment": n}}
+
+
+# ---------------- Deltas for write paths ----------------
+def booking_deltas(counts):
+    """
+    counts: {date: +n/-n}. Aggregate per date before calling - two entries
+    for the same path in one multi-path update would overwrite each other.
+    """
+    return {
+        f"{STATS_ROOT}/daily/{date}/bookings": increment(n)
+        for date, n in counts.items()
+        if n and date and isinstance(date, str) and DATE_RE.match(date)
+    }
+
+
+def live_delta(field, n=1):
+    return {f"{STATS_ROOT}/live/{field}": increment(n)}
+
+
+def user_deltas(user, sign):
+    """Counter changes for adding (sign=1) or removing (sign=-1) a user record."""
+    user = user or {}
+    updates = live_delta("totalUsers", sign)
+    if user.get("active"):
+        updates.update(live_delta("activeSessions", sign))
+    if user.get("role") == "driver" and user.get("currentLocation"):
+        updates.update(live_delta("driversOnline", sign))
+    return updates
+
+
+# ---------------- Recounts ----------------
+def compute_live(users, pending_requests):
+    users = {k: u for k, u in users.items() if isinstance(u, dict)}
+    return {
+        "totalUsers": len(users),
+        "activeSessions": sum(1 for u in users.values() if u.get("active")),
+        "driversOnline": sum(
+            1 for u in users.values()
+            if u.get("role") == "driver" and u.get("currentLocation")
+        ),
+        "pendingRequests": pending_requests,
+    }
+
+
+def compute_stats(users, requests, schedules):
+    daily = {}
+    for booking in schedules.values():
+        date = booking.get("date") if isinstance(booking, dict) else None
+        if isinstance(date, str) and DATE_RE.match(date):
+            daily.setdefault(date, {"bookings": 0})["bookings"] += 1
+
+    pending = sum(
+        1 for r in requests.values()
+        if isinstance(r, dict) and r.get("status") == "pending"
+    )
+    return {"daily": daily, "live": compute_live(users, pending)}
+
+
+def _replace_if_unchanged(path, count):
+    """
+    Overwrite `path` with count(), unless something wrote to it while
+    counting; then count again, up to RECOUNT_ATTEMPTS times.
+    Returns the value written, or None if every attempt lost the race.
+    """
+    ref = db.reference(path)
+    for _ in range(RECOUNT_ATTEMPTS):
+        _, etag = ref.get(etag=True)
+        value = count()
+        if ref.set_if_unchanged(etag, value)[0]:
+            return value
+    print(f"Stats recount of /{path} gave up: counters kept changing during the scan")
+    return None
+
+
+def rebuild_stats():
+    """
+    Recompute every counter from the raw trees and overwrite /stats.
+    Reads all history; a manual repair, not something to run periodically.
+    Returns the new stats, or None if another rebuild is already running.
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        return None
+    try:
+        def count():
+            stats = compute_stats(
+                db.reference("users").get() or {},
+                db.reference("requests").get() or {},
+                db.reference("schedules").get() or {},
+            )
+            stats["live"]["reconciledAt"] = int(time.time() * 1000)
+            return stats
+
+        return _replace_if_unchanged(STATS_ROOT, count)
+    finally:
+        _rebuild_lock.release()
+
+
+def reconcile_live():
+    """
+    Recount stats/live, the counters writes outside this backend move.
+    Reads /users and the pending requests only (indexed on status). Daily
+    bookings only change through this backend's schedule writes, which keep
+    them exact, so they're left alone.
+    """
+    if not _rebuild_lock.acquire(blocking=False):
+        return None
+    try:
+        def count():
+            pending = db.reference("requests").order_by_child("status").equal_to("pending").get() or {}
+            live = compute_live(db.reference("users").get() or {}, len(pending))
+            live["reconciledAt"] = int(time.time() * 1000)
+            return live
+
+        return _replace_if_unchanged(f"{STATS_ROOT}/live", count)
+    finally:
+        _rebuild_lock.release()
+
+
+def _at_most_every_interval(fn):
+    """Run fn in the background, at most once per interval per process."""
+    global _last_async_rebuild
+
+    if time.time() - _last_async_rebuild < RECONCILE_INTERVAL_SECONDS:
+        return
+    _last_async_rebuild = time.time()
+    threading.Thread(target=fn, daemon=True).start()
+
+
+def rebuild_stats_async():
+    """Build /stats from scratch in the background (counters missing)."""
+    _at_most_every_interval(rebuild_stats)
+
+
+def reconcile_live_async():
+    _at_most_every_interval(reconcile_live)
+
+
+# ---------------- Dashboard read ----------------
+def read_dashboard_metrics(today=None):
+    """
+    Dashboard numbers from the counters node, or None if it was never built.
+    Schedules a background reconcile when the counters are getting old.
+    """
+    today = today or datetime.now().date().isoformat()
+
+    live = db.reference(f"{STATS_ROOT}/live").get()
+    if not live:
+        return None
+
+    bookings_today = db.reference(daily_bookings_path(today)).get()
+    return metrics_from_stats(live, bookings_today)
+
+
+def daily_bookings_path(date):
+    return f"{STATS_ROOT}/daily/{date}/bookings"
+
+
+def metrics_from_stats(live, bookings_today):
+    """Shape already-fetched /stats values into dashboard numbers."""
+    if not live:
+        return None
+
+    bookings_today = bookings_today or 0
+    reconciled_at = live.get("reconciledAt") or 0
+    if time.time() * 1000 - reconciled_at > RECONCILE_INTERVAL_SECONDS * 1000:
+        reconcile_live_async()
+
+    metrics = {field: max(live.get(field) or 0, 0) for field in LIVE_FIELDS}
+    metrics["bookingsToday"] = max(bookings_today, 0)
+    return metrics
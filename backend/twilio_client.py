@@ -1,9 +1,10 @@
 import math
-import requests
+import os
 from datetime import datetime, timedelta, timezone
 
-API_KEY = "e36f3f-e8d272"
-BASE_URL = "https://aviation-edge.com/v2/public/flights"
+from aviation_edge import get_client
+
+API_KEY = os.getenv("AVIATIONEDGE_KEY") or "e36f3f-e8d272"
 
 # --- RPLC Coordinates (Clark International Airport) ---
 RPLC_COORDS = (15.1860, 120.5600)
@@ -19,30 +20,15 @@ def haversine(lat1, lon1, lat2, lon2):
     return R * c
 
 def get_flight_data(flight_number):
-    params = {"key": API_KEY, "flightIata": flight_number}
-    response = requests.get(BASE_URL, params=params)
-    
-    if response.status_code != 200:
-        raise Exception(f"API request failed with status code {response.status_code}")
-    
-    data = response.json()
-    if not data:
-        raise Exception("No live data available for this flight number.")
-    
-    flight = data[0]
-
-    # Safe access
-    geography = flight.get("geography")
-    speed = flight.get("speed")
+    # Shared cache + rate limiter (aviation_edge.py); raises
+    # FlightDataUnavailable when there's no live position
+    flight = get_client(API_KEY).get_flight(flight_number)
     arrival = flight.get("arrival")
 
-    if not geography or not speed:
-        raise Exception("Flight hasn't departed yet or live data unavailable.")
-    
     # If arrival coordinates missing, set to NAIA
     if arrival is None or arrival.get("latitude") is None or arrival.get("longitude") is None:
         arrival = {"latitude": RPLC_COORDS[0], "longitude": RPLC_COORDS[1]}
-        flight["arrival"] = arrival
+        flight = dict(flight, arrival=arrival)
 
     return flight
 
@@ -55,7 +41,8 @@ def calculate_eta(flight):
     lon2 = flight["arrival"]["longitude"]
 
     distance_km = haversine(lat1, lon1, lat2, lon2)
-    eta_hours = distance_km / speed_kmh
+    # Landed flights report speed 0
+    eta_hours = 0.0 if flight.get("status") == "landed" else distance_km / speed_kmh
 
     current_utc = datetime.now(timezone.utc)
     eta_utc = current_utc + timedelta(hours=eta_hours)
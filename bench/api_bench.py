@@ -0,0 +1,338 @@
+# /OLStar/bench/api_bench.py
+"""
+HTTP API benchmarks against an in-memory Firebase.
+
+    python -m bench.api_bench --sizes 1000,10000,100000 --latency-ms 20
+    python -m bench.api_bench --baseline bench/results/api-20250314-101500.json
+
+The real Flask app runs against sim.fake_rtdb and sim.fake_auth, seeded
+with `size` schedules, users and requests (bench/seed.py). Every endpoint
+is requested `--iterations` times through the Flask test client, with the
+backend caches left as they fall ("warm") and cleared before each request
+("cold"). Per endpoint the report has p50/p90/p99 latency, response bytes
+and RTDB/Auth calls per request; --latency-ms adds a fixed delay to every
+fake call, roughly one Firebase round trip.
+
+Results go to bench/results/api-<timestamp>.json (or --json). Given a
+--baseline from an earlier run, rows that got slower, bigger or chattier
+than --threshold are listed and the exit status is 1. Call counts and
+bytes are deterministic for a seed; latencies depend on the machine, so
+compare runs made on the same host.
+
+To measure through a real server instead of the test client, start
+bench/server.py under gunicorn and pass --target (one worker, so the
+counters cover every request):
+
+    BENCH_SIZE=10000 gunicorn -w 1 --threads 4 -b 127.0.0.1:8000 bench.server:app
+    python -m bench.api_bench --target http://127.0.0.1:8000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))  # backend modules import each other by bare name
+
+# backend/app.py refuses to start without these; nothing here talks to Firebase
+BENCH_SECRET = "bench-" + "0" * 58
+os.environ.setdefault("FLASK_SECRET_KEY", BENCH_SECRET)
+os.environ.setdefault("FIREBASE_DATABASE_URL", "https://bench.invalid")
+os.environ["RTDB_MIRROR_PATH"] = ""  # measure the RTDB read paths, not the mirror
+
+from bench.seed import auth_users, seed_tree  # noqa: E402
+from sim.fake_auth import FakeAuth, install_auth  # noqa: E402
+from sim.fake_rtdb import FakeDatabase, install  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+ADMIN_SESSION = {"uid": "bench-admin", "role": "admin"}
+# Below this a p50 change is timer noise, whatever the ratio
+MIN_LATENCY_DELTA_MS = 1.0
+
+# (name, path); {today} and {month} are filled in per run
+ENDPOINTS = (
+    ("schedules_all", "/api/schedules"),
+    ("schedules_day", "/api/schedules?date={today}"),
+    ("schedules_page", "/api/schedules?limit=100"),
+    ("dashboard", "/api/admin/dashboard"),
+    ("dashboard_bootstrap", "/api/admin/dashboard/bootstrap"),
+    ("calendar_month", "/api/admin/calendar/schedules?month={month}"),
+    ("users", "/api/admin/users"),
+    ("users_no_auth", "/api/admin/users?auth=false"),
+    ("requests_page", "/api/admin/requests?limit=50"),
+    ("requests_pending", "/api/admin/requests?status=pending&limit=50"),
+)
+
+
+# ---------------- In-memory backend ----------------
+class Backend:
+    """The Flask app wired to a freshly seeded fake RTDB and Auth."""
+
+    def __init__(self, size, seed=1, latency=0.0):
+        self.size = size
+        tree = seed_tree(size, seed)
+        self.db = FakeDatabase(tree, latency=latency)
+        self.auth = FakeAuth(auth_users(tree["users"], seed), latency=latency)
+        self._restore = [install(self.db), install_auth(self.auth)]
+
+        from backend.app import app  # after install(): the init guard sees an app
+        import stats
+        from indexes import rebuild_user_names
+
+        self.app = app
+        self.reset_caches()
+        # Derived nodes a live database already has
+        stats.rebuild_stats()
+        rebuild_user_names()
+        stats._last_async_rebuild = time.time()  # no background reconcile mid-run
+        self.reset_caches()
+        self.db.reset_counters()
+        self.auth.reset_counters()
+
+    def reset_caches(self):
+        import indexes
+        from auth_status import auth_status
+        from rtdb_cache import cache
+
+        cache.clear()
+        auth_status.clear()
+        indexes._unknown_uids.clear()
+
+    def counters(self):
+        return {
+            "rtdbCalls": self.db.total_calls,
+            "rtdbBytes": self.db.bytes_out,
+            "authCalls": self.auth.total_calls,
+        }
+
+    def close(self):
+        self.reset_caches()
+        for restore in reversed(self._restore):
+            restore()
+
+
+# ---------------- Drivers ----------------
+class TestClientDriver:
+    def __init__(self, backend):
+        self.backend = backend
+        self.size = backend.size
+        self.client = backend.app.test_client()
+        with self.client.session_transaction() as session:
+            session.update(ADMIN_SESSION)
+
+    def get(self, path):
+        response = self.client.get(path)
+        return response.status_code, len(response.get_data())
+
+    def counters(self):
+        return self.backend.counters()
+
+    def reset_caches(self):
+        self.backend.reset_caches()
+
+
+class HttpDriver:
+    """Talks to bench/server.py; counters and cache resets go through its /__bench__ routes."""
+
+    def __init__(self, base_url, secret=None):
+        import requests
+        from flask import Flask
+        from flask.sessions import SecureCookieSessionInterface
+
+        signer = Flask("bench")
+        signer.secret_key = secret or os.environ["FLASK_SECRET_KEY"]
+        cookie = SecureCookieSessionInterface().get_signing_serializer(signer).dumps(ADMIN_SESSION)
+
+        self.base_url = base_url.rstrip("/")
+        self.http = requests.Session()
+        self.http.cookies.set("session", cookie)
+        self.size = self.counters()["size"]
+
+    def get(self, path):
+        response = self.http.get(self.base_url + path)
+        return response.status_code, len(response.content)
+
+    def counters(self):
+        return self.http.get(self.base_url + "/__bench__/counters").json()
+
+    def reset_caches(self):
+        self.http.post(self.base_url + "/__bench__/reset")
+
+
+# ---------------- Measurement ----------------
+def _percentile(values, p):
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def measure(driver, path, iterations, warmup, cold):
+    latencies, sizes, statuses = [], [], set()
+    deltas = {"rtdbCalls": 0, "rtdbBytes": 0, "authCalls": 0}
+
+    for i in range(warmup + iterations):
+        if cold:
+            driver.reset_caches()
+        before = driver.counters()
+        started = time.perf_counter()
+        status, size = driver.get(path)
+        elapsed = (time.perf_counter() - started) * 1000
+        after = driver.counters()
+        if i < warmup:
+            continue
+        latencies.append(elapsed)
+        sizes.append(size)
+        statuses.add(status)
+        for key in deltas:
+            deltas[key] += after[key] - before[key]
+
+    latencies.sort()
+    return {
+        "status": sorted(statuses),
+        "latencyMs": {
+            "mean": round(sum(latencies) / len(latencies), 2),
+            "p50": round(_percentile(latencies, 0.5), 2),
+            "p90": round(_percentile(latencies, 0.9), 2),
+            "p99": round(_percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "bytes": round(sum(sizes) / len(sizes)),
+        **{key: round(total / iterations, 2) for key, total in deltas.items()},
+    }
+
+
+def run_endpoints(driver, iterations, warmup, endpoints=ENDPOINTS, verbose=True):
+    today = datetime.now().date()
+    rows = []
+    for name, template in endpoints:
+        path = template.format(today=today.isoformat(), month=today.strftime("%Y-%m"))
+        for cache in ("warm", "cold"):
+            row = {"size": driver.size, "endpoint": name, "path": path, "cache": cache}
+            row.update(measure(driver, path, iterations, warmup, cold=(cache == "cold")))
+            rows.append(row)
+            if verbose:
+                print(_format_row(row))
+    return rows
+
+
+def _format_row(row):
+    latency = row["latencyMs"]
+    return (
+        f"{row['size']:>7} {row['endpoint']:<20} {row['cache']:<4} "
+        f"p50 {latency['p50']:>9.2f}ms  p99 {latency['p99']:>9.2f}ms  "
+        f"{row['bytes']:>10}B  rtdb {row['rtdbCalls']:>6}  auth {row['authCalls']:>6}  "
+        f"{'/'.join(map(str, row['status']))}"
+    )
+
+
+# ---------------- Baseline comparison ----------------
+def compare(rows, baseline_rows, threshold):
+    """Rows worse than the baseline by more than `threshold` (a fraction)."""
+    baseline = {(r["size"], r["endpoint"], r["cache"]): r for r in baseline_rows}
+    regressions = []
+    for row in rows:
+        old = baseline.get((row["size"], row["endpoint"], row["cache"]))
+        if not old:
+            continue
+        reasons = []
+        for field in ("p50", "p99"):
+            new_ms, old_ms = row["latencyMs"][field], old["latencyMs"][field]
+            if new_ms - old_ms > MIN_LATENCY_DELTA_MS and new_ms > old_ms * (1 + threshold):
+                reasons.append(f"{field} {old_ms}ms -> {new_ms}ms")
+        for field in ("bytes", "rtdbCalls", "rtdbBytes", "authCalls"):
+            if row[field] > old[field] * (1 + threshold):
+                reasons.append(f"{field} {old[field]} -> {row[field]}")
+        if reasons:
+            regressions.append({"size": row["size"], "endpoint": row["endpoint"],
+                                "cache": row["cache"], "reasons": reasons})
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the HTTP API against an in-memory Firebase.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated record counts per node (default: %(default)s)")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every fake RTDB/Auth call")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--endpoints", help="comma-separated endpoint names (default: all)")
+    parser.add_argument("--target", help="base URL of a running bench/server.py instead of the test client")
+    parser.add_argument("--json", help="result file (default: bench/results/api-<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier result file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="relative change that counts as a regression (default: %(default)s)")
+    args = parser.parse_args()
+
+    endpoints = ENDPOINTS
+    if args.endpoints:
+        wanted = set(args.endpoints.split(","))
+        unknown = wanted - {name for name, _ in ENDPOINTS}
+        if unknown:
+            parser.error(f"unknown endpoints: {', '.join(sorted(unknown))}")
+        endpoints = [e for e in ENDPOINTS if e[0] in wanted]
+
+    rows = []
+    if args.target:
+        driver = HttpDriver(args.target)
+        sizes = [driver.size]
+        rows += run_endpoints(driver, args.iterations, args.warmup, endpoints)
+    else:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+        for size in sizes:
+            started = time.perf_counter()
+            backend = Backend(size, seed=args.seed, latency=args.latency_ms / 1000)
+            print(f"Seeded {size} records per node in {time.perf_counter() - started:.1f}s")
+            try:
+                rows += run_endpoints(TestClientDriver(backend), args.iterations, args.warmup, endpoints)
+            finally:
+                backend.close()
+
+    report = {
+        "generatedAt": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "config": {
+            "sizes": sizes,
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "latencyMs": args.latency_ms,
+            "seed": args.seed,
+            "target": args.target,
+        },
+        "results": rows,
+    }
+
+    path = args.json
+    if not path:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"api-{datetime.now():%Y%m%d-%H%M%S}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(rows, json.load(f)["results"], args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['size']} {r['endpoint']} ({r['cache']}): {'; '.join(r['reasons'])}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+
+if __name__ == "__main__":
+    main()
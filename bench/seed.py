@@ -0,0 +1,102 @@
+# /OLStar/bench/seed.py
+"""
+Deterministic fixture data for the API benchmarks: `size` schedules, users
+and requests in the shapes the admin app and the driver app write them.
+
+Dates are spread around `today` so the date, calendar and dashboard
+queries hit a realistic share of the data whatever day the run happens.
+"""
+import random
+from datetime import datetime, timedelta
+
+FIRST_NAMES = ("Juan", "Maria", "Jose", "Ana", "Mark", "Kristine", "Paolo", "Liza", "Ramon", "Grace")
+LAST_NAMES = ("Santos", "Reyes", "Cruz", "Bautista", "Garcia", "Mendoza", "Torres", "Flores", "Ramos", "Aquino")
+PICKUPS = ("NAIA Terminal 1 (MNL)", "NAIA Terminal 3 (MNL)", "Clark International Airport (CRK)",
+           "Makati CBD", "BGC Taguig", "Ortigas Center")
+TRIP_TYPES = ("Arrival", "Departure", "Transfer")
+SCHEDULE_STATUSES = ("Pending", "Confirmed", "Ongoing", "Completed", "Cancelled")
+REQUEST_STATUSES = ("pending", "approved", "denied")
+DAY_SPREAD = 45  # schedules fall within today +/- this many days
+ADMIN_SHARE = 0.02
+
+
+def seed_tree(size, seed=1, today=None):
+    """RTDB root with `size` users, schedules and requests (no derived nodes)."""
+    rng = random.Random(f"{seed}:{size}")
+    today = today or datetime.now().date()
+    now_ms = int(datetime.combine(today, datetime.min.time()).timestamp() * 1000)
+
+    users, drivers = {}, []
+    for i in range(size):
+        uid = f"user{i:06d}"
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        role = "admin" if rng.random() < ADMIN_SHARE else "driver"
+        user = {
+            "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+            "phone": f"+639{rng.randrange(10**9):09d}",
+            "firstName": first,
+            "middleName": rng.choice(LAST_NAMES),
+            "lastName": last,
+            "role": role,
+            "defaultTransportUnit": f"unit{rng.randrange(max(1, size // 5)):05d}" if role == "driver" else "",
+            "active": rng.random() < 0.3,
+        }
+        if role == "driver":
+            drivers.append((uid, f"{first} {last}", user["phone"]))
+            if rng.random() < 0.2:
+                user["currentLocation"] = {
+                    "latitude": 14.5 + rng.random() * 0.3,
+                    "longitude": 120.9 + rng.random() * 0.3,
+                    "timestamp": now_ms - rng.randrange(3600 * 1000),
+                }
+        users[uid] = user
+
+    schedules = {}
+    for i in range(size):
+        transaction_id = f"TXN{i:07d}"
+        day = today + timedelta(days=rng.randint(-DAY_SPREAD, DAY_SPREAD))
+        pickup = datetime.combine(day, datetime.min.time()) + timedelta(minutes=5 * rng.randrange(288))
+        schedule = {
+            "date": day.isoformat(),
+            "time": pickup.strftime("%I:%M%p"),
+            "tripType": rng.choice(TRIP_TYPES),
+            "status": rng.choice(SCHEDULE_STATUSES),
+            "pickup": rng.choice(PICKUPS),
+            "dropOff": rng.choice(PICKUPS),
+            "clientName": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "contactNumber": f"+639{rng.randrange(10**9):09d}",
+            "pax": rng.randint(1, 6),
+            "flightNumber": f"PR{rng.randrange(100, 999)}" if rng.random() < 0.6 else "",
+            "transactionID": transaction_id,
+            "updatedAt": now_ms - rng.randrange(30 * 86400 * 1000),
+            "revision": rng.randint(1, 5),
+        }
+        if drivers and rng.random() < 0.7:
+            _, driver_name, cell_phone = drivers[rng.randrange(len(drivers))]
+            schedule["current"] = {"driverName": driver_name, "cellPhone": cell_phone}
+        schedules[transaction_id] = schedule
+
+    requests = {}
+    for i in range(size):
+        requests[f"req{i:07d}"] = {
+            "requestedBy": f"user{rng.randrange(size):06d}",
+            "status": rng.choice(REQUEST_STATUSES),
+            "message": "Requesting a transport unit change",
+            "timestamp": now_ms - rng.randrange(60 * 86400 * 1000),
+        }
+
+    return {
+        "users": users,
+        "schedules": schedules,
+        "schedulesMeta": {"version": now_ms, "changes": 1},
+        "requests": requests,
+    }
+
+
+def auth_users(users, seed=1):
+    """FakeAuth records for a seeded users tree (about 3% disabled)."""
+    rng = random.Random(f"{seed}:auth")
+    return {
+        uid: {"email": user.get("email"), "disabled": rng.random() < 0.03}
+        for uid, user in users.items()
+    }
@@ -0,0 +1,33 @@
+# /OLStar/bench/server.py
+"""
+The app on seeded in-memory Firebase fakes, for benchmarking under a real
+WSGI server (see bench/api_bench.py --target).
+
+    BENCH_SIZE=10000 BENCH_SEED=1 BENCH_LATENCY_MS=20 \
+        gunicorn -w 1 --threads 4 -b 127.0.0.1:8000 bench.server:app
+
+Adds two routes for the benchmark client; never point this at production:
+    GET  /__bench__/counters   fake RTDB/Auth call and byte counters
+    POST /__bench__/reset      clear the backend's in-process caches
+"""
+import os
+
+from bench.api_bench import Backend
+
+backend = Backend(
+    int(os.getenv("BENCH_SIZE", 1000)),
+    seed=int(os.getenv("BENCH_SEED", 1)),
+    latency=float(os.getenv("BENCH_LATENCY_MS", 0)) / 1000,
+)
+app = backend.app
+
+
+@app.route("/__bench__/counters")
+def bench_counters():
+    return {"size": backend.size, **backend.counters()}, 200
+
+
+@app.route("/__bench__/reset", methods=["POST"])
+def bench_reset():
+    backend.reset_caches()
+    return {"status": "ok"}, 200
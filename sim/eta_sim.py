@@ -0,0 +1,221 @@
+# /OLStar/sim/eta_sim.py
+"""
+Replay a day of arrivals through the ETA worker, offline.
+
+    python -m sim.eta_sim --arrivals 5000 --seed 1 --json sim-result.json
+
+eta_worker runs unmodified against an in-memory RTDB (fake_rtdb) and a
+synthetic AviationEdge (fake_aviation_edge) on a virtual clock, so a whole
+day takes seconds and costs no API quota. The report covers throughput,
+API call counts, RTDB calls and how far the written ETAs were from the
+flights' true arrival times.
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "backend"))  # backend modules import each other by bare name
+
+from sim.fake_aviation_edge import FakeAviationEdge  # noqa: E402
+from sim.fake_rtdb import FakeDatabase, install  # noqa: E402
+
+PH_TZ = timezone(timedelta(hours=8))
+ETA_BUFFER = timedelta(minutes=5)  # eta_worker adds this to every estimate
+AIRPORT_PICKUPS = {"RPLL": "NAIA Terminal 3 (MNL)", "RPLC": "Clark International Airport (CRK)"}
+AIRLINES = ("PR", "5J", "Z2", "CX", "SQ", "KE", "JL", "NH")
+
+
+class VirtualClock:
+    """time()/sleep() on simulated epoch seconds; sleeping just moves time on."""
+
+    def __init__(self, start):
+        self._now = float(start)
+        self._lock = threading.Lock()
+
+    def time(self):
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds):
+        with self._lock:
+            self._now += max(0.0, seconds)
+
+
+# ---------------- Scenario ----------------
+def seed_day(rng, fake_api, date, arrivals, trips_per_flight=1.5, no_flight_share=0.03):
+    """
+    Schedules for `arrivals` arrival trips on `date`, grouped onto flights.
+    Returns (schedules, truth) where truth maps tripId -> true arrival (epoch s).
+    """
+    day = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=PH_TZ)
+    flights = []
+    for i in range(max(1, math.ceil(arrivals / trips_per_flight))):
+        # Pickups between 01:00 and 23:59 so every refresh window fits in the day
+        scheduled = day + timedelta(minutes=rng.randrange(60, 24 * 60))
+        delay = min(90, max(-20, rng.gauss(10, 15)))  # minutes
+        airport = rng.choice(("RPLL", "RPLL", "RPLC"))
+        flight_iata = f"{rng.choice(AIRLINES)}{100 + i}"
+        flight = fake_api.add_flight(flight_iata, airport, (scheduled + timedelta(minutes=delay)).timestamp())
+        flights.append((flight, scheduled))
+
+    schedules, truth = {}, {}
+    for n in range(arrivals):
+        flight, scheduled = flights[rng.randrange(len(flights))]
+        trip_id = f"sim{n:06d}"
+        schedules[trip_id] = {
+            "date": date,
+            "tripType": "Arrival",
+            "status": "Pending",
+            "time": scheduled.strftime("%I:%M%p"),
+            "pickup": AIRPORT_PICKUPS[flight.airport],
+            "flightNumber": "" if rng.random() < no_flight_share else flight.flight_iata,
+        }
+        truth[trip_id] = flight.arrives_at
+    return schedules, truth
+
+
+# ---------------- Run ----------------
+def _stats(values):
+    if not values:
+        return None
+    values = sorted(values)
+
+    def pct(p):
+        return values[min(len(values) - 1, int(p * len(values)))]
+
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), 2),
+        "p50": round(pct(0.5), 2),
+        "p90": round(pct(0.9), 2),
+        "p99": round(pct(0.99), 2),
+        "max": round(values[-1], 2),
+    }
+
+
+def run_simulation(arrivals=5000, seed=1, date="2025-03-14", calls_per_minute=None,
+                   burst=None, error_rate=0.0, speed_noise=0.08, verbose=False):
+    rng = random.Random(seed)
+    day_start = datetime.strptime(date, "%Y-%m-%d").replace(tzinfo=PH_TZ).timestamp()
+    clock = VirtualClock(day_start)
+
+    fake_api = FakeAviationEdge(clock.time, seed=seed, speed_noise=speed_noise, error_rate=error_rate)
+    schedules, truth = seed_day(rng, fake_api, date, arrivals)
+    fake_db = FakeDatabase({"schedules": schedules, "schedulesMeta": {"changes": 1}}, clock=clock.time)
+    restore = install(fake_db)
+
+    try:
+        from aviation_edge import AviationEdgeClient
+        import eta_worker
+        eta_worker = importlib.reload(eta_worker)  # fresh caches and metrics per run
+
+        eta_worker.clock = clock
+        # Rate-limit waits advance the shared virtual clock; one lookup thread
+        # keeps them in a fixed order so runs are reproducible
+        eta_worker.lookup_pool = ThreadPoolExecutor(max_workers=1)
+        fetch_flights = eta_worker.fetch_flights
+        eta_worker.fetch_flights = lambda keys: fetch_flights(sorted(keys, key=str))  # not set order
+        eta_worker.use_aviation_edge(AviationEdgeClient(
+            "sim", calls_per_minute=calls_per_minute, burst=burst,
+            session=fake_api.session(), clock=clock.time, sleep=clock.sleep
+        ))
+
+        writes = []  # (trip_id, eta epoch s)
+        store_etas = eta_worker.store_etas
+
+        def recording_store_etas(etas):
+            writes.extend((trip_id, eta.timestamp()) for trip_id, eta in etas.items())
+            store_etas(etas)
+
+        eta_worker.store_etas = recording_store_etas
+
+        output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        started = time.perf_counter()
+        with output:
+            eta_worker.eta_worker_loop(until=day_start + 24 * 3600)
+        wall = time.perf_counter() - started
+        snapshot = eta_worker.metrics.snapshot()
+        client_counters = dict(eta_worker.aviation_edge.counters)
+    finally:
+        restore()
+
+    # Fallback ETAs are pickup time + buffer; live ones come from a position
+    pickup_ts = {
+        trip_id: datetime.strptime(f"{date} {s['time']}", "%Y-%m-%d %I:%M%p").replace(tzinfo=PH_TZ).timestamp()
+        for trip_id, s in schedules.items()
+    }
+    buffer = ETA_BUFFER.total_seconds()
+    live_errors, final = [], {}
+    for trip_id, eta in writes:
+        error = abs(eta - buffer - truth[trip_id]) / 60
+        final[trip_id] = error
+        if eta != pickup_ts[trip_id] + buffer:
+            live_errors.append(error)
+
+    fallbacks = {
+        row["labels"].get("reason"): row["value"]
+        for row in snapshot.get("eta_fallbacks_total", [])
+    }
+    return {
+        "scenario": {
+            "arrivals": arrivals,
+            "flights": len(fake_api.flights),
+            "seed": seed,
+            "date": date,
+            "errorRate": error_rate,
+            "speedNoise": speed_noise,
+        },
+        "wallSeconds": round(wall, 2),
+        "simulatedSecondsPerWallSecond": round(24 * 3600 / wall, 1) if wall else None,
+        "etaWrites": len(writes),
+        "etaWritesPerWallSecond": round(len(writes) / wall, 1) if wall else None,
+        "tripsRefreshed": len(final),
+        "api": {"httpCalls": fake_api.calls, "client": client_counters},
+        "fallbacks": fallbacks,
+        "rtdb": {"calls": dict(fake_db.calls), "bytesOut": fake_db.bytes_out},
+        "etaErrorMinutes": {
+            "live": _stats(live_errors),
+            "lastWritePerTrip": _stats(list(final.values())),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a day of arrivals through the ETA worker offline.")
+    parser.add_argument("--arrivals", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--date", default="2025-03-14")
+    parser.add_argument("--calls-per-minute", type=float, default=None,
+                        help="AviationEdge quota (default: AVIATIONEDGE_CALLS_PER_MINUTE or the client default)")
+    parser.add_argument("--burst", type=int, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of API calls answered 503")
+    parser.add_argument("--speed-noise", type=float, default=0.08)
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="show the worker's own output")
+    args = parser.parse_args()
+
+    report = run_simulation(
+        arrivals=args.arrivals, seed=args.seed, date=args.date,
+        calls_per_minute=args.calls_per_minute, burst=args.burst,
+        error_rate=args.error_rate, speed_noise=args.speed_noise, verbose=args.verbose,
+    )
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# /OLStar/sim/fake_auth.py
+"""
+In-memory stand-in for the ``firebase_admin.auth`` calls the backend makes
+(get_user, get_users, create_user, update_user, delete_user).
+
+    fake = FakeAuth({"uid1": {"email": "a@b.c"}}, latency=0.01)
+    restore = install_auth(fake)   # patches firebase_admin.auth functions
+"""
+import threading
+import time
+import types
+
+from firebase_admin import auth as firebase_auth
+
+PATCHED = ("get_user", "get_users", "create_user", "update_user", "delete_user")
+
+
+def install_auth(fake):
+    """Route the firebase_admin.auth functions to `fake`. Returns a function that undoes it."""
+    originals = {name: getattr(firebase_auth, name) for name in PATCHED}
+    for name in PATCHED:
+        setattr(firebase_auth, name, getattr(fake, name))
+
+    def restore():
+        for name, fn in originals.items():
+            setattr(firebase_auth, name, fn)
+
+    return restore
+
+
+class FakeAuth:
+    def __init__(self, users=None, latency=0.0):
+        self.users = {uid: dict(record) for uid, record in (users or {}).items()}
+        self.latency = latency
+        self.calls = {}
+        self._next_uid = 0
+        self._lock = threading.Lock()
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = {}
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def _call(self, op):
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _record(self, uid):
+        record = self.users[uid]
+        return types.SimpleNamespace(
+            uid=uid,
+            email=record.get("email"),
+            email_verified=record.get("email_verified", True),
+            disabled=record.get("disabled", False),
+        )
+
+    def get_user(self, uid, app=None):
+        self._call("get_user")
+        with self._lock:
+            if uid not in self.users:
+                raise firebase_auth.UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
+            return self._record(uid)
+
+    def get_users(self, identifiers, app=None):
+        if len(identifiers) > 100:
+            raise ValueError("`identifiers` parameter must have <= 100 entries.")
+        self._call("get_users")
+        with self._lock:
+            found = [self._record(i.uid) for i in identifiers if i.uid in self.users]
+        return types.SimpleNamespace(users=found, not_found=[])
+
+    def create_user(self, **kwargs):
+        self._call("create_user")
+        with self._lock:
+            email = kwargs.get("email")
+            if email and any(u.get("email") == email for u in self.users.values()):
+                raise firebase_auth.EmailAlreadyExistsError(
+                    "The user with the provided email already exists.", None, None
+                )
+            self._next_uid += 1
+            uid = kwargs.get("uid") or f"fake-{self._next_uid:06d}"
+            self.users[uid] = {"email": email, "disabled": kwargs.get("disabled", False)}
+            return self._record(uid)
+
+    def update_user(self, uid, **kwargs):
+        self._call("update_user")
+        with self._lock:
+            if uid not in self.users:
+                raise firebase_auth.UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
+            for field in ("email", "disabled", "email_verified"):
+                if field in kwargs:
+                    self.users[uid][field] = kwargs[field]
+            return self._record(uid)
+
+    def delete_user(self, uid, app=None):
+        self._call("delete_user")
+        with self._lock:
+            if self.users.pop(uid, None) is None:
+                raise firebase_auth.UserNotFoundError(f"No user record found for the provided user ID: {uid}.")
@@ -0,0 +1,149 @@
+# /OLStar/sim/fake_aviation_edge.py
+"""
+Synthetic AviationEdge: flight tracks generated from a seed, answered in
+the same shape as GET /v2/public/flights?flightIata=...
+
+Each flight flies a straight line from an origin point to its airport at a
+constant true speed, leaving so that it lands at `arrives_at` (epoch s).
+Before departure the API has no position; after landing it reports the
+airport with speed 0 and status "landed". The reported speed carries some
+noise, which is what makes ETAs imperfect.
+
+    fake = FakeAviationEdge(clock.time, seed=1)
+    fake.add_flight("PR510", "RPLL", arrives_at)
+    client = AviationEdgeClient("sim", session=fake.session(), ...)
+
+session() answers in-process (fast enough to replay a day of arrivals);
+serve(port) exposes the same data over real HTTP for end-to-end runs.
+"""
+import json
+import math
+import random
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+AIRPORTS = {
+    "RPLL": (14.5086, 121.019),
+    "RPLC": (15.1869, 120.5604),
+}
+
+
+class Flight:
+    def __init__(self, flight_iata, airport, arrives_at, rng):
+        self.flight_iata = flight_iata
+        self.airport = airport
+        self.arrives_at = arrives_at
+        self.distance_km = rng.uniform(300, 3500)
+        self.speed_kmh = rng.uniform(700, 900)
+        bearing = math.radians(rng.uniform(0, 360))
+        lat, lon = AIRPORTS[airport]
+        # Flat-earth offset is plenty for synthetic tracks
+        self.origin = (
+            lat + self.distance_km / 111.0 * math.cos(bearing),
+            lon + self.distance_km / (111.0 * math.cos(math.radians(lat))) * math.sin(bearing),
+        )
+        self.departs_at = arrives_at - self.distance_km / self.speed_kmh * 3600
+
+    def record(self, now, speed_noise, seed):
+        lat, lon = AIRPORTS[self.airport]
+        if now < self.departs_at:
+            return None
+        base = {
+            "flight": {"iataNumber": self.flight_iata},
+            "arrival": {"icaoCode": self.airport, "latitude": lat, "longitude": lon},
+        }
+        if now >= self.arrives_at:
+            return dict(base, status="landed",
+                        geography={"latitude": lat, "longitude": lon},
+                        speed={"horizontal": 0})
+
+        done = (now - self.departs_at) / (self.arrives_at - self.departs_at)
+        # Seeded per flight and second, so results don't depend on which
+        # lookup thread asks first
+        noise = random.Random(f"{seed}:{self.flight_iata}:{int(now)}")
+        return dict(
+            base,
+            status="en-route",
+            geography={
+                "latitude": self.origin[0] + (lat - self.origin[0]) * done,
+                "longitude": self.origin[1] + (lon - self.origin[1]) * done,
+            },
+            speed={"horizontal": self.speed_kmh * noise.uniform(1 - speed_noise, 1 + speed_noise)},
+        )
+
+
+class FakeResponse:
+    def __init__(self, status_code, data=None, headers=None):
+        self.status_code = status_code
+        self._data = data
+        self.headers = headers or {}
+
+    def json(self):
+        return self._data
+
+
+class FakeAviationEdge:
+    def __init__(self, clock, seed=0, speed_noise=0.08, error_rate=0.0):
+        self.clock = clock
+        self.speed_noise = speed_noise
+        self.error_rate = error_rate  # share of calls answered 503
+        self.flights = {}
+        self.calls = 0
+        self.seed = seed
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def add_flight(self, flight_iata, airport, arrives_at):
+        with self._lock:
+            flight = Flight(flight_iata, airport, arrives_at, self._rng)
+            self.flights[flight_iata] = flight
+            return flight
+
+    def answer(self, params):
+        """(status_code, body) for a /flights query."""
+        with self._lock:
+            self.calls += 1
+            flight_iata = (params.get("flightIata") or "").upper()
+            now = self.clock()
+            if self.error_rate and random.Random(f"{self.seed}:err:{flight_iata}:{now}").random() < self.error_rate:
+                return 503, {"error": "Service Unavailable"}
+            flight = self.flights.get(flight_iata)
+            record = flight.record(now, self.speed_noise, self.seed) if flight else None
+        if record is None:
+            return 200, {"error": "No Record Found"}
+        return 200, [record]
+
+    def session(self):
+        """A requests.Session look-alike answering in-process."""
+        fake = self
+
+        class Session:
+            def get(self, url, params=None, timeout=None):
+                status, body = fake.answer(params or {})
+                return FakeResponse(status, body)
+
+        return Session()
+
+    def serve(self, port=0, host="127.0.0.1"):
+        """Serve /v2/public/flights over HTTP on a daemon thread. Returns the server."""
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[0] for k, v in parse_qs(url.query).items()}
+                status, body = fake.answer(params)
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
@@ -0,0 +1,430 @@
+# /OLStar/sim/fake_rtdb.py
+"""
+In-memory stand-in for ``firebase_admin.db``.
+
+Implements the subset of the Admin SDK Reference/Query API the backend uses
+(get/set/update/delete/push, ETags, shallow reads, transactions, ordered
+queries, server values and listen()) on a plain nested dict, plus optional
+per-call latency and call/byte counters so workloads can be measured without
+touching production.
+
+    fake = FakeDatabase(seed_data, clock=vclock.time)
+    restore = install(fake)   # firebase_admin.db.reference -> fake
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import firebase_admin
+from firebase_admin import db as firebase_db
+
+
+def install(fake):
+    """Point firebase_admin.db.reference at `fake`. Returns a function that undoes it."""
+    original = firebase_db.reference
+    firebase_db.reference = fake.reference
+    registered = "[DEFAULT]" in firebase_admin._apps
+    if not registered:
+        firebase_admin._apps["[DEFAULT]"] = object()  # "initialized" for init guards
+
+    def restore():
+        firebase_db.reference = original
+        if not registered:
+            firebase_admin._apps.pop("[DEFAULT]", None)
+
+    return restore
+
+
+class TransactionAbortedError(Exception):
+    pass
+
+
+class Event:
+    def __init__(self, event_type, path, data):
+        self.event_type = event_type
+        self.path = path
+        self.data = data
+
+
+class ListenerRegistration:
+    def __init__(self, db, path, callback):
+        self._db = db
+        self._path = path
+        self._callback = callback
+
+    def close(self):
+        self._db._remove_listener(self)
+
+
+def _split(path):
+    return [p for p in (path or "").split("/") if p]
+
+
+def _clone(value):
+    # Data is JSON by definition; a round trip is several times faster than deepcopy
+    if isinstance(value, (dict, list)):
+        return json.loads(json.dumps(value))
+    return value
+
+
+def _etag(value):
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def _has_server_value(value):
+    if isinstance(value, dict):
+        return ".sv" in value or any(_has_server_value(v) for v in value.values())
+    return False
+
+
+def _prune(value):
+    """Drop empty containers the way RTDB does (empty dicts vanish)."""
+    if isinstance(value, dict):
+        out = {}
+        for k, v in value.items():
+            v = _prune(v)
+            if v is not None:
+                out[k] = v
+        return out or None
+    return value
+
+
+class FakeDatabase:
+    """A whole fake database; ``reference()`` mirrors ``db.reference``."""
+
+    def __init__(self, data=None, latency=0.0, clock=time.time, count_bytes=True):
+        self._root = _clone(data) if data else {}
+        self.count_bytes = count_bytes
+        self._lock = threading.RLock()
+        self._listeners = []
+        self.latency = latency
+        self.clock = clock
+        self.calls = {}
+        self.bytes_out = 0
+
+    # ---------------- public API ----------------
+    def reference(self, path="/", app=None, url=None):
+        return Reference(self, "/".join(_split(path)))
+
+    def reset_counters(self):
+        with self._lock:
+            self.calls = {}
+            self.bytes_out = 0
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    # ---------------- internals ----------------
+    def _call(self, op, payload=None, size=None):
+        with self._lock:
+            self.calls[op] = self.calls.get(op, 0) + 1
+            if size is not None:
+                self.bytes_out += size
+            elif payload is not None and self.count_bytes:
+                self.bytes_out += len(json.dumps(payload))
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _read(self, path, clone=True):
+        node = self._root
+        for seg in _split(path):
+            if not isinstance(node, dict) or seg not in node:
+                return None
+            node = node[seg]
+        return _clone(node) if clone else node
+
+    def _resolve(self, value):
+        if isinstance(value, dict):
+            if ".sv" in value and len(value) == 1:
+                return value
+            return {k: self._resolve(v) for k, v in value.items()}
+        return value
+
+    def _server_value(self, value, current):
+        if isinstance(value, dict):
+            if ".sv" in value and len(value) == 1:
+                sv = value[".sv"]
+                if sv == "timestamp":
+                    return int(self.clock() * 1000)
+                if isinstance(sv, dict) and "increment" in sv:
+                    base = current if isinstance(current, (int, float)) and not isinstance(current, bool) else 0
+                    return base + sv["increment"]
+                raise ValueError(f"Unsupported server value: {sv}")
+            cur = current if isinstance(current, dict) else {}
+            return {k: self._server_value(v, cur.get(k)) for k, v in value.items()}
+        return value
+
+    def _write(self, path, value):
+        segs = _split(path)
+        value = _clone(value)
+        if _has_server_value(value):
+            value = self._server_value(value, self._read(path))
+        value = _prune(value)
+        if not segs:
+            self._root = value if isinstance(value, dict) else {}
+            return
+
+        if value is None:
+            # Delete, then drop ancestors left empty (RTDB has no empty nodes)
+            chain = [self._root]
+            for seg in segs[:-1]:
+                node = chain[-1].get(seg)
+                if not isinstance(node, dict):
+                    return
+                chain.append(node)
+            chain[-1].pop(segs[-1], None)
+            for depth in range(len(chain) - 1, 0, -1):
+                if chain[depth]:
+                    break
+                chain[depth - 1].pop(segs[depth - 1], None)
+            return
+
+        node = self._root
+        for seg in segs[:-1]:
+            if not isinstance(node.get(seg), dict):
+                node[seg] = {}
+            node = node[seg]
+        node[segs[-1]] = value
+
+    def _notify(self, event_type, path, data):
+        for reg in list(self._listeners):
+            base = _split(reg._path)
+            segs = _split(path)
+            if segs[:len(base)] == base:
+                rel = "/" + "/".join(segs[len(base):])
+                reg._callback(Event(event_type, rel, copy.deepcopy(data)))
+            elif base[:len(segs)] == segs:
+                # Write above the listener: deliver the listener's subtree.
+                rel_value = self._read(reg._path)
+                reg._callback(Event("put", "/", rel_value))
+
+    def _remove_listener(self, reg):
+        with self._lock:
+            if reg in self._listeners:
+                self._listeners.remove(reg)
+
+
+class Reference:
+    def __init__(self, db, path):
+        self._db = db
+        self._path = path
+
+    @property
+    def key(self):
+        segs = _split(self._path)
+        return segs[-1] if segs else None
+
+    @property
+    def path(self):
+        return "/" + self._path
+
+    @property
+    def parent(self):
+        segs = _split(self._path)
+        if not segs:
+            return None
+        return Reference(self._db, "/".join(segs[:-1]))
+
+    def child(self, path):
+        return Reference(self._db, "/".join(_split(self._path) + _split(path)))
+
+    def get(self, etag=False, shallow=False):
+        if etag and shallow:
+            raise ValueError("etag and shallow cannot both be set to True.")
+        with self._db._lock:
+            value = self._db._read(self._path)
+        if shallow and isinstance(value, dict):
+            value = {k: (True if isinstance(v, dict) else v) for k, v in value.items()}
+        self._db._call("get", value)
+        if etag:
+            return value, _etag(value)
+        return value
+
+    def get_if_changed(self, etag):
+        with self._db._lock:
+            value = self._db._read(self._path)
+        current = _etag(value)
+        if current == etag:
+            self._db._call("get")
+            return False, None, None
+        self._db._call("get", value)
+        return True, value, current
+
+    def set(self, value):
+        if value is None:
+            raise ValueError("Value must not be None.")
+        self._db._call("set", value)
+        with self._db._lock:
+            self._db._write(self._path, value)
+            stored = self._db._read(self._path)
+            self._db._notify("put", self._path, stored)
+
+    def set_if_unchanged(self, expected_etag, value):
+        if not isinstance(expected_etag, str):
+            raise ValueError("Expected ETag must be a string.")
+        if value is None:
+            raise ValueError("Value must not be none.")
+        self._db._call("set", value)
+        with self._db._lock:
+            current = self._db._read(self._path)
+            if _etag(current) != expected_etag:
+                return False, current, _etag(current)
+            self._db._write(self._path, value)
+            stored = self._db._read(self._path)
+            self._db._notify("put", self._path, stored)
+            return True, value, _etag(stored)
+
+    def push(self, value=""):
+        if value is None:
+            raise ValueError("Value must not be None.")
+        with self._db._lock:
+            key = "-N%013d%05d" % (int(self._db.clock() * 1000), self._db.total_calls)
+        child = self.child(key)
+        child.set(value)
+        return child
+
+    def update(self, value):
+        if not value or not isinstance(value, dict):
+            raise ValueError("Value argument must be a non-empty dictionary.")
+        self._db._call("update", value)
+        with self._db._lock:
+            for rel, v in value.items():
+                self._db._write("/".join(_split(self._path) + _split(rel)), v)
+            for rel in (value if self._db._listeners else ()):
+                path = "/".join(_split(self._path) + _split(rel))
+                self._db._notify("put", path, self._db._read(path))
+
+    def delete(self):
+        self._db._call("delete")
+        with self._db._lock:
+            self._db._write(self._path, None)
+            self._db._notify("put", self._path, None)
+
+    def listen(self, callback):
+        reg = ListenerRegistration(self._db, self._path, callback)
+        with self._db._lock:
+            self._db._listeners.append(reg)
+            callback(Event("put", "/", self._db._read(self._path)))
+        return reg
+
+    def transaction(self, transaction_update):
+        if not callable(transaction_update):
+            raise ValueError("transaction_update must be a function.")
+        data, etag = self.get(etag=True)
+        for _ in range(25):
+            new_data = transaction_update(data)
+            success, data, etag = self.set_if_unchanged(etag, new_data)
+            if success:
+                return new_data
+        raise TransactionAbortedError("Transaction aborted after failed retries.")
+
+    def order_by_child(self, path):
+        return Query(self, ("child", "/".join(_split(path))))
+
+    def order_by_key(self):
+        return Query(self, ("key", None))
+
+    def order_by_value(self):
+        return Query(self, ("value", None))
+
+
+def _type_rank(value):
+    if value is None:
+        return 0
+    if value is False:
+        return 1
+    if value is True:
+        return 2
+    if isinstance(value, (int, float)):
+        return 3
+    if isinstance(value, str):
+        return 4
+    return 5
+
+
+def _sort_key(value):
+    rank = _type_rank(value)
+    if rank in (3, 4):
+        return (rank, value)
+    return (rank, 0)
+
+
+class Query:
+    def __init__(self, ref, order_by):
+        self._ref = ref
+        self._order_by = order_by
+        self._start = self._end = self._equal = None
+        self._has_start = self._has_end = self._has_equal = False
+        self._first = self._last = None
+
+    def limit_to_first(self, limit):
+        self._first = limit
+        return self
+
+    def limit_to_last(self, limit):
+        self._last = limit
+        return self
+
+    def start_at(self, start):
+        if start is None:
+            raise ValueError("Start value must not be None.")
+        self._start, self._has_start = start, True
+        return self
+
+    def end_at(self, end):
+        if end is None:
+            raise ValueError("End value must not be None.")
+        self._end, self._has_end = end, True
+        return self
+
+    def equal_to(self, value):
+        if value is None:
+            raise ValueError("Equal to value must not be None.")
+        self._equal, self._has_equal = value, True
+        return self
+
+    def _index(self, key, value):
+        kind, path = self._order_by
+        if kind == "key":
+            return key
+        if kind == "value":
+            return value
+        node = value
+        for seg in _split(path):
+            if not isinstance(node, dict):
+                return None
+            node = node.get(seg)
+        return node if not isinstance(node, dict) else None
+
+    def get(self):
+        db = self._ref._db
+        with db._lock:
+            # Filter the live tree, then copy only what the query returns
+            data = db._read(self._ref._path, clone=False)
+            if not isinstance(data, dict):
+                data = _clone(data)
+                db._call("query", data)
+                return data
+            entries = [(_sort_key(self._index(k, v)), k, v) for k, v in data.items()]
+            entries.sort(key=lambda e: (e[0], e[1]))
+            if self._has_equal:
+                target = _sort_key(self._equal)
+                entries = [e for e in entries if e[0] == target]
+            if self._has_start:
+                lo = _sort_key(self._start)
+                entries = [e for e in entries if e[0] >= lo]
+            if self._has_end:
+                hi = _sort_key(self._end)
+                entries = [e for e in entries if e[0] <= hi]
+            if self._first is not None:
+                entries = entries[:self._first]
+            if self._last is not None:
+                entries = entries[-self._last:] if self._last else []
+            # One round trip for the whole result: the copy and the byte count
+            encoded = json.dumps({k: v for _, k, v in entries})
+        db._call("query", size=len(encoded))
+        return OrderedDict(json.loads(encoded))
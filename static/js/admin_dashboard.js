@@ -93,15 +93,21 @@ function getStatusColor(status) {
 async function fetchDashboardMetrics() {
   try {
     const res = await fetch("/api/admin/dashboard");
-    const data = await res.json();
+    renderDashboardMetrics(await res.json());
+  } catch (err) {
+    console.error("Failed to fetch dashboard metrics:", err);
+  }
+}
 
+function renderDashboardMetrics(data) {
+  try {
     document.getElementById("totalUsers").textContent = data.totalUsers || 0;
     document.getElementById("activeSessions").textContent = data.activeSessions || 0;
     document.getElementById("bookingsToday").textContent = data.bookingsToday || 0;
     document.getElementById("driversOnline").textContent = data.driversOnline || 0;
     document.getElementById("pendingRequests").textContent = data.pendingRequests || 0;
   } catch (err) {
-    console.error("Failed to fetch dashboard metrics:", err);
+    console.error("Failed to render dashboard metrics:", err);
   }
 }
 
@@ -113,8 +119,17 @@ async function fetchRecentRequests() {
   try {
     const res = await fetch("/api/admin/requests");
     const data = await res.json();
+    renderRecentRequests(data.requests);
+  } catch (err) {
+    console.error("Failed to load requests:", err);
+    container.innerHTML = "<p>Error loading requests.</p>";
+  }
+}
 
-    if (!data.requests?.length) {
+function renderRecentRequests(requests) {
+  const container = document.getElementById("recentRequestsContainer");
+  try {
+    if (!requests?.length) {
       container.innerHTML = "<p>No requests found.</p>";
       return;
     }
@@ -122,7 +137,7 @@ async function fetchRecentRequests() {
     container.innerHTML = "";
     const fragment = document.createDocumentFragment();
 
-    data.requests.forEach(req => {
+    requests.forEach(req => {
       const card = document.createElement("div");
       card.className = "request-card";
 
@@ -154,7 +169,7 @@ async function fetchRecentRequests() {
 
     container.appendChild(fragment);
   } catch (err) {
-    console.error("Failed to load requests:", err);
+    console.error("Failed to render requests:", err);
     container.innerHTML = "<p>Error loading requests.</p>";
   }
 }
@@ -164,7 +179,137 @@ async function fetchRecentRequests() {
 // =======================
 let calendar = null;
 
-async function initializeCalendar() {
+// Schedules that arrived with the bootstrap response: {from, to, schedules}.
+// Views inside that window render from it without another request.
+let preloadedCalendar = null;
+
+function toISODate(d) {
+  const month = String(d.getMonth() + 1).padStart(2, '0');
+  const day = String(d.getDate()).padStart(2, '0');
+  return `${d.getFullYear()}-${month}-${day}`;
+}
+
+async function fetchCalendarSchedules(from, to) {
+  if (preloadedCalendar && from >= preloadedCalendar.from && to <= preloadedCalendar.to) {
+    return preloadedCalendar.schedules || [];
+  }
+
+  const res = await fetch(`/api/admin/calendar/schedules?from=${from}&to=${to}`);
+  if (!res.ok) {
+    throw new Error(`HTTP error! status: ${res.status}`);
+  }
+
+  const data = await res.json();
+  return data.schedules || [];
+}
+
+function schedulesToEvents(schedules) {
+  // Transform schedules into calendar events
+  const events = [];
+  
+  schedules.forEach((schedule, index) => {
+    try {
+      // Skip if no date
+      if (!schedule.date) {
+        console.warn(`Schedule ${schedule.id || index} has no date, skipping`);
+        return;
+      }
+      
+      // Parse time
+      const timeObj = parseTimeString(schedule.time);
+      if (!timeObj) {
+        console.warn(`Could not parse time for schedule ${schedule.id || index}:`, schedule.time);
+        return;
+      }
+      
+      // Create start datetime
+      const [year, month, day] = schedule.date.split('-').map(Number);
+      const startDateTime = new Date(year, month - 1, day, timeObj.hour, timeObj.minute);
+      
+      // Calculate end time (default 1 hour later)
+      const endDateTime = new Date(startDateTime);
+      endDateTime.setHours(endDateTime.getHours() + 1);
+
+      // Get booking info
+      const clientName = schedule.clientName || schedule.passengerName || 'Unknown';
+      const flightNumber = schedule.flightNumber || '';
+      const pax = schedule.pax || '1';
+      const luggage = schedule.luggage || '0';
+      const unitType = schedule.unitType || 'Vehicle';
+      const transportUnit = schedule.transportUnit || '';
+      const plateNumber = schedule.plateNumber || '';
+      const tripType = schedule.tripType || '';
+      const transactionID = schedule.transactionID || '';
+      const pickup = schedule.pickup || 'Not specified';
+      const note = schedule.note || schedule.notes || '';
+      
+      // Create event title based on view
+      let title = clientName;
+      if (title === 'Unknown' || title.length === 0) {
+        title = flightNumber || transactionID || 'Booking';
+      }
+      
+      // Different truncation for different views (handled in eventDidMount)
+
+      // Determine status color
+      const status = schedule.status || 'pending';
+      const color = getStatusColor(status);
+
+      // Create event object with all available data
+      const event = {
+        id: schedule.id || `schedule-${index}`,
+        title: title,
+        start: startDateTime,
+        end: endDateTime,
+        backgroundColor: color,
+        borderColor: color,
+        textColor: '#ffffff',
+        display: 'block',
+        extendedProps: {
+          // Client information
+          clientName: clientName,
+          
+          // Flight information
+          flightNumber: flightNumber,
+          tripType: tripType,
+          transactionID: transactionID,
+          
+          // Passenger details
+          pax: pax,
+          luggage: luggage,
+          
+          // Schedule details
+          pickup: pickup,
+          time: schedule.time,
+          date: schedule.date,
+          
+          // Vehicle information
+          unitType: unitType,
+          transportUnit: schedule.transportUnit,
+          plateNumber: plateNumber,
+          
+          // Status
+          status: status,
+          
+          // Additional notes
+          notes: note,
+          
+          // Raw data for debugging
+          rawData: schedule
+        }
+      };
+      
+      events.push(event);
+      
+    } catch (err) {
+      console.error(`Error processing schedule ${index}:`, err);
+    }
+  });
+
+  return events;
+}
+
+function initializeCalendar(preloaded = null) {
   const calendarEl = document.getElementById('scheduleCalendar');
   
   if (!calendarEl) {
@@ -177,182 +322,10 @@ async function initializeCalendar() {
     calendar.destroy();
   }
 
-  // Show loading state
-  calendarEl.innerHTML = '<div class="calendar-loading">Loading schedules...</div>';
+  preloadedCalendar = preloaded;
+  calendarEl.innerHTML = '';
 
   try {
-    // Fetch schedules from the API
-    console.log("Fetching calendar data...");
-    const res = await fetch("/api/admin/calendar/schedules");
-    
-    if (!res.ok) {
-      throw new Error(`HTTP error! status: ${res.status}`);
-    }
-    
-    const data = await res.json();
-    
-    console.log(`Found ${data.schedules?.length || 0} schedules`);
-    
-    // Debug: log first schedule to see if clientName is present
-    if (data.schedules && data.schedules.length > 0) {
-      console.log("First schedule data:", data.schedules[0]);
-      console.log("Client Name present:", data.schedules[0].clientName);
-    }
-    
-    if (!data.schedules || data.schedules.length === 0) {
-      calendarEl.innerHTML = '<div class="calendar-loading">No schedules found. Add some schedules to see them in the calendar.</div>';
-      
-      // Initialize empty calendar
-      calendar = new FullCalendar.Calendar(calendarEl, {
-        initialView: 'timeGridWeek',
-        headerToolbar: {
-          left: 'prev,next today',
-          center: 'title',
-          right: 'dayGridMonth,timeGridWeek,timeGridDay'
-        },
-        buttonText: {
-          today: 'Today',
-          month: 'Month',
-          week: 'Week',
-          day: 'Day'
-        },
-        events: [],
-        editable: false,
-        selectable: true,
-        selectMirror: true,
-        dayMaxEvents: 3,
-        weekends: true,
-        height: 'auto',
-        eventDisplay: 'block',
-        eventTimeFormat: {
-          hour: 'numeric',
-          minute: '2-digit',
-          meridiem: 'short'
-        },
-        slotLabelFormat: {
-          hour: 'numeric',
-          minute: '2-digit',
-          meridiem: 'short'
-        },
-        // Week view specific settings
-        slotDuration: '00:30:00', // 30-minute slots
-        slotMinTime: '00:00:00', // Start at midnight
-        slotMaxTime: '24:00:00', // End at midnight
-        expandRows: true, // Expand rows to fill height
-        stickyHeaderDates: true, // Keep header visible when scrolling
-        nowIndicator: true, // Show current time indicator
-        allDaySlot: false, // Hide all-day slot to save space
-        slotEventOverlap: false, // Prevent events from overlapping
-      });
-      
-      calendar.render();
-      return;
-    }
-
-    // Transform schedules into calendar events
-    const events = [];
-    
-    data.schedules.forEach((schedule, index) => {
-      try {
-        // Skip if no date
-        if (!schedule.date) {
-          console.warn(`Schedule ${schedule.id || index} has no date, skipping`);
-          return;
-        }
-        
-        // Parse time
-        const timeObj = parseTimeString(schedule.time);
-        if (!timeObj) {
-          console.warn(`Could not parse time for schedule ${schedule.id || index}:`, schedule.time);
-          return;
-        }
-        
-        // Create start datetime
-        const [year, month, day] = schedule.date.split('-').map(Number);
-        const startDateTime = new Date(year, month - 1, day, timeObj.hour, timeObj.minute);
-        
-        // Calculate end time (default 1 hour later)
-        const endDateTime = new Date(startDateTime);
-        endDateTime.setHours(endDateTime.getHours() + 1);
-
-        // Get booking info
-        const clientName = schedule.clientName || schedule.passengerName || 'Unknown';
-        const flightNumber = schedule.flightNumber || '';
-        const pax = schedule.pax || '1';
-        const luggage = schedule.luggage || '0';
-        const unitType = schedule.unitType || 'Vehicle';
-        const transportUnit = schedule.transportUnit || '';
-        const plateNumber = schedule.plateNumber || '';
-        const tripType = schedule.tripType || '';
-        const transactionID = schedule.transactionID || '';
-        const pickup = schedule.pickup || 'Not specified';
-        const note = schedule.note || schedule.notes || '';
-        
-        // Create event title based on view
-        let title = clientName;
-        if (title === 'Unknown' || title.length === 0) {
-          title = flightNumber || transactionID || 'Booking';
-        }
-        
-        // Different truncation for different views (handled in eventDidMount)
-
-        // Determine status color
-        const status = schedule.status || 'pending';
-        const color = getStatusColor(status);
-
-        // Create event object with all available data
-        const event = {
-          id: schedule.id || `schedule-${index}`,
-          title: title,
-          start: startDateTime,
-          end: endDateTime,
-          backgroundColor: color,
-          borderColor: color,
-          textColor: '#ffffff',
-          display: 'block',
-          extendedProps: {
-            // Client information
-            clientName: clientName,
-            
-            // Flight information
-            flightNumber: flightNumber,
-            tripType: tripType,
-            transactionID: transactionID,
-            
-            // Passenger details
-            pax: pax,
-            luggage: luggage,
-            
-            // Schedule details
-            pickup: pickup,
-            time: schedule.time,
-            date: schedule.date,
-            
-            // Vehicle information
-            unitType: unitType,
-            transportUnit: schedule.transportUnit,
-            plateNumber: plateNumber,
-            
-            // Status
-            status: status,
-            
-            // Additional notes
-            notes: note,
-            
-            // Raw data for debugging
-            rawData: schedule
-          }
-        };
-        
-        events.push(event);
-        
-      } catch (err) {
-        console.error(`Error processing schedule ${index}:`, err);
-      }
-    });
-
-    console.log(`Total events created: ${events.length}`);
-
     // Initialize FullCalendar with improved settings for both views
     calendar = new FullCalendar.Calendar(calendarEl, {
       initialView: 'timeGridWeek',
@@ -367,7 +340,18 @@ async function initializeCalendar() {
         week: 'Week',
         day: 'Day'
       },
-      events: events,
+      events: function(info, successCallback, failureCallback) {
+        // info.end is exclusive
+        const last = new Date(info.end);
+        last.setDate(last.getDate() - 1);
+
+        fetchCalendarSchedules(toISODate(info.start), toISODate(last))
+          .then(schedules => successCallback(schedulesToEvents(schedules)))
+          .catch(err => {
+            console.error("Failed to load calendar data:", err);
+            failureCallback(err);
+          });
+      },
       editable: false,
       selectable: true,
       selectMirror: true,
@@ -515,17 +499,18 @@ async function initializeCalendar() {
       
       loading: function(isLoading) {
         console.log("Calendar loading:", isLoading);
+      },
+
+      eventsSet: function() {
+        updateCalendarMetrics();
       }
     });
 
     calendar.render();
     console.log("Calendar rendered successfully");
 
-    // Update metrics
-    updateCalendarMetrics();
-
   } catch (err) {
-    console.error("Failed to load calendar data:", err);
+    console.error("Failed to initialize calendar:", err);
     calendarEl.innerHTML = `<div class="calendar-error">Failed to load schedules: ${err.message}</div>`;
   }
 }
@@ -632,19 +617,32 @@ function updateCalendarMetrics() {
 // =======================
 // INITIALIZE DASHBOARD
 // =======================
+async function fetchDashboardBootstrap() {
+  const res = await fetch("/api/admin/dashboard/bootstrap");
+  if (!res.ok) {
+    throw new Error(`HTTP error! status: ${res.status}`);
+  }
+  return res.json();
+}
+
 document.addEventListener("DOMContentLoaded", async () => {
   try {
-    // Fetch metrics and requests
-    await Promise.all([
-      fetchDashboardMetrics(),
-      fetchRecentRequests()
-    ]);
-
-    // Initialize calendar
-    await initializeCalendar();
-
+    // Metrics, requests and the calendar window in one round trip
+    const data = await fetchDashboardBootstrap();
+    renderDashboardMetrics(data.metrics || {});
+    renderRecentRequests(data.requests);
+    initializeCalendar(data.calendar);
   } catch (error) {
-    console.error('Error initializing dashboard:', error);
+    console.error('Bootstrap failed, loading sections separately:', error);
+    try {
+      await Promise.all([
+        fetchDashboardMetrics(),
+        fetchRecentRequests()
+      ]);
+      initializeCalendar();
+    } catch (err) {
+      console.error('Error initializing dashboard:', err);
+    }
   }
 });
 
@@ -7,176 +7,211 @@ const CLOUDINARY_UPLOAD_PRESET = "OLStar";
 // Ensure SweetAlert2 is loaded in your HTML
 // <script src="https://cdn.jsdelivr.net/npm/sweetalert2@11"></script>
 
-fetch("/api/admin/requests")
-  .then(res => res.json())
-  .then(data => {
-    if (!data.requests || !data.requests.length) {
-      container.innerHTML = "<p>No requests found.</p>";
-      return;
-    }
+const loadMoreBtn = document.getElementById("btnLoadMore");
+const statusFilter = document.getElementById("statusFilter");
 
-    data.requests.forEach(req => {
-      const card = document.createElement("div");
-      card.className = "request-card";
-
-      const statusClass = (req.status || "pending").toLowerCase();
-      const statusText = (req.status || "pending").toUpperCase();
-      const dateText = req.timestamp
-        ? new Date(req.timestamp).toLocaleString()
-        : "—";
-
-      // Card content
-      card.innerHTML = `
-        <div class="card-header">
-          <span class="amount">₱${req.amount || "0"}</span>
-          <span class="status ${statusClass}">
-            ${statusText}
-          </span>
-        </div>
-
-        <div class="card-body">
-          <p><strong>Requested By:</strong> ${req.requestedByName || req.requestedBy || "Unknown"}</p>
-          <p><strong>Date:</strong> ${dateText}</p>
-
-          <div class="images">
-            ${req.receiptUrl ? `<a href="${req.receiptUrl}" target="_blank">Receipt</a>` : ""}
-            ${req.gcashUrl ? `<a href="${req.gcashUrl}" target="_blank">GCash</a>` : ""}
-            ${req.mileageURL ? `<a href="${req.mileageURL}" target="_blank">Mileage</a>` : ""}
-            ${req.imageReply ? `<a href="${req.imageReply}" target="_blank">Receipt Image</a>` : ""}
-          </div>
-
-          <div class="request-actions" style="margin-top:10px;">
-            <button class="btn-pay">Pay</button>
-            <button class="btn-deny">Deny</button>
-          </div>
-        </div>
-      `;
-
-      container.appendChild(card);
-
-      const statusEl = card.querySelector(".status");
-      const imagesDiv = card.querySelector(".images");
-      const payBtn = card.querySelector(".btn-pay");
-      const denyBtn = card.querySelector(".btn-deny");
-
-      // Disable buttons if not pending
-      if (statusText !== "PENDING") {
-        payBtn.disabled = true;
-        denyBtn.disabled = true;
-      }
+const PAGE_SIZE = 50;
+let nextCursor = null;
 
-      // --------- Pay Button ---------
-      payBtn.addEventListener("click", async () => {
-        const fileInput = document.createElement("input");
-        fileInput.type = "file";
-        fileInput.accept = "image/*";
-        fileInput.click();
-
-        fileInput.onchange = async () => {
-          const file = fileInput.files[0];
-          if (!file) return;
-
-          const formData = new FormData();
-          formData.append("file", file);
-          formData.append("upload_preset", CLOUDINARY_UPLOAD_PRESET);
-
-          try {
-            const res = await fetch(CLOUDINARY_URL, { method: "POST", body: formData });
-            const cloudData = await res.json();
-
-            if (cloudData.secure_url) {
-              const imageUrl = cloudData.secure_url;
-
-              // Update request status and store image
-              await fetch(`/api/admin/requests/${req.id}`, {
-                method: "PATCH",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ status: "paid", imageReply: imageUrl })
-              });
-
-              // Update UI dynamically
-              statusEl.textContent = "PAID";
-              statusEl.className = "status paid";
-
-              const replyLink = document.createElement("a");
-              replyLink.href = imageUrl;
-              replyLink.target = "_blank";
-              replyLink.textContent = "Reply Image";
-              imagesDiv.appendChild(replyLink);
-
-              payBtn.disabled = true;
-              denyBtn.disabled = true;
-
-              Swal.fire({
-                icon: "success",
-                title: "Paid",
-                text: "Request marked as paid and image uploaded!",
-                timer: 2000,
-                showConfirmButton: false
-              });
-            } else {
-              Swal.fire({
-                icon: "error",
-                title: "Upload Failed",
-                text: "Cloudinary upload failed."
-              });
-            }
-          } catch (err) {
-            console.error(err);
-            Swal.fire({
-              icon: "error",
-              title: "Error",
-              text: "Error uploading image or updating request."
-            });
-          }
-        };
-      });
+// Requests come newest first, one page at a time; nextCursor continues the list
+async function loadRequests({ reset = false } = {}) {
+  if (reset) {
+    nextCursor = null;
+    container.innerHTML = "";
+  }
 
-      // --------- Deny Button ---------
-      denyBtn.addEventListener("click", async () => {
-        const { isConfirmed } = await Swal.fire({
-          title: "Are you sure?",
-          text: "Do you want to deny this request?",
-          icon: "warning",
-          showCancelButton: true,
-          confirmButtonText: "Yes, deny it",
-          cancelButtonText: "Cancel"
-        });
+  const params = new URLSearchParams({ limit: PAGE_SIZE });
+  if (statusFilter?.value) params.set("status", statusFilter.value);
+  if (nextCursor) params.set("cursor", nextCursor);
+
+  if (loadMoreBtn) loadMoreBtn.disabled = true;
 
-        if (!isConfirmed) return;
+  try {
+    const res = await fetch(`/api/admin/requests?${params}`);
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || `HTTP ${res.status}`);
 
-        try {
+    (data.requests || []).forEach(renderRequestCard);
+    nextCursor = data.nextCursor || null;
+
+    if (!container.children.length) {
+      container.innerHTML = "<p>No requests found.</p>";
+    }
+  } catch (err) {
+    console.error("Failed to load requests:", err);
+    if (!container.children.length) {
+      container.innerHTML = "<p>Error loading requests.</p>";
+    }
+  } finally {
+    if (loadMoreBtn) {
+      loadMoreBtn.hidden = !nextCursor;
+      loadMoreBtn.disabled = false;
+    }
+  }
+}
+
+function renderRequestCard(req) {
+  const card = document.createElement("div");
+  card.className = "request-card";
+
+  const statusClass = (req.status || "pending").toLowerCase();
+  const statusText = (req.status || "pending").toUpperCase();
+  const dateText = req.timestamp
+    ? new Date(req.timestamp).toLocaleString()
+    : "—";
+
+  // Card content
+  card.innerHTML = `
+    <div class="card-header">
+      <span class="amount">₱${req.amount || "0"}</span>
+      <span class="status ${statusClass}">
+        ${statusText}
+      </span>
+    </div>
+
+    <div class="card-body">
+      <p><strong>Requested By:</strong> ${req.requestedByName || req.requestedBy || "Unknown"}</p>
+      <p><strong>Date:</strong> ${dateText}</p>
+
+      <div class="images">
+        ${req.receiptUrl ? `<a href="${req.receiptUrl}" target="_blank">Receipt</a>` : ""}
+        ${req.gcashUrl ? `<a href="${req.gcashUrl}" target="_blank">GCash</a>` : ""}
+        ${req.mileageURL ? `<a href="${req.mileageURL}" target="_blank">Mileage</a>` : ""}
+        ${req.imageReply ? `<a href="${req.imageReply}" target="_blank">Receipt Image</a>` : ""}
+      </div>
+
+      <div class="request-actions" style="margin-top:10px;">
+        <button class="btn-pay">Pay</button>
+        <button class="btn-deny">Deny</button>
+      </div>
+    </div>
+  `;
+
+  container.appendChild(card);
+
+  const statusEl = card.querySelector(".status");
+  const imagesDiv = card.querySelector(".images");
+  const payBtn = card.querySelector(".btn-pay");
+  const denyBtn = card.querySelector(".btn-deny");
+
+  // Disable buttons if not pending
+  if (statusText !== "PENDING") {
+    payBtn.disabled = true;
+    denyBtn.disabled = true;
+  }
+
+  // --------- Pay Button ---------
+  payBtn.addEventListener("click", async () => {
+    const fileInput = document.createElement("input");
+    fileInput.type = "file";
+    fileInput.accept = "image/*";
+    fileInput.click();
+
+    fileInput.onchange = async () => {
+      const file = fileInput.files[0];
+      if (!file) return;
+
+      const formData = new FormData();
+      formData.append("file", file);
+      formData.append("upload_preset", CLOUDINARY_UPLOAD_PRESET);
+
+      try {
+        const res = await fetch(CLOUDINARY_URL, { method: "POST", body: formData });
+        const cloudData = await res.json();
+
+        if (cloudData.secure_url) {
+          const imageUrl = cloudData.secure_url;
+
+          // Update request status and store image
           await fetch(`/api/admin/requests/${req.id}`, {
             method: "PATCH",
             headers: { "Content-Type": "application/json" },
-            body: JSON.stringify({ status: "denied" })
+            body: JSON.stringify({ status: "paid", imageReply: imageUrl })
           });
 
-          statusEl.textContent = "DENIED";
-          statusEl.className = "status denied";
+          // Update UI dynamically
+          statusEl.textContent = "PAID";
+          statusEl.className = "status paid";
+
+          const replyLink = document.createElement("a");
+          replyLink.href = imageUrl;
+          replyLink.target = "_blank";
+          replyLink.textContent = "Reply Image";
+          imagesDiv.appendChild(replyLink);
 
           payBtn.disabled = true;
           denyBtn.disabled = true;
 
           Swal.fire({
             icon: "success",
-            title: "Denied",
-            text: "Request denied successfully",
+            title: "Paid",
+            text: "Request marked as paid and image uploaded!",
             timer: 2000,
             showConfirmButton: false
           });
-        } catch (err) {
-          console.error(err);
+        } else {
           Swal.fire({
             icon: "error",
-            title: "Error",
-            text: "Error updating request."
+            title: "Upload Failed",
+            text: "Cloudinary upload failed."
           });
         }
-      });
+      } catch (err) {
+        console.error(err);
+        Swal.fire({
+          icon: "error",
+          title: "Error",
+          text: "Error uploading image or updating request."
+        });
+      }
+    };
+  });
+
+  // --------- Deny Button ---------
+  denyBtn.addEventListener("click", async () => {
+    const { isConfirmed } = await Swal.fire({
+      title: "Are you sure?",
+      text: "Do you want to deny this request?",
+      icon: "warning",
+      showCancelButton: true,
+      confirmButtonText: "Yes, deny it",
+      cancelButtonText: "Cancel"
     });
-  })
-  .catch(err => {
-    console.error("Failed to load requests:", err);
-    container.innerHTML = "<p>Error loading requests.</p>";
+
+    if (!isConfirmed) return;
+
+    try {
+      await fetch(`/api/admin/requests/${req.id}`, {
+        method: "PATCH",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ status: "denied" })
+      });
+
+      statusEl.textContent = "DENIED";
+      statusEl.className = "status denied";
+
+      payBtn.disabled = true;
+      denyBtn.disabled = true;
+
+      Swal.fire({
+        icon: "success",
+        title: "Denied",
+        text: "Request denied successfully",
+        timer: 2000,
+        showConfirmButton: false
+      });
+    } catch (err) {
+      console.error(err);
+      Swal.fire({
+        icon: "error",
+        title: "Error",
+        text: "Error updating request."
+      });
+    }
   });
+}
+
+loadMoreBtn?.addEventListener("click", () => loadRequests());
+statusFilter?.addEventListener("change", () => loadRequests({ reset: true }));
+
+loadRequests();
@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))  # backend modules import each other by bare name
+
+# backend/app.py refuses to start without these; nothing here talks to Firebase
+os.environ.setdefault("FLASK_SECRET_KEY", "test-" + "0" * 59)
+os.environ.setdefault("FIREBASE_DATABASE_URL", "https://test.invalid")
+os.environ["RTDB_MIRROR_PATH"] = ""
+
+from sim.fake_auth import FakeAuth, install_auth  # noqa: E402
+from sim.fake_rtdb import FakeDatabase, install  # noqa: E402
+
+
+@pytest.fixture
+def rtdb_seed():
+    """Initial database contents; override in a test module (or per test) to seed it."""
+    return {}
+
+
+@pytest.fixture
+def fake_db(rtdb_seed):
+    fake = FakeDatabase(rtdb_seed)
+    restore = install(fake)
+    yield fake
+    restore()
+
+
+@pytest.fixture
+def client(fake_db):
+    """Test client for the app on `fake_db`, signed in as an admin, with fresh caches."""
+    restore_auth = install_auth(FakeAuth())
+    from backend.app import app
+    from rtdb_cache import cache
+
+    cache.clear()
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session.update(uid="admin", role="admin")
+    yield client
+    restore_auth()
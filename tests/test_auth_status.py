@@ -0,0 +1,37 @@
+import pytest
+
+from sim.fake_auth import FakeAuth, install_auth
+
+
+@pytest.fixture
+def fake_auth(fake_db):
+    fake = FakeAuth({"u1": {"email": "a@example.com"}, "u2": {"email": "b@example.com"}})
+    restore = install_auth(fake)
+    yield fake
+    restore()
+
+
+def test_toggle_on_another_worker_is_seen(fake_auth):
+    from auth_status import AuthStatusCache
+
+    worker_a, worker_b = AuthStatusCache(), AuthStatusCache()
+    assert worker_a.disabled_map(["u1", "u2"]) == {"u1": False, "u2": False}
+
+    # toggle_user_status on worker B
+    fake_auth.update_user("u1", disabled=True)
+    worker_b.set("u1", True)
+
+    assert worker_a.disabled_map(["u1", "u2"]) == {"u1": True, "u2": False}
+
+
+def test_own_change_keeps_the_cache(fake_auth):
+    from auth_status import AuthStatusCache
+
+    worker = AuthStatusCache()
+    worker.disabled_map(["u1", "u2"])
+    fake_auth.update_user("u1", disabled=True)
+    worker.set("u1", True)
+    fake_auth.reset_counters()
+
+    assert worker.disabled_map(["u1", "u2"]) == {"u1": True, "u2": False}
+    assert fake_auth.total_calls == 0
@@ -0,0 +1,19 @@
+from aviation_edge import AviationEdgeClient
+from sim.eta_sim import VirtualClock
+
+
+def test_set_share_scales_quota():
+    clock = VirtualClock(0)
+    client = AviationEdgeClient("test", calls_per_minute=60, burst=10, session=object(),
+                                clock=clock.time, sleep=clock.sleep)
+
+    client.set_share(0.25)
+    assert client.bucket.rate == 0.25
+    assert client.bucket.capacity == 2
+
+    client.set_share(0)
+    assert not client.bucket.acquire(timeout=1)  # no shards, no calls
+
+    client.set_share(1)
+    clock.sleep(10)
+    assert client.bucket.available == 10
@@ -0,0 +1,43 @@
+import pytest
+
+
+@pytest.fixture
+def rtdb_seed():
+    return {
+        "schedules": {"T1": {"date": "2025-03-14", "time": "10:30AM", "status": "Pending"}},
+        "schedulesMeta": {"changes": 1},
+    }
+
+
+def _statuses(client):
+    response = client.get("/api/admin/calendar/schedules?month=2025-03")
+    assert response.status_code == 200
+    return [row["status"] for row in response.get_json()["schedules"]]
+
+
+def test_write_from_another_worker_is_seen(client, fake_db):
+    assert _statuses(client) == ["Pending"]
+
+    # Another worker's PATCH: no invalidate() in this process, only the counter
+    fake_db.reference().update({"schedules/T1/status": "Confirmed", "schedulesMeta/changes": 2})
+
+    assert _statuses(client) == ["Confirmed"]
+
+
+def test_write_during_load_is_not_cached(client, fake_db, monkeypatch):
+    import routes.admin_dashboard as admin_dashboard
+    from rtdb_cache import CALENDAR_PREFIX, cache
+
+    schedules_between = admin_dashboard._schedules_between
+
+    def read_then_write(start, end, mirror=None):
+        schedules = schedules_between(start, end, mirror)
+        fake_db.reference("schedules/T1/status").set("Confirmed")
+        cache.invalidate_prefix(CALENDAR_PREFIX)  # as the PATCH handler does
+        return schedules
+
+    monkeypatch.setattr(admin_dashboard, "_schedules_between", read_then_write)
+    assert _statuses(client) == ["Pending"]
+    monkeypatch.setattr(admin_dashboard, "_schedules_between", schedules_between)
+
+    assert _statuses(client) == ["Confirmed"]
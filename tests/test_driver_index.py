@@ -0,0 +1,27 @@
+from driver_index import DriverIndex
+
+
+def _driver(first, last, phone):
+    return {"firstName": first, "lastName": last, "phone": phone, "role": "driver"}
+
+
+def test_rebuilds_when_the_users_node_is_reloaded():
+    users = {"u1": _driver("Juan", "Santos", "+639171234567")}
+    index = DriverIndex(loader=lambda: users)
+    assert [s["uid"] for s in index.suggest("juan")] == ["u1"]
+
+    # Another worker adds a driver; the users cache reloads a new object
+    users = {**users, "u2": _driver("Juana", "Reyes", "+639181234567")}
+
+    assert [s["uid"] for s in index.suggest("juan")] == ["u1", "u2"]
+
+
+def test_same_users_object_is_not_rebuilt():
+    users = {"u1": _driver("Juan", "Santos", "+639171234567")}
+    index = DriverIndex(loader=lambda: users)
+    index.suggest("juan")
+    built_at = index._built_at
+
+    index.suggest("santos")
+
+    assert index._built_at == built_at
@@ -0,0 +1,85 @@
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+
+from aviation_edge import AviationEdgeClient, LANDED_TTL, ttl_for_flight
+from sim.eta_sim import PH_TZ, VirtualClock
+from sim.fake_aviation_edge import FakeAviationEdge, FakeResponse
+from sim.fake_rtdb import FakeDatabase, install
+
+LANDED = {
+    "flight": {"iataNumber": "PR510"},
+    "status": "landed",
+    "arrival": {"icaoCode": "RPLL", "latitude": 14.5086, "longitude": 121.019},
+    "geography": {"latitude": 14.5086, "longitude": 121.019},
+    "speed": {"horizontal": 0},
+}
+
+
+def test_parse_returns_landed_record():
+    flight = AviationEdgeClient._parse(FakeResponse(200, [LANDED]))
+    assert flight["status"] == "landed"
+    assert ttl_for_flight(flight) == LANDED_TTL
+
+
+@pytest.fixture
+def worker():
+    start = datetime(2025, 3, 14, 10, 0, tzinfo=PH_TZ).timestamp()
+    clock = VirtualClock(start)
+    fake_api = FakeAviationEdge(clock.time)
+    fake_api.add_flight("PR510", "RPLL", start - 600)  # landed ten minutes ago
+    fake_db = FakeDatabase({"schedules": {}, "schedulesMeta": {"changes": 1}}, clock=clock.time)
+    restore = install(fake_db)
+    try:
+        import eta_worker
+        eta_worker = importlib.reload(eta_worker)
+        eta_worker.clock = clock
+        eta_worker.use_aviation_edge(AviationEdgeClient(
+            "test", session=fake_api.session(), clock=clock.time, sleep=clock.sleep
+        ))
+        yield eta_worker, fake_db
+    finally:
+        restore()
+
+
+def _trip(**fields):
+    return dict({
+        "tripId": "t1",
+        "date": "2025-03-14",
+        "tripType": "Arrival",
+        "status": "Pending",
+        "time": "10:30AM",
+        "pickup": "NAIA Terminal 3 (MNL)",
+        "flightNumber": "PR510",
+    }, **fields)
+
+
+def _fallbacks(eta_worker):
+    return {row["labels"]["reason"]: row["value"]
+            for row in eta_worker.metrics.snapshot().get("eta_fallbacks_total", [])}
+
+
+def test_landed_flight_keeps_last_eta_and_stops_refreshing(worker):
+    eta_worker, fake_db = worker
+    from eta_scheduler import TripScheduler
+
+    scheduler = TripScheduler()
+    live_eta = {"est": "2025-03-14 09:55:00", "timestamp": 1}
+    eta_worker.refresh_etas(scheduler, [_trip(ETA=live_eta)])
+
+    assert "t1" not in scheduler
+    assert fake_db.reference("schedules/t1/ETA").get() is None  # nothing overwritten
+    assert "not_departed" not in _fallbacks(eta_worker)
+
+
+def test_landed_flight_without_eta_gets_one(worker):
+    eta_worker, fake_db = worker
+    from eta_scheduler import TripScheduler
+
+    scheduler = TripScheduler()
+    eta_worker.refresh_etas(scheduler, [_trip()])
+
+    expected = eta_worker.now_ph() + timedelta(minutes=5)
+    assert fake_db.reference("schedules/t1/ETA/est").get() == expected.strftime("%Y-%m-%d %H:%M:%S")
+    assert "t1" not in scheduler
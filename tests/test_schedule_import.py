@@ -0,0 +1,36 @@
+import pytest
+
+
+@pytest.fixture
+def rtdb_seed():
+    return {"schedules": {}, "schedulesMeta": {"changes": 1}}
+
+
+def _row(transaction_id, date):
+    return {"transactionID": transaction_id, "date": date, "time": "10:30AM", "clientName": "A"}
+
+
+def _bookings(fake_db):
+    daily = fake_db.reference("stats/daily").get() or {}
+    return {date: node["bookings"] for date, node in daily.items() if node.get("bookings")}
+
+
+def test_reimport_counts_each_booking_once(client, fake_db):
+    for _ in range(3):
+        assert client.post("/api/schedules", json=_row("T1", "2025-03-14")).status_code == 200
+
+    assert _bookings(fake_db) == {"2025-03-14": 1}
+
+
+def test_reimport_with_new_date_moves_the_booking(client, fake_db):
+    client.post("/api/schedules", json=[_row("T1", "2025-03-14"), _row("T2", "2025-03-14")])
+    client.post("/api/schedules", json=_row("T1", "2025-03-15"))
+
+    assert _bookings(fake_db) == {"2025-03-14": 1, "2025-03-15": 1}
+
+
+def test_rejected_import_counts_nothing(client, fake_db):
+    response = client.post("/api/schedules", json=[_row("T1", "2025-03-14"), _row("T1", "2025-03-15")])
+
+    assert response.status_code == 400
+    assert _bookings(fake_db) == {}
@@ -0,0 +1,82 @@
+import pytest
+
+
+@pytest.fixture
+def rtdb_seed():
+    return {
+        # Written before schedules had a revision
+        "schedules": {
+            "T1": {"date": "2025-03-14", "time": "10:30AM", "pax": "2"},
+            "T2": {"date": "2025-03-14", "time": "11:00AM", "pax": "1", "revision": 2},
+        },
+        "stats": {"daily": {"2025-03-14": {"bookings": 2}}},
+        "schedulesMeta": {"changes": 1},
+    }
+
+
+def test_patch_legacy_schedule_bumps_revision(client, fake_db):
+    response = client.patch("/api/schedules/T1", json={"pax": "3"})
+
+    assert response.status_code == 200
+    assert fake_db.reference("schedules/T1").get()["revision"] == 1
+
+
+def _delete_during_claim(monkeypatch, client, after_claim):
+    """Make the next revision claim race a DELETE, landing before or after it."""
+    import routes.schedules as schedules
+
+    claim_revision = schedules._claim_revision
+    pending = [True]
+
+    def racing_claim(transaction_id, revision, etag):
+        if not pending:
+            return claim_revision(transaction_id, revision, etag)
+        pending.clear()
+        if not after_claim:
+            client.delete(f"/api/schedules/{transaction_id}")
+        claimed = claim_revision(transaction_id, revision, etag)
+        if after_claim:
+            client.delete(f"/api/schedules/{transaction_id}")
+        return claimed
+
+    monkeypatch.setattr(schedules, "_claim_revision", racing_claim)
+
+
+def test_patch_racing_delete_of_legacy_schedule_is_404(client, fake_db, monkeypatch):
+    _delete_during_claim(monkeypatch, client, after_claim=False)
+    response = client.patch("/api/schedules/T1", json={"pax": "3"})
+
+    assert response.status_code == 404
+    assert fake_db.reference("schedules/T1").get() is None
+    assert fake_db.reference("schedulesDeleted/T1").get() is not None
+
+
+def test_delete_between_claim_and_write_is_404(client, fake_db, monkeypatch):
+    _delete_during_claim(monkeypatch, client, after_claim=True)
+    response = client.patch("/api/schedules/T2", json={"date": "2025-03-15"})
+
+    assert response.status_code == 404
+    assert fake_db.reference("schedules/T2").get() is None
+    assert fake_db.reference("schedulesDeleted/T2").get() is not None
+    assert fake_db.reference("stats/daily/2025-03-14/bookings").get() == 1
+    assert (fake_db.reference("stats/daily/2025-03-15/bookings").get() or 0) == 0
+
+
+def test_patch_read_before_delete_conflicts(client, fake_db, monkeypatch):
+    import routes.schedules as schedules
+
+    read_revision = schedules._read_revision
+    pending = [True]
+
+    def read_then_delete(transaction_id):
+        read = read_revision(transaction_id)
+        if pending:
+            pending.clear()
+            client.delete(f"/api/schedules/{transaction_id}")
+        return read
+
+    monkeypatch.setattr(schedules, "_read_revision", read_then_delete)
+    response = client.patch("/api/schedules/T2", json={"pax": "3"})
+
+    assert response.status_code == 409
+    assert fake_db.reference("schedules/T2").get() is None
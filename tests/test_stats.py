@@ -0,0 +1,54 @@
+import pytest
+
+import stats
+
+
+@pytest.fixture
+def rtdb_seed():
+    return {
+        "users": {
+            "u1": {"role": "driver", "active": True, "currentLocation": {"latitude": 14.5}},
+            "u2": {"role": "admin"},
+        },
+        "requests": {
+            "r1": {"status": "pending", "timestamp": 1},
+            "r2": {"status": "approved", "timestamp": 2},
+        },
+        "schedules": {"s1": {"date": "2025-03-14"}},
+        "stats": {"live": {"totalUsers": 1}, "daily": {"2025-03-14": {"bookings": 7}}},
+    }
+
+
+def test_reconcile_live_recounts_live_counters_only(fake_db):
+    live = stats.reconcile_live()
+
+    assert {k: live[k] for k in stats.LIVE_FIELDS} == {
+        "totalUsers": 2, "activeSessions": 1, "driversOnline": 1, "pendingRequests": 1,
+    }
+    assert fake_db.reference("stats/daily/2025-03-14/bookings").get() == 7
+
+
+def test_recount_retries_when_an_increment_lands_mid_scan(fake_db, monkeypatch):
+    compute_live = stats.compute_live
+    scans = []
+
+    def compute_live_racing(users, pending):
+        if not scans:
+            # A request is created while we count
+            fake_db.reference("requests/r3").set({"status": "pending", "timestamp": 3})
+            fake_db.reference().update(stats.live_delta("pendingRequests"))
+        scans.append(pending)
+        return compute_live(users, pending)
+
+    monkeypatch.setattr(stats, "compute_live", compute_live_racing)
+    stats.reconcile_live()
+
+    assert scans == [1, 2]
+    assert fake_db.reference("stats/live/pendingRequests").get() == 2
+
+
+def test_rebuild_stats_rebuilds_daily_counts(fake_db):
+    rebuilt = stats.rebuild_stats()
+
+    assert rebuilt["daily"] == {"2025-03-14": {"bookings": 1}}
+    assert fake_db.reference("stats/live/pendingRequests").get() == 1
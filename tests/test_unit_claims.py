@@ -0,0 +1,34 @@
+import pytest
+
+from indexes import claim_unit, rollback_unit_claim
+
+
+@pytest.fixture
+def rtdb_seed():
+    return {
+        "users": {
+            "a": {"defaultTransportUnit": "U1"},
+            "b": {"defaultTransportUnit": "U2"},
+        },
+        "unitAssignments": {"U1": "a", "U2": "b"},
+    }
+
+
+def test_rollback_restores_both_units_after_a_failed_write(fake_db):
+    updates = claim_unit("b", "U1")
+    assert updates["users/a/defaultTransportUnit"] == ""
+    assert fake_db.reference("unitAssignments").get() == {"U1": "b", "U2": ""}
+
+    # The write carrying `updates` failed
+    rollback_unit_claim("b", "U1", updates)
+
+    assert fake_db.reference("unitAssignments").get() == {"U1": "a", "U2": "b"}
+
+
+def test_rollback_leaves_a_unit_someone_else_claimed_since(fake_db):
+    updates = claim_unit("b", "U1")
+    claim_unit("a", "U1")  # a later claim won
+
+    rollback_unit_claim("b", "U1", updates)
+
+    assert fake_db.reference("unitAssignments/U1").get() == "a"